@@ -0,0 +1,331 @@
+from datetime import datetime, date, timedelta, timezone
+from typing import Dict, List, Optional
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Results arrive after kickoff, so recently rolled days are recomputed
+# until they are this many days old
+SETTLE_DAYS = 7
+
+
+class AnalyticsRollupService:
+    """
+    Maintains pre-aggregated analytics for the admin dashboard.
+
+    Collections written:
+    - analytics_daily: one document per UTC day (DAU, predictions, signups,
+      accuracy, per-league and per-hour counts, active user ids)
+    - analytics_totals: running totals ({"_id": "global"})
+    - analytics_league_totals: per-league prediction and distinct user counts
+    - analytics_league_users: one document per (league, user) seen, so the
+      user count never needs an ever-growing array
+    - analytics_user_totals: per-user prediction/correct counts and accuracy
+
+    Re-rolling a day applies only the difference from its previous rollup
+    to the running totals, so the job is safe to run repeatedly. The new
+    daily document is only written if the previous one is still in place
+    (same updated_at), and it carries that difference as "pending" until
+    every total has taken it. Each total records the rollup it last took
+    per date, so a run that crashed part way is finished by the next one
+    and overlapping runs (scheduler, admin endpoint, startup, several
+    workers) can't fold the same change in twice.
+    """
+
+    def __init__(self, database):
+        self.db = database
+
+    @staticmethod
+    def _day_bounds(day: date):
+        start = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+        return start, start + timedelta(days=1)
+
+    def _created_in_day(self, day: date) -> Dict:
+        """created_at filter for a UTC day, matching ISO strings and BSON dates"""
+        start, end = self._day_bounds(day)
+        next_day = (day + timedelta(days=1)).isoformat()
+        return {"$or": [
+            {"created_at": {"$gte": day.isoformat(), "$lt": next_day}},
+            {"created_at": {"$gte": start, "$lt": end}},
+        ]}
+
+    async def compute_day(self, day: date) -> Dict:
+        """
+        Aggregate one UTC day of predictions and signups into a rollup document
+
+        predictions.created_at is a BSON date (see migrate_native_dates), so the
+        day is an index range scan and the hour comes straight from $hour.
+        """
+        start, end = self._day_bounds(day)
+        pipeline = [
+            {"$match": {"created_at": {"$gte": start.replace(tzinfo=None), "$lt": end.replace(tzinfo=None)}}},
+            {"$group": {
+                "_id": {
+                    "user_id": "$user_id",
+                    "league": {"$ifNull": ["$league_name", "$league"]},
+                    "hour": {"$hour": "$created_at"}
+                },
+                "username": {"$first": "$username"},
+                "predictions": {"$sum": 1},
+                "correct": {"$sum": {"$cond": [{"$eq": ["$result", "correct"]}, 1, 0]}},
+                "incorrect": {"$sum": {"$cond": [{"$eq": ["$result", "incorrect"]}, 1, 0]}}
+            }}
+        ]
+        rows = await self.db.predictions.aggregate(pipeline).to_list(None)
+
+        users: Dict[str, Dict] = {}
+        leagues: Dict[str, Dict] = {}
+        hours = [0] * 24
+        totals = {"predictions": 0, "correct": 0, "incorrect": 0}
+
+        for row in rows:
+            key = row["_id"]
+            user_id = key.get("user_id")
+            count = row["predictions"]
+            totals["predictions"] += count
+            totals["correct"] += row["correct"]
+            totals["incorrect"] += row["incorrect"]
+
+            user = users.setdefault(user_id, {"user_id": user_id, "username": row.get("username"),
+                                              "predictions": 0, "correct": 0})
+            user["predictions"] += count
+            user["correct"] += row["correct"]
+
+            if key.get("league"):
+                league = leagues.setdefault(key["league"], {"league": key["league"], "predictions": 0, "user_ids": set()})
+                league["predictions"] += count
+                league["user_ids"].add(user_id)
+
+            try:
+                hours[int(key.get("hour"))] += count
+            except (TypeError, ValueError):
+                pass
+
+        signups = await self.db.users.count_documents(self._created_in_day(day))
+        scored = totals["correct"] + totals["incorrect"]
+
+        return {
+            "date": day.isoformat(),
+            "day_start": start,
+            "dau": len(users),
+            "active_user_ids": sorted(uid for uid in users if uid),
+            "predictions": totals["predictions"],
+            "correct": totals["correct"],
+            "incorrect": totals["incorrect"],
+            "accuracy": round(totals["correct"] / scored * 100, 1) if scored else 0,
+            "signups": signups,
+            "leagues": [
+                {"league": l["league"], "predictions": l["predictions"], "users": len(l["user_ids"]),
+                 "user_ids": sorted(uid for uid in l["user_ids"] if uid)}
+                for l in sorted(leagues.values(), key=lambda l: l["predictions"], reverse=True)
+            ],
+            "hours": hours,
+            "users": list(users.values()),
+            "updated_at": datetime.now(timezone.utc).isoformat()
+        }
+
+    async def rollup_day(self, day: date) -> Dict:
+        """Recompute one day and fold the change into the running totals"""
+        new = await self.compute_day(day)
+        old = await self.db.analytics_daily.find_one({"date": new["date"]}, {"_id": 0}) or {}
+        if old.get("pending"):
+            # The run that wrote it stopped before its change reached every total
+            await self._apply_pending(old)
+
+        new["pending"] = self._delta(old, new)
+        if not await self._replace_daily(old, new):
+            logger.info(f"📊 Analytics rollup: {new['date']} was re-rolled concurrently, skipping")
+            return await self.db.analytics_daily.find_one({"date": new["date"]}, {"_id": 0, "pending": 0})
+
+        await self._apply_pending(new)
+        new.pop("pending")
+        return new
+
+    @staticmethod
+    def _delta(old: Dict, new: Dict) -> Dict:
+        """What re-rolling the day from `old` to `new` changes in the running totals"""
+        global_inc = {
+            field: new[field] - old.get(field, 0)
+            for field in ("predictions", "correct", "incorrect")
+        }
+        old_hours = old.get("hours") or [0] * 24
+        for hour in range(24):
+            global_inc[f"hours.{hour:02d}"] = new["hours"][hour] - old_hours[hour]
+
+        old_leagues = {l["league"]: l["predictions"] for l in old.get("leagues", [])}
+        leagues = [
+            {"league": l["league"], "predictions": l["predictions"] - old_leagues.get(l["league"], 0)}
+            for l in new["leagues"]
+        ]
+        new_league_names = {l["league"] for l in new["leagues"]}
+        leagues += [{"league": name, "predictions": -predictions}
+                    for name, predictions in old_leagues.items() if name not in new_league_names]
+
+        old_users = {u["user_id"]: u for u in old.get("users", [])}
+        users = []
+        for user in new["users"]:
+            previous = old_users.get(user["user_id"], {})
+            users.append({"user_id": user["user_id"], "username": user["username"],
+                          "predictions": user["predictions"] - previous.get("predictions", 0),
+                          "correct": user["correct"] - previous.get("correct", 0)})
+        new_user_ids = {u["user_id"] for u in new["users"]}
+        users += [{"user_id": user_id, "predictions": -previous["predictions"], "correct": -previous["correct"]}
+                  for user_id, previous in old_users.items() if user_id not in new_user_ids]
+
+        return {
+            "rollup_id": uuid.uuid4().hex,
+            "global": {k: v for k, v in global_inc.items() if v},
+            "leagues": leagues,
+            "users": users,
+        }
+
+    async def _apply_pending(self, daily: Dict):
+        """
+        Fold a daily document's recorded change into the running totals
+
+        Every total records the last rollup of each date it received
+        (applied_rollups.<date>), so applying the same change again - after
+        a crash, or from an overlapping run - is a no-op.
+        """
+        pending = daily["pending"]
+        token = pending["rollup_id"]
+        mark = f"applied_rollups.{daily['date']}"
+        not_applied = {mark: {"$ne": token}}
+
+        if pending["global"]:
+            await self.db.analytics_totals.update_one({"_id": "global"}, {"$setOnInsert": {"predictions": 0}},
+                                                      upsert=True)
+            await self.db.analytics_totals.update_one(
+                {"_id": "global", **not_applied}, {"$inc": pending["global"], "$set": {mark: token}}
+            )
+
+        if pending["leagues"]:
+            await self.db.analytics_league_totals.bulk_write([
+                UpdateOne({"league": l["league"]}, {"$setOnInsert": {"predictions": 0}}, upsert=True)
+                for l in pending["leagues"]
+            ], ordered=False)
+            await self.db.analytics_league_totals.bulk_write([
+                UpdateOne({"league": l["league"], **not_applied},
+                          {"$inc": {"predictions": l["predictions"]}, "$set": {mark: token}})
+                for l in pending["leagues"]
+            ], ordered=False)
+        for league in daily.get("leagues", []):
+            await self._add_league_users(league)
+
+        touched = [u["user_id"] for u in pending["users"] if u["predictions"] or u["correct"]]
+        user_ops = [
+            UpdateOne({"user_id": u["user_id"]},
+                      {"$set": {"username": u["username"]}, "$setOnInsert": {"predictions": 0, "correct": 0}},
+                      upsert=True)
+            for u in pending["users"] if "username" in u
+        ]
+        if user_ops:
+            await self.db.analytics_user_totals.bulk_write(user_ops, ordered=False)
+        if touched:
+            await self.db.analytics_user_totals.bulk_write([
+                UpdateOne({"user_id": u["user_id"], **not_applied},
+                          {"$inc": {"predictions": u["predictions"], "correct": u["correct"]}, "$set": {mark: token}})
+                for u in pending["users"] if u["predictions"] or u["correct"]
+            ], ordered=False)
+
+            accuracy_ops = []
+            async for user in self.db.analytics_user_totals.find(
+                {"user_id": {"$in": touched}}, {"_id": 0, "user_id": 1, "predictions": 1, "correct": 1}
+            ):
+                total = user.get("predictions", 0)
+                accuracy = round(user.get("correct", 0) / total * 100, 1) if total > 0 else 0
+                accuracy_ops.append(UpdateOne({"user_id": user["user_id"]}, {"$set": {"accuracy": accuracy}}))
+            if accuracy_ops:
+                await self.db.analytics_user_totals.bulk_write(accuracy_ops, ordered=False)
+
+        await self.db.analytics_daily.update_one(
+            {"date": daily["date"], "pending.rollup_id": token}, {"$unset": {"pending": ""}}
+        )
+
+    async def _replace_daily(self, old: Dict, new: Dict) -> bool:
+        """Write the day's rollup unless another run replaced `old` first"""
+        if not old:
+            try:
+                await self.db.analytics_daily.insert_one(dict(new))
+            except DuplicateKeyError:
+                return False
+            return True
+        result = await self.db.analytics_daily.replace_one(
+            {"date": new["date"], "updated_at": old.get("updated_at")}, new
+        )
+        return result.matched_count == 1
+
+    async def _add_league_users(self, league: Dict):
+        """Record the league's users and set its distinct user count"""
+        if league["user_ids"]:
+            await self.db.analytics_league_users.bulk_write([
+                UpdateOne({"league": league["league"], "user_id": user_id},
+                          {"$setOnInsert": {"league": league["league"], "user_id": user_id}}, upsert=True)
+                for user_id in league["user_ids"]
+            ], ordered=False)
+        users = await self.db.analytics_league_users.count_documents({"league": league["league"]})
+        # $max: a count taken before a concurrent run's users landed never overwrites a newer one
+        await self.db.analytics_league_totals.update_one({"league": league["league"]}, {"$max": {"users": users}})
+
+    async def _first_activity_day(self) -> Optional[date]:
+        first = await self.db.predictions.find_one(
+            {"created_at": {"$type": "date"}}, {"_id": 0, "created_at": 1}, sort=[("created_at", 1)]
+        )
+        return first["created_at"].date() if first else None
+
+    async def run(self, settle_days: int = SETTLE_DAYS) -> List[str]:
+        """
+        Incremental rollup: backfill on first run, then re-roll the last
+        settle_days days (today included) on every run
+
+        Returns:
+            The dates that were rolled up
+        """
+        today = datetime.now(timezone.utc).date()
+        state = await self.db.analytics_totals.find_one({"_id": "global"}, {"_id": 0, "last_rolled_date": 1}) or {}
+
+        if state.get("last_rolled_date"):
+            start = min(date.fromisoformat(state["last_rolled_date"]), today - timedelta(days=settle_days - 1))
+        else:
+            start = await self._first_activity_day() or today
+
+        rolled = []
+        day = start
+        while day <= today:
+            await self.rollup_day(day)
+            rolled.append(day.isoformat())
+            day += timedelta(days=1)
+
+        await self.db.analytics_totals.update_one(
+            {"_id": "global"},
+            {"$set": {"last_rolled_date": today.isoformat(), "updated_at": datetime.now(timezone.utc).isoformat()}},
+            upsert=True
+        )
+        logger.info(f"📊 Analytics rollup: {len(rolled)} day(s) from {start.isoformat()}")
+        return rolled
+
+    async def ensure_indexes(self):
+        await self.db.analytics_daily.create_index("date", unique=True)
+        await self.db.analytics_league_totals.create_index("league", unique=True)
+        await self.db.analytics_league_users.create_index([("league", 1), ("user_id", 1)], unique=True)
+        await self.db.analytics_user_totals.create_index("user_id", unique=True)
+        await self.db.analytics_user_totals.create_index([("predictions", -1)])
+        await self.db.analytics_user_totals.create_index([("accuracy", -1)])
+        await self.migrate_league_user_ids()
+
+    async def migrate_league_user_ids(self) -> int:
+        """Move user_ids arrays left on analytics_league_totals into analytics_league_users"""
+        migrated = 0
+        async for league in self.db.analytics_league_totals.find(
+            {"user_ids": {"$exists": True}}, {"_id": 0, "league": 1, "user_ids": 1}
+        ):
+            league["user_ids"] = [uid for uid in league.get("user_ids") or [] if uid]
+            await self._add_league_users(league)
+            await self.db.analytics_league_totals.update_one({"league": league["league"]}, {"$unset": {"user_ids": ""}})
+            migrated += 1
+        if migrated:
+            logger.info(f"📊 Moved user ids of {migrated} league total(s) to analytics_league_users")
+        return migrated
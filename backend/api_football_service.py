@@ -6,20 +6,14 @@ import logging
 
 logger = logging.getLogger(__name__)
 
-# Import the Sportmonks backup service
+# The Sportmonks backup service is only needed when API-Football comes up
+# empty, so it is resolved through the lazy import registry on first use
 try:
-    from .sportmonks_service import SportmonksService
-    SPORTMONKS_AVAILABLE = True
-    logger.info("Sportmonks backup service available")
+    from .lazy_imports import lazy_import
+    from .date_codec import to_bson_datetime
 except ImportError:
-    try:
-        from sportmonks_service import SportmonksService
-        SPORTMONKS_AVAILABLE = True
-        logger.info("Sportmonks backup service available (fallback import)")
-    except ImportError:
-        SPORTMONKS_AVAILABLE = False
-        SportmonksService = None
-        logger.warning("Sportmonks backup service not available")
+    from lazy_imports import lazy_import
+    from date_codec import to_bson_datetime
 
 
 class APIFootballService:
@@ -34,8 +28,21 @@ class APIFootballService:
         }
         self.timeout = 10.0
         
-        # Initialize Sportmonks backup service
-        self.sportmonks_service = SportmonksService() if SPORTMONKS_AVAILABLE else None
+        self._sportmonks_service = None
+        self._sportmonks_checked = False
+    
+    @property
+    def sportmonks_service(self):
+        """Sportmonks backup service, loaded the first time a fallback is needed"""
+        if not self._sportmonks_checked:
+            self._sportmonks_checked = True
+            try:
+                self._sportmonks_service = lazy_import("sportmonks")
+                logger.info("Sportmonks backup service available")
+            except ImportError:
+                self._sportmonks_service = None
+                logger.warning("Sportmonks backup service not available")
+        return self._sportmonks_service
         
     async def get_fixtures_by_date(self, date: str, league_id: Optional[int] = None, season: int = 2025) -> List[Dict[str, Any]]:
         """
@@ -238,6 +245,7 @@ class APIFootballService:
                 'home_logo': home_team.get('logo'),
                 'away_logo': away_team.get('logo'),
                 'match_date': fixture.get('date'),
+                'utc_date': to_bson_datetime(fixture.get('date')),
                 'status': status,
                 'home_score': goals.get('home'),
                 'away_score': goals.get('away'),
@@ -0,0 +1,222 @@
+import logging
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from team_standings import TeamStandings
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+LEASE_SECONDS = 300
+
+# What deleting each kind of entity removes.
+# - root: (collection, key) of the entity itself; soft-deleted at once with
+#   deleted_at, removed last
+# - children: removed in batches, in order. "key" is the field holding the
+#   root's id; "counter" (collection, field on child, counter field) is
+#   decremented for each removed child so denormalized counts stay right;
+#   "cascade" queues a job of that kind for every child instead of a plain delete;
+#   "rescore" removes team_standings rows through TeamStandings so the
+#   teammates' matchday points are recomputed without them.
+# Payments and weekly pots are financial records and are kept.
+CASCADE_PLANS = {
+    "post": {
+        "root": ("posts", "id"),
+        "children": [
+            {"collection": "comments", "key": "post_id"},
+            {"collection": "likes", "key": "post_id"},
+        ],
+    },
+    "team": {
+        "root": ("teams", "id"),
+        "children": [
+            {"collection": "team_members", "key": "team_id"},
+            {"collection": "team_invitations", "key": "team_id"},
+            {"collection": "team_nominations", "key": "team_id"},
+            {"collection": "team_message_likes", "key": "team_id"},
+            {"collection": "team_messages", "key": "team_id"},
+            {"collection": "team_standings", "key": "team_id"},
+        ],
+    },
+    "user": {
+        "root": ("users", "id"),
+        "children": [
+            {"collection": "posts", "key": "author_id", "cascade": "post"},
+            {"collection": "comments", "key": "author_id", "counter": ("posts", "post_id", "comments_count")},
+            {"collection": "likes", "key": "user_id", "counter": ("posts", "post_id", "likes_count")},
+            {"collection": "team_message_likes", "key": "user_id", "counter": ("team_messages", "message_id", "likes")},
+            {"collection": "team_members", "key": "user_id", "counter": ("teams", "team_id", "member_count")},
+            {"collection": "team_invitations", "key": "invited_user_id"},
+            {"collection": "predictions", "key": "user_id"},
+            {"collection": "user_league_points", "key": "user_id"},
+            {"collection": "team_standings", "key": "user_id", "rescore": True},
+            {"collection": "notifications", "key": "user_id"},
+            {"collection": "notification_counters", "key": "_id"},
+        ],
+    },
+}
+
+
+class CascadeDeleteQueue:
+    """
+    Background queue for cascading deletes.
+
+    enqueue() soft-deletes the root document (sets deleted_at, which the
+    read paths filter on) and records a job in deletion_jobs. Workers claim
+    jobs with a lease and purge children batch by batch, saving the current
+    step after each one, so a crashed or restarted worker's job is picked
+    up again once its lease expires and continues where it stopped.
+    """
+
+    def __init__(self, database, plans: Optional[Dict] = None, batch_size: int = BATCH_SIZE):
+        self.db = database
+        self.plans = plans or CASCADE_PLANS
+        self.batch_size = batch_size
+
+    async def enqueue(self, kind: str, target_id: str, requested_by: Optional[str] = None) -> Dict:
+        """
+        Soft-delete an entity and queue the purge of everything under it
+
+        Returns:
+            The job document (an existing one if the entity is already queued)
+        """
+        plan = self.plans[kind]
+        collection, key = plan["root"]
+        now = datetime.now(timezone.utc).isoformat()
+        await self.db[collection].update_one(
+            {key: target_id, "deleted_at": None}, {"$set": {"deleted_at": now}}
+        )
+
+        job = {
+            "id": str(uuid.uuid4()),
+            "kind": kind,
+            "target_id": target_id,
+            "status": "pending",
+            "step": 0,
+            "deleted": {},
+            "requested_by": requested_by,
+            "created_at": now,
+            "updated_at": now,
+        }
+        try:
+            await self.db.deletion_jobs.insert_one(job)
+        except DuplicateKeyError:
+            job = await self.db.deletion_jobs.find_one({"kind": kind, "target_id": target_id}, {"_id": 0})
+        job.pop("_id", None)
+        return job
+
+    async def _claim(self) -> Optional[Dict]:
+        now = datetime.now(timezone.utc)
+        job = await self.db.deletion_jobs.find_one_and_update(
+            {"$or": [
+                {"status": "pending"},
+                {"status": "running", "lease_until": {"$lt": now}},
+            ]},
+            {"$set": {"status": "running", "lease_until": now + timedelta(seconds=LEASE_SECONDS)}},
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+        if job:
+            job.pop("_id", None)
+        return job
+
+    async def _purge_batch(self, child: Dict, target_id: str) -> int:
+        """Delete (or cascade) one batch of children; returns how many were handled"""
+        collection = self.db[child["collection"]]
+        query = {child["key"]: target_id}
+        projection = {"_id": 1}
+        counter = child.get("counter")
+        if counter:
+            projection[counter[1]] = 1
+        if child.get("cascade"):
+            projection["id"] = 1
+            # Already soft-deleted children were queued by an earlier batch
+            query["deleted_at"] = None
+
+        docs = await collection.find(query, projection).limit(self.batch_size).to_list(self.batch_size)
+        if not docs:
+            return 0
+
+        if child.get("cascade"):
+            for doc in docs:
+                await self.enqueue(child["cascade"], doc["id"])
+            return len(docs)
+        if child.get("rescore"):
+            return await TeamStandings(self.db).remove_rows([doc["_id"] for doc in docs])
+
+        result = await collection.delete_many({"_id": {"$in": [doc["_id"] for doc in docs]}})
+
+        if counter:
+            target_collection, field, counter_field = counter
+            per_target = Counter(doc.get(field) for doc in docs if doc.get(field))
+            if per_target:
+                await self.db[target_collection].bulk_write([
+                    UpdateOne({"id": tid, counter_field: {"$gte": n}}, {"$inc": {counter_field: -n}})
+                    for tid, n in per_target.items()
+                ], ordered=False)
+        return result.deleted_count
+
+    async def process(self, job: Dict) -> Dict:
+        """Run a claimed job to completion, checkpointing after every batch"""
+        plan = self.plans[job["kind"]]
+        children: List[Dict] = plan["children"]
+        step = job.get("step", 0)
+        deleted = dict(job.get("deleted") or {})
+
+        while step < len(children):
+            child = children[step]
+            handled = await self._purge_batch(child, job["target_id"])
+            if handled:
+                deleted[child["collection"]] = deleted.get(child["collection"], 0) + handled
+            else:
+                step += 1
+            await self.db.deletion_jobs.update_one({"id": job["id"]}, {"$set": {
+                "step": step,
+                "deleted": deleted,
+                "lease_until": datetime.now(timezone.utc) + timedelta(seconds=LEASE_SECONDS),
+                "updated_at": datetime.now(timezone.utc).isoformat()
+            }})
+
+        collection, key = plan["root"]
+        await self.db[collection].delete_one({key: job["target_id"]})
+        await self.db.deletion_jobs.update_one({"id": job["id"]}, {"$set": {
+            "status": "done",
+            "completed_at": datetime.now(timezone.utc).isoformat()
+        }, "$unset": {"lease_until": ""}})
+        logger.info(f"🗑️ Purged {job['kind']} {job['target_id']}: {deleted}")
+        job.update({"status": "done", "step": step, "deleted": deleted})
+        return job
+
+    async def run_pending(self, max_jobs: int = 100) -> int:
+        """
+        Claim and process queued jobs until none are left (or max_jobs)
+
+        Returns:
+            Number of jobs completed
+        """
+        completed = 0
+        while completed < max_jobs:
+            job = await self._claim()
+            if not job:
+                break
+            try:
+                await self.process(job)
+                completed += 1
+            except Exception as e:
+                # Leave it running; the lease expiry hands it to the next run
+                logger.error(f"❌ Deletion job {job['id']} ({job['kind']} {job['target_id']}) failed: {str(e)}")
+                break
+        return completed
+
+    async def ensure_indexes(self):
+        await self.db.deletion_jobs.create_index([("kind", 1), ("target_id", 1)], unique=True)
+        await self.db.deletion_jobs.create_index([("status", 1), ("created_at", 1)])
+        await self.db.deletion_jobs.create_index("id")
+        await self.db.comments.create_index("author_id")
+        await self.db.likes.create_index("user_id")
+        await self.db.posts.create_index("author_id")
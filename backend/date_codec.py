@@ -0,0 +1,60 @@
+"""
+Date codec for documents stored in MongoDB.
+
+Dates are stored as BSON dates holding naive UTC datetimes (what pymongo
+returns by default). These helpers convert to that storage form on write,
+to timezone-aware UTC for comparisons with datetime.now(timezone.utc), and
+to ISO strings for API responses. Legacy ISO strings are still accepted so
+callers work before and after migrate_native_dates has run.
+"""
+from datetime import datetime, date, timezone
+from typing import Any, Optional
+
+
+def parse_datetime(value: Any) -> Optional[datetime]:
+    """Parse a datetime, date or ISO-8601 string ('Z' suffix allowed); None if unparseable"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    return None
+
+
+def to_bson_datetime(value: Any) -> Optional[datetime]:
+    """Storage form: naive datetime in UTC (aware values are converted first)"""
+    parsed = parse_datetime(value)
+    if parsed is None:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def as_utc(value: Any) -> Optional[datetime]:
+    """Timezone-aware UTC datetime, safe to compare with datetime.now(timezone.utc)"""
+    parsed = parse_datetime(value)
+    if parsed is None:
+        return None
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def to_iso(value: Any) -> Optional[str]:
+    """ISO-8601 string with explicit UTC offset for API responses"""
+    if isinstance(value, str):
+        return value
+    aware = as_utc(value)
+    return aware.isoformat() if aware else None
+
+
+def utc_now() -> datetime:
+    """Current time in storage form (naive UTC)"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
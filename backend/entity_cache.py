@@ -0,0 +1,198 @@
+"""
+In-process read-through cache for hot user / team / membership lookups.
+
+Each EntityCache wraps one collection keyed by a single field, with its own
+TTL and a bounded LRU. Lookups made in the same event-loop tick (get() under
+asyncio.gather, or get_many()) are coalesced into one $in query, DataLoader
+style. Missing documents are not cached.
+
+Writers must call invalidate() (or clear() after bulk updates) for the
+entities they change; the TTL bounds staleness for writes that don't.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# MongoDB connection will be injected
+db = None
+
+_inflight = set()
+
+
+def set_db(database):
+    global db
+    db = database
+    for cache in CACHES.values():
+        cache.clear()
+
+
+class EntityCache:
+    """TTL + LRU cache over one collection with batched loading"""
+
+    def __init__(self, name: str, collection: str, key_field: str, ttl: float, max_entries: int,
+                 sort: Optional[List[Tuple[str, int]]] = None):
+        self.name = name
+        self.collection = collection
+        self.key_field = key_field
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # Several documents per key (e.g. memberships): the first in this order wins
+        self.sort = sort
+        self._entries: "OrderedDict[Any, Tuple[Dict, float]]" = OrderedDict()
+        self._batch: Dict[Any, asyncio.Future] = {}
+        # Bumped on invalidation so a load that started earlier can't store stale data
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.evictions = 0
+
+    def _lookup(self, key) -> Optional[Dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        doc, expires_at = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return doc
+
+    def _store(self, key, doc: Dict):
+        self._entries[key] = (doc, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _enqueue(self, key) -> asyncio.Future:
+        future = self._batch.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            if not self._batch:
+                loop.call_soon(self._dispatch)
+            future = self._batch[key] = loop.create_future()
+        return future
+
+    def _dispatch(self):
+        batch, self._batch = self._batch, {}
+        task = asyncio.ensure_future(self._load(batch))
+        _inflight.add(task)
+        task.add_done_callback(_inflight.discard)
+
+    async def _load(self, batch: Dict[Any, asyncio.Future]):
+        generation = self._generation
+        try:
+            docs = await self._fetch(list(batch))
+        except Exception as e:
+            logger.error(f"❌ Entity cache load failed for {self.name}: {str(e)}")
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for key, future in batch.items():
+            doc = docs.get(key)
+            if doc is not None and generation == self._generation:
+                self._store(key, doc)
+            if not future.done():
+                future.set_result(doc)
+
+    async def _fetch(self, keys: List) -> Dict[Any, Dict]:
+        self.loads += 1
+        cursor = db[self.collection].find({self.key_field: {"$in": keys}}, {"_id": 0})
+        if self.sort:
+            cursor = cursor.sort(self.sort)
+        docs = {}
+        async for doc in cursor:
+            docs.setdefault(doc.get(self.key_field), doc)
+        return docs
+
+    async def get(self, key) -> Optional[Dict]:
+        """The document for key (a copy), or None if it doesn't exist"""
+        if key is None:
+            return None
+        doc = self._lookup(key)
+        if doc is not None:
+            self.hits += 1
+            return dict(doc)
+        self.misses += 1
+        doc = await asyncio.shield(self._enqueue(key))
+        return dict(doc) if doc is not None else None
+
+    async def get_many(self, keys: Iterable) -> Dict[Any, Dict]:
+        """{key: document} for the keys that exist, loading all misses in one query"""
+        result = {}
+        pending = {}
+        for key in dict.fromkeys(k for k in keys if k is not None):
+            doc = self._lookup(key)
+            if doc is not None:
+                self.hits += 1
+                result[key] = dict(doc)
+            else:
+                self.misses += 1
+                pending[key] = self._enqueue(key)
+        if pending:
+            loaded = await asyncio.gather(*(asyncio.shield(f) for f in pending.values()))
+            for key, doc in zip(pending, loaded):
+                if doc is not None:
+                    result[key] = dict(doc)
+        return result
+
+    def invalidate(self, *keys):
+        self._generation += 1
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        self._generation += 1
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "loads": self.loads,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+        }
+
+
+# Users carry points that scoring updates in bulk, so they expire sooner
+users = EntityCache("users", "users", "id", ttl=60, max_entries=5000)
+teams = EntityCache("teams", "teams", "id", ttl=300, max_entries=2000)
+# A user's primary team: the first membership they joined
+memberships = EntityCache("memberships", "team_members", "user_id", ttl=300, max_entries=5000,
+                          sort=[("joined_at", 1)])
+
+CACHES = {cache.name: cache for cache in (users, teams, memberships)}
+
+
+def invalidate_user(user_id: str):
+    """After a user's profile or team membership changes"""
+    users.invalidate(user_id)
+    memberships.invalidate(user_id)
+
+
+def invalidate_team(team_id: str, member_ids: Iterable[str] = ()):
+    teams.invalidate(team_id)
+    member_ids = list(member_ids)
+    if member_ids:
+        memberships.invalidate(*member_ids)
+
+
+def clear_all():
+    for cache in CACHES.values():
+        cache.clear()
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Hit/miss counters per entity"""
+    return {name: cache.stats() for name, cache in CACHES.items()}
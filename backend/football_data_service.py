@@ -3,6 +3,7 @@ import os
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 import logging
+from date_codec import to_bson_datetime
 
 logger = logging.getLogger(__name__)
 
@@ -158,6 +159,7 @@ class FootballDataService:
                 'home_logo': home_team.get('crest'),
                 'away_logo': away_team.get('crest'),
                 'match_date': f.get('utcDate'),
+                'utc_date': to_bson_datetime(f.get('utcDate')),
                 'status': f.get('status'),
                 'home_score': score.get('home'),
                 'away_score': score.get('away'),
@@ -0,0 +1,187 @@
+import asyncio
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import entity_cache
+
+logger = logging.getLogger(__name__)
+
+# Longest edge in pixels for each derivative
+VARIANT_SIZES = {
+    "thumb": 320,
+    "medium": 1080,
+}
+VARIANT_DIR = "variants"
+UPLOADS_URL_PREFIX = "/api/uploads/"
+
+# Animated GIFs would lose their animation; HEIC needs a plugin Pillow doesn't ship with
+DERIVABLE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp'}
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=int(os.environ.get('IMAGE_WORKERS', '2')))
+    return _pool
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def generate_derivatives(source: str, out_dir: str) -> Dict[str, Dict[str, str]]:
+    """
+    Resize one image into every VARIANT_SIZES entry as WebP (and AVIF when
+    Pillow has an AVIF encoder). Runs in a worker process.
+
+    Returns:
+        {variant: {format: filename}} for the files written
+    """
+    from PIL import Image, ImageOps, features
+
+    formats = {"webp": {"quality": 80, "method": 4}}
+    if features.check("avif"):
+        formats["avif"] = {"quality": 60}
+
+    stem = Path(source).stem
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    written: Dict[str, Dict[str, str]] = {}
+
+    with Image.open(source) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+
+        for variant, edge in VARIANT_SIZES.items():
+            resized = image.copy()
+            # Never upscale - a small original is its own "medium"
+            resized.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+            written[variant] = {}
+            for fmt, options in formats.items():
+                filename = f"{stem}_{variant}.{fmt}"
+                tmp = out / f".{filename}.tmp"
+                resized.save(tmp, format=fmt.upper(), **options)
+                os.replace(tmp, out / filename)
+                written[variant][fmt] = filename
+    return written
+
+
+def filename_from_url(url: Optional[str]) -> Optional[str]:
+    """'/api/uploads/abc.jpg' -> 'abc.jpg' (None for external URLs)"""
+    if not url or not url.startswith(UPLOADS_URL_PREFIX):
+        return None
+    name = url[len(UPLOADS_URL_PREFIX):]
+    return name if "/" not in name else None
+
+
+def variant_urls(manifest: Optional[Dict]) -> Dict[str, str]:
+    """{variant: url} preferring WebP, which every supported browser can show"""
+    if not manifest:
+        return {}
+    urls = {}
+    for variant, files in (manifest.get("variants") or {}).items():
+        filename = files.get("webp") or next(iter(files.values()), None)
+        if filename:
+            urls[variant] = f"{UPLOADS_URL_PREFIX}{VARIANT_DIR}/{filename}"
+    return urls
+
+
+class ImageDerivativeService:
+    """
+    Service for generating and looking up resized image variants.
+
+    Derivatives are produced in a process pool after upload and recorded in
+    media_variants ({"filename", "variants": {variant: {format: file}}}).
+    Readers batch-load manifests with get_variant_urls. Files are read from
+    and written to the upload storage backend (see media_storage).
+    """
+
+    def __init__(self, database, storage=None):
+        self.db = database
+        self.storage = storage
+
+    async def generate(self, filename: str) -> Optional[Dict]:
+        """Generate derivatives for an uploaded file (no-op for videos and unsupported images)"""
+        if Path(filename).suffix.lower() not in DERIVABLE_EXTENSIONS:
+            return None
+        existing = await self.db.media_variants.find_one({"filename": filename}, {"_id": 0})
+        if existing:
+            return existing
+
+        loop = asyncio.get_running_loop()
+        try:
+            async with self.storage.local_copy(filename) as source, self.storage.scratch_dir() as out_dir:
+                variants = await loop.run_in_executor(
+                    get_pool(), generate_derivatives, str(source), str(out_dir)
+                )
+                for files in variants.values():
+                    for name in files.values():
+                        await self.storage.put_file(out_dir / name, f"{VARIANT_DIR}/{name}")
+        except Exception as e:
+            logger.error(f"❌ Image derivatives failed for {filename}: {str(e)}")
+            return None
+
+        manifest = {
+            "filename": filename,
+            "variants": variants,
+            "created_at": datetime.now(timezone.utc).isoformat()
+        }
+        await self.db.media_variants.update_one({"filename": filename}, {"$set": manifest}, upsert=True)
+
+        # Users who set this image as their avatar before it was processed
+        thumb = variant_urls(manifest).get("thumb")
+        if thumb:
+            await self.db.users.update_many(
+                {"avatar_url": f"{UPLOADS_URL_PREFIX}{filename}"},
+                {"$set": {"avatar_thumb_url": thumb}}
+            )
+            entity_cache.users.clear()
+        logger.info(f"🖼️ Generated derivatives for {filename}")
+        return manifest
+
+    async def get_variant_urls(self, urls: Iterable[Optional[str]]) -> Dict[str, Dict[str, str]]:
+        """
+        Look up variants for many upload URLs in one query
+
+        Returns:
+            {url: {variant: url}} for URLs that have derivatives
+        """
+        by_filename = {}
+        for url in urls:
+            filename = filename_from_url(url)
+            if filename:
+                by_filename[filename] = url
+        if not by_filename:
+            return {}
+
+        result = {}
+        async for manifest in self.db.media_variants.find(
+            {"filename": {"$in": list(by_filename)}}, {"_id": 0, "filename": 1, "variants": 1}
+        ):
+            result[by_filename[manifest["filename"]]] = variant_urls(manifest)
+        return result
+
+    async def backfill(self, limit: int = 500) -> List[str]:
+        """Generate derivatives for existing uploads that have none yet"""
+        done = {m["filename"] async for m in self.db.media_variants.find({}, {"_id": 0, "filename": 1})}
+        processed = []
+        for key in await self.storage.list_keys():
+            if len(processed) >= limit:
+                break
+            if Path(key).suffix.lower() in DERIVABLE_EXTENSIONS and key not in done:
+                if await self.generate(key):
+                    processed.append(key)
+        return processed
+
+    async def ensure_indexes(self):
+        await self.db.media_variants.create_index("filename", unique=True)
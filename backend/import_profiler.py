@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Startup import profiler
+
+Runs `python -X importtime` against a module (server by default) in a clean
+subprocess and reports which imports dominate process start time.
+
+Usage:
+    python import_profiler.py                 # top 25 modules for `import server`
+    python import_profiler.py --top 50 --json
+    python import_profiler.py --module stripe_service
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+BACKEND_DIR = Path(__file__).parent
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def profile_imports(module: str = "server", preload: str = "") -> List[Dict]:
+    """
+    Import a module in a fresh interpreter and collect per-module import cost
+
+    Args:
+        module: Module to import (resolved from the backend directory)
+        preload: Optional extra statement to run after the import, e.g. to
+            force lazy integrations to load for comparison
+
+    Returns:
+        List of dicts with module, self_us, cumulative_us and depth, in import order
+    """
+    code = f"import {module}"
+    if preload:
+        code += f"; {preload}"
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = str(BACKEND_DIR) + os.pathsep + env.get("PYTHONPATH", "")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        tail = "\n".join(proc.stderr.strip().splitlines()[-5:])
+        raise RuntimeError(f"Importing {module} failed:\n{tail}")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        rows.append({
+            "module": name,
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+            "depth": (len(indent) - 1) // 2,
+        })
+    return rows
+
+
+def summarize_by_package(rows: List[Dict]) -> Dict[str, int]:
+    """Total self time per top-level package, in microseconds"""
+    totals: Dict[str, int] = {}
+    for row in rows:
+        package = row["module"].split(".")[0]
+        totals[package] = totals.get(package, 0) + row["self_us"]
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report per-module import cost")
+    parser.add_argument("--module", default="server", help="Module to profile (default: server)")
+    parser.add_argument("--top", type=int, default=25, help="Number of entries to show")
+    parser.add_argument("--json", action="store_true", help="Emit machine-readable JSON")
+    args = parser.parse_args()
+
+    rows = profile_imports(args.module)
+    packages = summarize_by_package(rows)
+    top_level = [row for row in rows if row["depth"] == 0]
+    total_us = sum(row["cumulative_us"] for row in top_level)
+
+    if args.json:
+        print(json.dumps({
+            "module": args.module,
+            "total_ms": round(total_us / 1000, 2),
+            "packages": [
+                {"package": name, "self_ms": round(us / 1000, 2)}
+                for name, us in list(packages.items())[:args.top]
+            ],
+            "modules": sorted(rows, key=lambda r: r["cumulative_us"], reverse=True)[:args.top],
+        }, indent=2))
+        return
+
+    print(f"📦 Import profile for `import {args.module}`: {total_us / 1000:.1f}ms total")
+    print(f"\nTop {args.top} packages by self time:")
+    for name, us in list(packages.items())[:args.top]:
+        print(f"  {us / 1000:9.1f}ms  {name}")
+
+    print(f"\nTop {args.top} modules by cumulative time:")
+    for row in sorted(rows, key=lambda r: r["cumulative_us"], reverse=True)[:args.top]:
+        print(f"  {row['cumulative_us'] / 1000:9.1f}ms  {row['module']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import importlib
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LazyImportRegistry:
+    """Registry of integrations that are imported on first use instead of at startup"""
+
+    def __init__(self):
+        self._specs: Dict[str, Dict[str, Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._load_times: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, module: str, attr: Optional[str] = None, factory: Optional[Callable] = None):
+        """
+        Register a lazily loaded integration
+
+        Args:
+            name: Registry key used by callers (e.g. "paypal")
+            module: Dotted module path to import on first use
+            attr: Attribute to pull from the module (class or function)
+            factory: Optional callable receiving the resolved attribute and
+                returning the object to cache (e.g. a service instance)
+        """
+        self._specs[name] = {"module": module, "attr": attr, "factory": factory}
+
+    def get(self, name: str) -> Any:
+        """Resolve a registered integration, importing it on first access"""
+        if name in self._instances:
+            return self._instances[name]
+
+        with self._lock:
+            if name in self._instances:
+                return self._instances[name]
+
+            spec = self._specs.get(name)
+            if spec is None:
+                raise KeyError(f"No lazy integration registered as '{name}'")
+
+            started = time.perf_counter()
+            target = importlib.import_module(spec["module"])
+            if spec["attr"]:
+                target = getattr(target, spec["attr"])
+            if spec["factory"]:
+                target = spec["factory"](target)
+            elapsed = time.perf_counter() - started
+
+            self._instances[name] = target
+            self._load_times[name] = elapsed
+            logger.info(f"📦 Lazy-loaded '{name}' ({spec['module']}) in {elapsed * 1000:.1f}ms")
+            return target
+
+    def proxy(self, name: str) -> "LazyProxy":
+        """Return a stand-in object that resolves the integration on attribute access"""
+        return LazyProxy(self, name)
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._instances
+
+    def stats(self) -> Dict[str, Any]:
+        """Which integrations have been loaded so far and what they cost"""
+        return {
+            name: {
+                "module": spec["module"],
+                "loaded": name in self._instances,
+                "load_ms": round(self._load_times[name] * 1000, 2) if name in self._load_times else None,
+            }
+            for name, spec in self._specs.items()
+        }
+
+
+class LazyProxy:
+    """Forwards attribute access to a registry entry so call sites stay unchanged"""
+
+    def __init__(self, registry: LazyImportRegistry, name: str):
+        object.__setattr__(self, "_registry", registry)
+        object.__setattr__(self, "_name", name)
+
+    def __getattr__(self, item):
+        return getattr(self._registry.get(self._name), item)
+
+    def __repr__(self):
+        state = "loaded" if self._registry.is_loaded(self._name) else "not loaded"
+        return f"<LazyProxy {self._name} ({state})>"
+
+
+registry = LazyImportRegistry()
+
+# Payment and provider integrations that most requests never touch.
+# Stripe pulls in emergentintegrations (and with it litellm/google-genai),
+# PayPal pulls in its SDK and resend is only needed when an email goes out.
+registry.register("paypal", "paypal_service", "PayPalService", factory=lambda cls: cls())
+registry.register("email", "email_service", "EmailService", factory=lambda cls: cls())
+registry.register("stripe", "stripe_service", "StripePaymentService")
+registry.register("sportmonks", "sportmonks_service", "SportmonksService", factory=lambda cls: cls())
+registry.register("resend", "resend")
+
+
+def lazy_import(name: str) -> Any:
+    """Shortcut for registry.get()"""
+    return registry.get(name)
@@ -0,0 +1,182 @@
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError, OperationFailure
+
+logger = logging.getLogger(__name__)
+
+
+class LikeService:
+    """
+    Service for per-user likes on a counted target (posts, team messages).
+
+    One like document per (target, user) is enforced by a unique index, so
+    a like is a single upsert and concurrent taps can't double-count. The
+    target's counter moves only when a like document was actually inserted
+    or deleted, and the $inc returns the fresh count - two round trips per
+    like/unlike/toggle.
+    """
+
+    def __init__(self, database, likes_collection: str, target_collection: str,
+                 target_field: str, counter_field: str, live_filter: Optional[Dict] = None):
+        self.db = database
+        self.likes = database[likes_collection]
+        self.targets = database[target_collection]
+        self.target_field = target_field  # e.g. "post_id" on the like documents
+        self.counter_field = counter_field  # e.g. "likes_count" on the target
+        self.live_filter = live_filter or {}  # e.g. {"deleted_at": None}: soft-deleted targets don't exist
+
+    async def _bump(self, target_id: str, delta: int, scope: Optional[Dict]) -> Optional[int]:
+        target = await self.targets.find_one_and_update(
+            {"id": target_id, **self.live_filter, **(scope or {})},
+            {"$inc": {self.counter_field: delta}},
+            projection={"_id": 0, self.counter_field: 1},
+            return_document=ReturnDocument.AFTER
+        )
+        return max(target.get(self.counter_field, 0), 0) if target else None
+
+    async def _count(self, target_id: str, scope: Optional[Dict]) -> Optional[int]:
+        target = await self.targets.find_one({"id": target_id, **self.live_filter, **(scope or {})}, {"_id": 0, self.counter_field: 1})
+        return max(target.get(self.counter_field, 0), 0) if target else None
+
+    async def like(self, target_id: str, user_id: str, extra: Optional[Dict] = None,
+                   scope: Optional[Dict] = None) -> Tuple[bool, Optional[int]]:
+        """
+        Like a target
+
+        Args:
+            extra: Additional fields stored on a new like document
+            scope: Additional filter the target must match (e.g. team_id);
+                also stored on the like, so unlike() can match it
+
+        Returns:
+            (created, count) - created is False if the user already liked it;
+            count is None if the target does not exist
+        """
+        key = {self.target_field: target_id, "user_id": user_id}
+        try:
+            result = await self.likes.update_one(
+                key,
+                {"$setOnInsert": {
+                    "id": str(uuid.uuid4()),
+                    **key,
+                    **(extra or {}),
+                    **(scope or {}),
+                    "created_at": datetime.now(timezone.utc).isoformat()
+                }},
+                upsert=True
+            )
+            created = result.upserted_id is not None
+        except DuplicateKeyError:
+            # Lost an upsert race with the same user's other request
+            created = False
+
+        if not created:
+            return False, await self._count(target_id, scope)
+
+        count = await self._bump(target_id, 1, scope)
+        if count is None:
+            # Target doesn't exist - don't leave an orphaned like behind
+            await self.likes.delete_one(key)
+        return True, count
+
+    async def unlike(self, target_id: str, user_id: str, scope: Optional[Dict] = None) -> Tuple[bool, Optional[int]]:
+        """
+        Remove a like
+
+        Args:
+            scope: Filter the like (and its target) must match, as given to like()
+
+        Returns:
+            (removed, count) - removed is False if there was no like
+        """
+        result = await self.likes.delete_one({self.target_field: target_id, "user_id": user_id, **(scope or {})})
+        if not result.deleted_count:
+            return False, await self._count(target_id, scope)
+        return True, await self._bump(target_id, -1, scope)
+
+    async def toggle(self, target_id: str, user_id: str, extra: Optional[Dict] = None,
+                     scope: Optional[Dict] = None) -> Tuple[bool, Optional[int]]:
+        """
+        Flip the user's like
+
+        Tries the insert first: a duplicate key means the user had liked it,
+        so the like is deleted instead. Either way the counter $inc returns
+        the fresh count - two round trips.
+
+        Returns:
+            (liked, count) - the state after the toggle
+        """
+        key = {self.target_field: target_id, "user_id": user_id}
+        try:
+            await self.likes.insert_one({
+                "id": str(uuid.uuid4()),
+                **key,
+                **(extra or {}),
+                **(scope or {}),
+                "created_at": datetime.now(timezone.utc).isoformat()
+            })
+        except DuplicateKeyError:
+            # Already liked: this toggle is an unlike
+            result = await self.likes.delete_one({**key, **(scope or {})})
+            if not result.deleted_count:
+                # Removed by a concurrent request (or liked outside scope)
+                return False, await self._count(target_id, scope)
+            return False, await self._bump(target_id, -1, scope)
+
+        count = await self._bump(target_id, 1, scope)
+        if count is None:
+            # Target doesn't exist - don't leave an orphaned like behind
+            await self.likes.delete_one(key)
+        return True, count
+
+    async def dedupe(self) -> int:
+        """
+        Remove duplicate like documents and resync the affected counters
+
+        Returns:
+            Number of duplicate likes removed
+        """
+        pipeline = [
+            {"$group": {
+                "_id": {"target": f"${self.target_field}", "user_id": "$user_id"},
+                "ids": {"$push": "$_id"},
+                "count": {"$sum": 1}
+            }},
+            {"$match": {"count": {"$gt": 1}}}
+        ]
+        removed = 0
+        affected = set()
+        async for row in self.likes.aggregate(pipeline, allowDiskUse=True):
+            result = await self.likes.delete_many({"_id": {"$in": row["ids"][1:]}})
+            removed += result.deleted_count
+            affected.add(row["_id"]["target"])
+
+        for target_id in affected:
+            count = await self.likes.count_documents({self.target_field: target_id})
+            await self.targets.update_one({"id": target_id}, {"$set": {self.counter_field: count}})
+        return removed
+
+    async def ensure_indexes(self):
+        # Replace a plain (non-unique) index on the same keys
+        name = f"{self.target_field}_1_user_id_1"
+        existing = (await self.likes.index_information()).get(name)
+        if existing and not existing.get("unique"):
+            await self.likes.drop_index(name)
+        try:
+            await self.likes.create_index([(self.target_field, 1), ("user_id", 1)], unique=True)
+        except OperationFailure:
+            removed = await self.dedupe()
+            logger.warning(f"⚠️ Removed {removed} duplicate likes from {self.likes.name} before indexing")
+            await self.likes.create_index([(self.target_field, 1), ("user_id", 1)], unique=True)
+
+
+def post_likes(database) -> LikeService:
+    return LikeService(database, "likes", "posts", "post_id", "likes_count", live_filter={"deleted_at": None})
+
+
+def message_likes(database) -> LikeService:
+    return LikeService(database, "team_message_likes", "team_messages", "message_id", "likes")
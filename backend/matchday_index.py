@@ -0,0 +1,199 @@
+import logging
+import re
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from pymongo import ReplaceOne, ReturnDocument, UpdateOne
+
+from matchweek_service import invalidate_matchweek_cache
+
+logger = logging.getLogger(__name__)
+
+# Fields a fixture's matchday summary depends on
+SUMMARY_FIELDS = {"_id": 0, "league_id": 1, "round_type": 1, "round_number": 1, "round_name": 1, "status": 1}
+
+ORDINALS = {
+    "first": 1, "second": 2, "third": 3, "fourth": 4, "fifth": 5,
+    "sixth": 6, "seventh": 7, "eighth": 8, "ninth": 9, "tenth": 10,
+}
+
+_NUMBER = re.compile(r"(\d+)(?:st|nd|rd|th)?$", re.IGNORECASE)
+
+
+def parse_round(matchday: Any) -> Tuple[str, int]:
+    """
+    Normalize a provider round label to (round_type, round_number)
+
+    "21" / 21 / "Regular Season - 21" -> ("regular_season", 21)
+    "Group Stage - 2"                 -> ("group_stage", 2)
+    "Third Round"                     -> ("round", 3)
+    "Final"                           -> ("final", 0)
+    """
+    if matchday is None:
+        return "unknown", 0
+    if isinstance(matchday, int):
+        return "regular_season", matchday
+    label = str(matchday).strip()
+    if not label or label.lower() == "none":
+        return "unknown", 0
+    if label.isdigit():
+        return "regular_season", int(label)
+
+    words = [w for w in re.split(r"[\s\-_]+", label.lower()) if w]
+    # The last numeric word is the round ("1st Phase - 16" is round 16)
+    number, position = 0, None
+    for i, word in enumerate(words):
+        match = _NUMBER.match(word)
+        if match:
+            number, position = int(match.group(1)), i
+        elif word in ORDINALS and position is None:
+            number, position = ORDINALS[word], i
+    rest = [w for i, w in enumerate(words) if i != position]
+    return "_".join(rest) or "regular_season", number
+
+
+def round_fields(matchday: Any) -> Dict:
+    round_type, round_number = parse_round(matchday)
+    return {"round_type": round_type, "round_number": round_number,
+            "round_name": str(matchday).strip() if matchday is not None else None}
+
+
+def matchday_key(fixture: Optional[Dict]) -> Optional[str]:
+    if not fixture or fixture.get("league_id") is None or "round_type" not in fixture:
+        return None
+    return f"{fixture['league_id']}:{fixture['round_type']}:{fixture.get('round_number', 0)}"
+
+
+def matchday_filter(matchday: str) -> Dict:
+    """Fixture query for a ?matchday= value ("10", "Regular Season - 10", "Final")"""
+    round_type, round_number = parse_round(matchday)
+    if str(matchday).strip().isdigit():
+        return {"round_number": round_number}
+    query = {"round_type": round_type}
+    if round_number:
+        query["round_number"] = round_number
+    return query
+
+
+class MatchdayIndex:
+    """
+    Service for normalized rounds and the per-league matchdays summary.
+
+    Fixture writes go through here, so it also invalidates cached matchweeks.
+
+    Fixtures carry an integer round_number and a round_type parsed from the
+    provider's matchday label, indexed with league_id. The matchdays
+    collection keeps one document per (league, round) with total and
+    finished counts. Writes that go through upsert_fixture() adjust those
+    counts from the fixture's before/after state; rebuild() recomputes
+    them after bulk deletes or imports.
+    """
+
+    def __init__(self, database):
+        self.db = database
+
+    async def upsert_fixture(self, fixture: Dict, upsert: bool = True) -> Optional[Dict]:
+        """
+        $set fields on a fixture (by fixture_id) and keep its matchday summary in step
+
+        Returns:
+            The fixture's summary fields before the write (None if it was new)
+        """
+        fields = dict(fixture)
+        if "matchday" in fields:
+            fields.update(round_fields(fields["matchday"]))
+        before = await self.db.fixtures.find_one_and_update(
+            {"fixture_id": fixture["fixture_id"]},
+            {"$set": fields},
+            projection=SUMMARY_FIELDS,
+            upsert=upsert,
+            return_document=ReturnDocument.BEFORE
+        )
+        if before is not None or upsert:
+            after = {**(before or {}), **{k: v for k, v in fields.items() if k in SUMMARY_FIELDS}}
+            await self.apply_change(before, after)
+            invalidate_matchweek_cache()
+        return before
+
+    async def apply_change(self, before: Optional[Dict], after: Optional[Dict]):
+        """Move one fixture's contribution from its old summary to its new one"""
+        old_key, new_key = matchday_key(before), matchday_key(after)
+        old_finished = bool(before) and before.get("status") == "FINISHED"
+        new_finished = bool(after) and after.get("status") == "FINISHED"
+        if old_key == new_key and old_finished == new_finished:
+            return
+
+        ops = []
+        if old_key == new_key:
+            ops.append(UpdateOne({"_id": new_key}, {"$inc": {"finished": 1 if new_finished else -1}}))
+        else:
+            if old_key:
+                ops.append(UpdateOne({"_id": old_key}, {"$inc": {"total": -1, "finished": -int(old_finished)}}))
+            if new_key:
+                ops.append(UpdateOne(
+                    {"_id": new_key},
+                    {"$inc": {"total": 1, "finished": int(new_finished)},
+                     "$setOnInsert": {"league_id": after["league_id"], "round_type": after["round_type"],
+                                      "round_number": after.get("round_number", 0),
+                                      "round_name": after.get("round_name")}},
+                    upsert=True
+                ))
+        await self.db.matchdays.bulk_write(ops, ordered=False)
+        if old_key and old_key != new_key:
+            await self.db.matchdays.delete_one({"_id": old_key, "total": {"$lte": 0}})
+
+    async def get_matchdays(self, league_id: int):
+        return await self.db.matchdays.find(
+            {"league_id": league_id, "total": {"$gt": 0}}, {"_id": 0}
+        ).sort([("round_number", 1), ("round_type", 1)]).to_list(None)
+
+    async def backfill_rounds(self) -> int:
+        """Parse round_number/round_type for fixtures stored before they existed"""
+        ops = []
+        async for fixture in self.db.fixtures.find(
+            {"round_type": {"$exists": False}}, {"_id": 1, "matchday": 1}
+        ):
+            ops.append(UpdateOne({"_id": fixture["_id"]}, {"$set": round_fields(fixture.get("matchday"))}))
+        if ops:
+            await self.db.fixtures.bulk_write(ops, ordered=False)
+            logger.info(f"🗓️ Normalized rounds on {len(ops)} fixtures")
+        return len(ops)
+
+    async def rebuild(self, league_ids: Optional[Iterable[int]] = None) -> int:
+        """Recompute matchday summaries from the fixtures (all leagues, or just these)"""
+        match = {"league_id": {"$ne": None}, "round_type": {"$exists": True}}
+        if league_ids is not None:
+            match["league_id"] = {"$in": list(league_ids)}
+        summaries = await self.db.fixtures.aggregate([
+            {"$match": match},
+            {"$group": {
+                "_id": {"league_id": "$league_id", "round_type": "$round_type", "round_number": "$round_number"},
+                "round_name": {"$first": "$round_name"},
+                "total": {"$sum": 1},
+                "finished": {"$sum": {"$cond": [{"$eq": ["$status", "FINISHED"]}, 1, 0]}},
+            }},
+        ]).to_list(None)
+
+        docs = {}
+        for s in summaries:
+            doc = {**s["_id"], "round_name": s["round_name"], "total": s["total"], "finished": s["finished"]}
+            docs[matchday_key(doc)] = doc
+        if docs:
+            await self.db.matchdays.bulk_write(
+                [ReplaceOne({"_id": key}, doc, upsert=True) for key, doc in docs.items()], ordered=False
+            )
+        # Rounds that no longer have fixtures
+        scope = {} if league_ids is None else {"league_id": match["league_id"]}
+        await self.db.matchdays.delete_many({**scope, "_id": {"$nin": list(docs)}})
+        return len(docs)
+
+    async def resync(self, league_ids: Optional[Iterable[int]] = None) -> int:
+        """After writes that bypass upsert_fixture (bulk imports, deletes)"""
+        await self.backfill_rounds()
+        invalidate_matchweek_cache()
+        return await self.rebuild(league_ids)
+
+    async def ensure_indexes(self):
+        await self.db.fixtures.create_index([("league_id", 1), ("round_number", 1)])
+        await self.db.fixtures.create_index([("league_id", 1), ("round_type", 1), ("round_number", 1)])
+        await self.db.matchdays.create_index([("league_id", 1), ("round_number", 1)])
+        await self.resync()
@@ -1,15 +1,67 @@
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import logging
+import time
+
+from date_codec import as_utc
 
 logger = logging.getLogger(__name__)
 
+MATCHWEEK_CACHE_SECONDS = 300
+
+# Statuses still shown in a matchweek (finished/called-off fixtures drop out)
+INACTIVE_STATUSES = ["FINISHED", "POSTPONED", "CANCELLED", "ABANDONED", "AWARDED"]
+
+# (league_id, days_ahead) -> (matchweek infos, loaded_at); cleared on fixture ingestion
+_cache: Dict[Tuple[int, int], Tuple[List[Dict], float]] = {}
+
+
+def invalidate_matchweek_cache():
+    """Drop cached matchweeks after fixtures are written"""
+    _cache.clear()
+
+
+def kickoff_of(fixture: Dict) -> Optional[datetime]:
+    """Aware UTC kickoff from a stored fixture (utc_date) or a Football-Data one (utcDate)"""
+    return as_utc(fixture.get('utc_date') or fixture.get('utcDate'))
+
 
 class MatchweekService:
     """Service for managing matchweek-based cycles"""
     
-    def __init__(self):
-        pass
+    def __init__(self, database=None):
+        self.db = database
+    
+    async def load_matchweeks(self, league_id: int = 39, days_ahead: int = 14) -> List[Dict]:
+        """
+        Matchweek windows for a league's upcoming fixtures, from db.fixtures
+        
+        Grouped once and cached for MATCHWEEK_CACHE_SECONDS or until
+        invalidate_matchweek_cache() is called by fixture ingestion.
+        Returns get_matchweek_info() dicts ordered by first kickoff.
+        """
+        key = (league_id, days_ahead)
+        cached = _cache.get(key)
+        if cached and time.monotonic() - cached[1] < MATCHWEEK_CACHE_SECONDS:
+            return cached[0]
+        
+        # Stored as naive UTC
+        today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+        fixtures = await self.db.fixtures.find(
+            {
+                "league_id": league_id,
+                "utc_date": {"$gte": today, "$lt": today + timedelta(days=days_ahead + 1)},
+                "status": {"$nin": INACTIVE_STATUSES}
+            },
+            {"_id": 0, "fixture_id": 1, "utc_date": 1, "round_number": 1, "matchday": 1, "status": 1}
+        ).sort("utc_date", 1).to_list(None)
+        
+        matchweeks = [
+            self.get_matchweek_info(fixtures, matchweek)
+            for matchweek in self.get_matchweek_from_fixtures(fixtures)
+        ]
+        _cache[key] = (matchweeks, time.monotonic())
+        return matchweeks
     
     def get_matchweek_from_fixtures(self, fixtures: List[Dict]) -> Dict[str, List[Dict]]:
         """
@@ -19,8 +71,10 @@ class MatchweekService:
         matchweeks = {}
         
         for fixture in fixtures:
-            # Football-Data.org provides 'matchday' or 'season.currentMatchday'
-            matchday = fixture.get('matchday') or fixture.get('season', {}).get('currentMatchday', 'Unknown')
+            # Stored fixtures carry a normalized round_number; Football-Data.org
+            # provides 'matchday' or 'season.currentMatchday'
+            matchday = (fixture.get('round_number') or fixture.get('matchday')
+                        or fixture.get('season', {}).get('currentMatchday', 'Unknown'))
             matchweek_key = f"Matchweek {matchday}"
             
             if matchweek_key not in matchweeks:
@@ -46,8 +100,7 @@ class MatchweekService:
         # Find matchweek that contains today or is upcoming
         for matchweek, week_fixtures in sorted(matchweeks.items()):
             # Get date range for this matchweek
-            dates = [datetime.fromisoformat(f.get('utcDate', '').replace('Z', '+00:00')) 
-                    for f in week_fixtures if f.get('utcDate')]
+            dates = [kickoff_of(f) for f in week_fixtures if kickoff_of(f)]
             
             if not dates:
                 continue
@@ -80,8 +133,7 @@ class MatchweekService:
             }
         
         # Get date range
-        dates = [datetime.fromisoformat(f.get('utcDate', '').replace('Z', '+00:00')) 
-                for f in week_fixtures if f.get('utcDate')]
+        dates = [kickoff_of(f) for f in week_fixtures if kickoff_of(f)]
         
         if not dates:
             return {
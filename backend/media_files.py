@@ -0,0 +1,142 @@
+import hashlib
+import mimetypes
+import os
+import re
+from typing import Optional, Tuple
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Receive, Scope, Send
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Only these are worth precompressing - images and videos already are compressed
+COMPRESSIBLE_TYPES = {"image/svg+xml", "application/json", "text/plain", "text/csv"}
+PRECOMPRESSED_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+_SHA256_NAME = re.compile(r"^[0-9a-f]{64}$")
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def strong_etag(path: str, stat_result: os.stat_result) -> str:
+    """Content hash for content-addressed names, otherwise a hash of name/size/mtime"""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    if _SHA256_NAME.match(stem):
+        return f'"{stem}"'
+    raw = f"{os.path.basename(path)}-{stat_result.st_size}-{stat_result.st_mtime_ns}"
+    return f'"{hashlib.sha256(raw.encode()).hexdigest()[:32]}"'
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single "bytes=start-end" range
+
+    Returns:
+        (start, end) inclusive, or None when the range can't be satisfied
+
+    Raises:
+        ValueError: the header is not a single byte range (serve the whole file)
+    """
+    match = _RANGE.match(header.strip())
+    if not match or (not match.group(1) and not match.group(2)):
+        raise ValueError(header)
+    first, last = match.groups()
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return None
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return None
+    return start, end
+
+
+class RangeFileResponse(Response):
+    """206 response streaming bytes start..end (inclusive) of a file"""
+
+    chunk_size = 64 * 1024
+
+    def __init__(self, path: str, start: int, end: int, size: int, headers: dict, media_type: str):
+        super().__init__(status_code=206, headers=headers, media_type=media_type)
+        self.path = path
+        self.start = start
+        self.end = end
+        self.headers["content-range"] = f"bytes {start}-{end}/{size}"
+        self.headers["content-length"] = str(end - start + 1)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope["method"].upper() == "HEAD":
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        remaining = self.end - self.start + 1
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            await file.seek(self.start)
+            while remaining > 0:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+        if remaining > 0:
+            # File shrank underneath us - close the body
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+class MediaFiles(StaticFiles):
+    """
+    StaticFiles for /api/uploads.
+
+    Uploads are stored as <sha256><ext> (or a UUID name for older files) and
+    a name never gets new content, so responses are cached as immutable for
+    a year with a strong ETag. Single byte ranges are served as 206 so video
+    seeking doesn't re-download the file, and a .br/.gz sibling of a
+    compressible file is sent when the client accepts that encoding.
+    """
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        path = str(full_path)
+        etag = strong_etag(path, stat_result)
+        media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        headers = {
+            "cache-control": IMMUTABLE_CACHE_CONTROL,
+            "etag": etag,
+            "accept-ranges": "bytes",
+        }
+
+        if etag in [tag.strip().removeprefix("W/") for tag in request_headers.get("if-none-match", "").split(",")]:
+            return NotModifiedResponse(Headers(headers))
+
+        if status_code == 200 and media_type in COMPRESSIBLE_TYPES:
+            accepted = request_headers.get("accept-encoding", "")
+            headers["vary"] = "Accept-Encoding"
+            for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+                if encoding in accepted and os.path.isfile(path + suffix):
+                    return FileResponse(
+                        path + suffix, media_type=media_type,
+                        headers={**headers, "content-encoding": encoding, "accept-ranges": "none"}
+                    )
+
+        range_header = request_headers.get("range")
+        if status_code == 200 and range_header:
+            if_range = request_headers.get("if-range")
+            if if_range is None or if_range.strip() == etag:
+                size = stat_result.st_size
+                try:
+                    byte_range = parse_range(range_header, size)
+                except ValueError:
+                    byte_range = (0, size - 1) if size else None
+                if byte_range is None:
+                    return Response(status_code=416, headers={**headers, "content-range": f"bytes */{size}"})
+                start, end = byte_range
+                return RangeFileResponse(path, start, end, size, headers, media_type)
+
+        return FileResponse(path, status_code=status_code, stat_result=stat_result,
+                            headers=headers, media_type=media_type)
+
@@ -0,0 +1,274 @@
+import asyncio
+import logging
+import mimetypes
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional
+
+from starlette._utils import get_route_path
+from starlette.responses import RedirectResponse
+from starlette.types import Receive, Scope, Send
+
+from media_files import IMMUTABLE_CACHE_CONTROL, MediaFiles
+from upload_pipeline import MAX_UPLOAD_BYTES, cleanup_partials, partial_dir, save_upload
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_UPLOAD_DIR = "/app/backend/uploads"
+PRESIGN_EXPIRES_SECONDS = 15 * 60
+# Scratch entries older than this belong to no live upload (the temp dir may be shared)
+STALE_SCRATCH_SECONDS = 6 * 3600
+
+
+def remove_stale_entries(directory: Path, max_age: float = STALE_SCRATCH_SECONDS) -> int:
+    """Delete entries of directory not modified for max_age seconds"""
+    if not directory.exists():
+        return 0
+    cutoff = time.time() - max_age
+    removed = 0
+    for path in directory.iterdir():
+        try:
+            if path.stat().st_mtime >= cutoff:
+                continue
+        except FileNotFoundError:
+            continue
+        if path.is_dir():
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            path.unlink(missing_ok=True)
+        removed += 1
+    return removed
+
+
+class DirectUploadsUnsupported(Exception):
+    """The storage backend can't take uploads that bypass the API"""
+
+
+class LocalStorage:
+    """
+    Uploads on the pod's disk, served by MediaFiles.
+
+    Fine for a single replica and for development; use S3Storage (or MinIO
+    through S3_ENDPOINT_URL) once the API runs on more than one pod.
+    """
+
+    name = "local"
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    async def save(self, upload, file_ext: str, max_bytes: int = MAX_UPLOAD_BYTES) -> Dict:
+        return await save_upload(upload, self.root, file_ext, max_bytes=max_bytes)
+
+    @asynccontextmanager
+    async def local_copy(self, key: str) -> AsyncIterator[Path]:
+        yield self.root / key
+
+    @asynccontextmanager
+    async def scratch_dir(self) -> AsyncIterator[Path]:
+        """Temp directory on the same filesystem, so put_file is a rename"""
+        path = partial_dir(self.root) / uuid.uuid4().hex
+        path.mkdir(parents=True)
+        try:
+            yield path
+        finally:
+            shutil.rmtree(path, ignore_errors=True)
+
+    async def put_file(self, path: Path, key: str):
+        target = self.root / key
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if Path(path) != target:
+            await asyncio.to_thread(shutil.move, str(path), str(target))
+
+    async def list_keys(self) -> List[str]:
+        return sorted(p.name for p in self.root.iterdir() if p.is_file())
+
+    async def size(self, key: str) -> Optional[int]:
+        path = self.root / key
+        return path.stat().st_size if path.is_file() else None
+
+    async def delete(self, key: str):
+        (self.root / key).unlink(missing_ok=True)
+
+    async def create_direct_upload(self, file_ext: str, content_type: str, max_bytes: int = MAX_UPLOAD_BYTES) -> Dict:
+        raise DirectUploadsUnsupported("Direct uploads need STORAGE_BACKEND=s3")
+
+    def asgi_app(self):
+        return MediaFiles(directory=str(self.root))
+
+    def cleanup(self) -> int:
+        """Remove stale temp files left by uploads interrupted by a restart"""
+        removed = cleanup_partials(self.root)
+        scratch = partial_dir(self.root)
+        if scratch.exists():
+            removed += remove_stale_entries(scratch)
+        return removed
+
+
+class S3Storage:
+    """
+    Uploads in an S3-compatible bucket (AWS S3, MinIO, R2...).
+
+    Files keep the same /api/uploads/<key> URLs as local storage; that mount
+    redirects to the bucket (or S3_PUBLIC_URL, e.g. a CDN), so stored URLs
+    don't change when switching backends. boto3 calls are blocking and run
+    in threads.
+    """
+
+    name = "s3"
+
+    def __init__(self, bucket: str, prefix: str = "", region: Optional[str] = None,
+                 endpoint_url: Optional[str] = None, public_url: Optional[str] = None, client=None):
+        if client is None:
+            import boto3
+            from botocore.config import Config
+            client = boto3.client(
+                "s3", region_name=region, endpoint_url=endpoint_url,
+                config=Config(signature_version="s3v4", retries={"max_attempts": 3, "mode": "standard"})
+            )
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+        self.public_url = (public_url or "").rstrip("/") or None
+        self.tmp_dir = Path(tempfile.gettempdir()) / "hadfun-uploads"
+
+    def object_key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    async def save(self, upload, file_ext: str, max_bytes: int = MAX_UPLOAD_BYTES) -> Dict:
+        """Spool to a temp file (for the size limit and hash), then push to the bucket"""
+        async with self.scratch_dir() as scratch:
+            # save_upload's .partial dir sits next to spool, so it goes with the scratch dir too
+            spool = scratch / "spool"
+            spool.mkdir()
+            saved = await save_upload(upload, spool, file_ext, max_bytes=max_bytes)
+            saved["deduplicated"] = await self.size(saved["filename"]) is not None
+            if not saved["deduplicated"]:
+                await self.put_file(spool / saved["filename"], saved["filename"],
+                                    content_type=getattr(upload, "content_type", None))
+        return saved
+
+    @asynccontextmanager
+    async def scratch_dir(self) -> AsyncIterator[Path]:
+        path = self.tmp_dir / uuid.uuid4().hex
+        path.mkdir(parents=True)
+        try:
+            yield path
+        finally:
+            shutil.rmtree(path, ignore_errors=True)
+
+    @asynccontextmanager
+    async def local_copy(self, key: str) -> AsyncIterator[Path]:
+        async with self.scratch_dir() as scratch:
+            path = scratch / Path(key).name
+            await asyncio.to_thread(self.client.download_file, self.bucket, self.object_key(key), str(path))
+            yield path
+
+    async def put_file(self, path: Path, key: str, content_type: Optional[str] = None):
+        extra = {
+            "ContentType": content_type or mimetypes.guess_type(key)[0] or "application/octet-stream",
+            "CacheControl": IMMUTABLE_CACHE_CONTROL,
+        }
+        # upload_file switches to multipart for large videos
+        await asyncio.to_thread(self.client.upload_file, str(path), self.bucket, self.object_key(key), ExtraArgs=extra)
+
+    async def list_keys(self) -> List[str]:
+        def _list():
+            keys = []
+            paginator = self.client.get_paginator("list_objects_v2")
+            for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix, Delimiter="/"):
+                keys.extend(obj["Key"][len(self.prefix):] for obj in page.get("Contents", []))
+            return sorted(keys)
+        return await asyncio.to_thread(_list)
+
+    async def size(self, key: str) -> Optional[int]:
+        from botocore.exceptions import ClientError
+        try:
+            head = await asyncio.to_thread(self.client.head_object, Bucket=self.bucket, Key=self.object_key(key))
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        return head["ContentLength"]
+
+    async def delete(self, key: str):
+        await asyncio.to_thread(self.client.delete_object, Bucket=self.bucket, Key=self.object_key(key))
+
+    async def create_direct_upload(self, file_ext: str, content_type: str, max_bytes: int = MAX_UPLOAD_BYTES) -> Dict:
+        """
+        Presigned POST so the browser uploads straight to the bucket
+
+        The size limit and content type are part of the signed policy, so S3
+        rejects anything else. Direct uploads can't be hashed in transit and
+        get a UUID name instead of a content hash.
+
+        Returns:
+            Dict with key, url and fields for a multipart/form-data POST
+        """
+        key = f"{uuid.uuid4()}{file_ext}"
+        post = await asyncio.to_thread(
+            self.client.generate_presigned_post,
+            Bucket=self.bucket,
+            Key=self.object_key(key),
+            Fields={"Content-Type": content_type, "Cache-Control": IMMUTABLE_CACHE_CONTROL},
+            Conditions=[
+                ["content-length-range", 1, max_bytes],
+                {"Content-Type": content_type},
+                {"Cache-Control": IMMUTABLE_CACHE_CONTROL},
+            ],
+            ExpiresIn=PRESIGN_EXPIRES_SECONDS
+        )
+        return {"key": key, "url": post["url"], "fields": post["fields"], "expires_in": PRESIGN_EXPIRES_SECONDS}
+
+    def url_for(self, key: str) -> str:
+        if self.public_url:
+            return f"{self.public_url}/{self.object_key(key)}"
+        return self.client.generate_presigned_url(
+            "get_object", Params={"Bucket": self.bucket, "Key": self.object_key(key)},
+            ExpiresIn=24 * 3600
+        )
+
+    def asgi_app(self):
+        storage = self
+
+        async def redirect(scope: Scope, receive: Receive, send: Send):
+            # Under a Mount, scope["path"] still has the mount prefix
+            key = get_route_path(scope).lstrip("/")
+            response = RedirectResponse(storage.url_for(key), status_code=302)
+            # Presigned URLs expire; only public ones can be cached for long
+            response.headers["cache-control"] = "public, max-age=86400" if storage.public_url else "private, max-age=3600"
+            await response(scope, receive, send)
+
+        return redirect
+
+    def cleanup(self) -> int:
+        """Remove scratch dirs left by interrupted uploads (other workers share tmp_dir)"""
+        return remove_stale_entries(self.tmp_dir)
+
+
+def storage_from_env():
+    """
+    Build the storage backend from the environment
+
+    STORAGE_BACKEND=local (default) uses UPLOAD_DIR. STORAGE_BACKEND=s3
+    uses S3_BUCKET, S3_PREFIX, S3_REGION, S3_PUBLIC_URL and S3_ENDPOINT_URL
+    (set the latter to a MinIO server for a local S3 stand-in).
+    """
+    backend = os.environ.get("STORAGE_BACKEND", "local").lower()
+    if backend == "s3":
+        storage = S3Storage(
+            bucket=os.environ["S3_BUCKET"],
+            prefix=os.environ.get("S3_PREFIX", "uploads"),
+            region=os.environ.get("S3_REGION"),
+            endpoint_url=os.environ.get("S3_ENDPOINT_URL"),
+            public_url=os.environ.get("S3_PUBLIC_URL")
+        )
+        logger.info(f"🪣 Upload storage: s3://{storage.bucket}/{storage.prefix}")
+        return storage
+    return LocalStorage(Path(os.environ.get("UPLOAD_DIR", DEFAULT_UPLOAD_DIR)))
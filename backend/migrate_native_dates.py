@@ -0,0 +1,119 @@
+"""
+Schema normalization: store dates as native BSON dates.
+
+Converts legacy ISO-string values to BSON dates (naive UTC, see date_codec)
+for the fields below, and backfills fixtures.utc_date from match_date where
+it is missing. Safe to run repeatedly - only string values are touched.
+Runs in the background at server startup; can also be run by hand:
+
+    python migrate_native_dates.py
+"""
+import asyncio
+import logging
+import os
+from typing import Dict
+
+from pymongo import UpdateOne
+
+from date_codec import to_bson_datetime
+
+logger = logging.getLogger(__name__)
+
+NATIVE_DATE_FIELDS = {
+    "predictions": ["created_at"],
+    "fixtures": ["utc_date"],
+    "promo_codes": ["valid_from", "valid_until"],
+}
+
+
+async def _convert_field(db, collection: str, field: str, batch_size: int) -> int:
+    converted = 0
+    ops = []
+    cursor = db[collection].find({field: {"$type": "string"}}, {field: 1})
+    async for doc in cursor:
+        value = to_bson_datetime(doc.get(field))
+        if value is None:
+            logger.warning(f"⚠️ {collection}.{field}: unparseable value on {doc['_id']}: {doc.get(field)!r}")
+            continue
+        ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {field: value}}))
+        if len(ops) >= batch_size:
+            await db[collection].bulk_write(ops, ordered=False)
+            converted += len(ops)
+            ops = []
+    if ops:
+        await db[collection].bulk_write(ops, ordered=False)
+        converted += len(ops)
+    return converted
+
+
+async def _backfill_fixture_dates(db, batch_size: int) -> int:
+    """Fixtures with no utc_date but a match_date get utc_date from it"""
+    filled = 0
+    ops = []
+    cursor = db.fixtures.find(
+        {"$or": [{"utc_date": None}, {"utc_date": {"$exists": False}}], "match_date": {"$nin": [None, ""]}},
+        {"match_date": 1}
+    )
+    async for doc in cursor:
+        value = to_bson_datetime(doc.get("match_date"))
+        if value is None:
+            continue
+        ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"utc_date": value}}))
+        if len(ops) >= batch_size:
+            await db.fixtures.bulk_write(ops, ordered=False)
+            filled += len(ops)
+            ops = []
+    if ops:
+        await db.fixtures.bulk_write(ops, ordered=False)
+        filled += len(ops)
+    return filled
+
+
+async def ensure_date_indexes(db):
+    """Indexes for the date range queries that native dates make possible"""
+    await db.predictions.create_index("created_at")
+    await db.predictions.create_index([("user_id", 1), ("created_at", -1)])
+    await db.fixtures.create_index("utc_date")
+    await db.fixtures.create_index([("league_id", 1), ("utc_date", 1)])
+
+
+async def migrate_native_dates(db, batch_size: int = 500) -> Dict[str, int]:
+    """
+    Convert string dates to BSON dates
+
+    Returns:
+        Number of documents converted per collection.field
+    """
+    results = {}
+    for collection, fields in NATIVE_DATE_FIELDS.items():
+        for field in fields:
+            results[f"{collection}.{field}"] = await _convert_field(db, collection, field, batch_size)
+    results["fixtures.utc_date_backfilled"] = await _backfill_fixture_dates(db, batch_size)
+    await ensure_date_indexes(db)
+
+    if any(results.values()):
+        logger.info(f"📅 Native date migration: {results}")
+    return results
+
+
+async def main():
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    load_dotenv()
+    mongo_url = os.getenv('MONGO_URL', 'mongodb://localhost:27017')
+    db_name = os.getenv('DB_NAME', 'predictions')
+
+    client = AsyncIOMotorClient(mongo_url)
+    db = client[db_name]
+
+    print("Converting string dates to native BSON dates...")
+    results = await migrate_native_dates(db)
+    for key, count in results.items():
+        print(f"✅ {key}: {count}")
+
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
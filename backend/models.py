@@ -20,6 +20,7 @@ class User(BaseModel):
     bio: Optional[str] = None
     birthdate: Optional[str] = None  # YYYY-MM-DD format
     avatar_url: Optional[str] = None
+    avatar_thumb_url: Optional[str] = None  # 320px WebP of avatar_url, set once generated
     location: Optional[str] = None
     favorite_team: Optional[str] = None
     favorite_leagues: List[int] = []  # List of league IDs
@@ -206,6 +207,12 @@ class PromoCodeUsage(BaseModel):
     user_id: str
     user_email: str
     team_id: Optional[str] = None
+    team_name: Optional[str] = None
+    payment_amount: float = 0.0
+    discount_applied: float = 0.0
+    referred_by: Optional[str] = None
+    use_number: int = 1  # Nth use by this user; unique with (promo_code, user_email)
+    used_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 
 # ========== SOCIAL FEATURE MODELS ==========
@@ -278,6 +285,27 @@ class Like(BaseModel):
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 
+class FeedPost(Post):
+    comments_preview: List[Comment] = []  # Latest comments, newest first
+    liked_by_me: bool = False
+    image_variants: List[dict] = []  # Per entry in images: {"thumb": url, "medium": url} ({} if not generated)
+    author_avatar_thumb: Optional[str] = None
+
+
+class FeedPage(BaseModel):
+    posts: List[FeedPost]
+    next_cursor: Optional[str] = None  # Pass back as ?cursor= for the next page; None on the last page
+
+
+class DirectUploadRequest(BaseModel):
+    filename: str
+    content_type: str
+
+
+class DirectUploadComplete(BaseModel):
+    key: str
+
+
 class PromoCodeValidation(BaseModel):
     code: str
     user_email: str
@@ -0,0 +1,214 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+# In-process waiters for long-poll/SSE clients, keyed by user_id. Writes made
+# by this worker wake them immediately; writes from other workers are picked
+# up by the periodic counter read in wait_for_change.
+_waiters: Dict[str, Set[asyncio.Event]] = {}
+
+
+class NotificationService:
+    """
+    Service for the in-app notification inbox.
+
+    Notifications are fanned out on write: a broadcast becomes one
+    insert_many plus one bulk_write of counter increments. Each user has a
+    document in notification_counters ({"_id": user_id, "unread": n}) that is
+    kept in step with $inc, so the unread badge is a single point read.
+
+    Counters are created lazily by unread_count. Every notification carries
+    a "counted" flag saying whether its user's counter includes it, and
+    whoever flips it from False to True does the matching $inc: writers for
+    users whose counter already exists, the seeder for everything else. A
+    notification is therefore counted exactly once, whichever way a write
+    and the first unread_count interleave. Notifications stored before the
+    flag existed count as already counted by a counter that exists.
+    """
+
+    def __init__(self, database):
+        self.db = database
+
+    @staticmethod
+    def build(user_id: str, notification_type: str, title: str, message: str, data: dict = None) -> Dict:
+        return {
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "type": notification_type,  # 'winner', 'loser', 'tie', 'weekly_summary', 'match_rescheduled'
+            "title": title,
+            "message": message,
+            "data": data or {},
+            "read": False,
+            "created_at": datetime.now(timezone.utc).isoformat()
+        }
+
+    async def insert_many(self, notifications: List[Dict]) -> int:
+        """
+        Store pre-built notification documents and bump unread counters
+
+        Returns:
+            Number of notifications stored
+        """
+        if not notifications:
+            return 0
+        per_user: Dict[str, int] = {}
+        for notification in notifications:
+            if not notification.get("read"):
+                per_user[notification["user_id"]] = per_user.get(notification["user_id"], 0) + 1
+
+        # Users without a counter yet are left to the seeder in unread_count
+        seeded = await self._existing_counters(per_user)
+        for notification in notifications:
+            notification["counted"] = notification["user_id"] in seeded
+        await self.db.notifications.insert_many(notifications, ordered=False)
+
+        if seeded:
+            await self.db.notification_counters.bulk_write(
+                [UpdateOne({"_id": uid}, {"$inc": {"unread": per_user[uid]}}) for uid in seeded],
+                ordered=False
+            )
+        # A counter seeded between the check and the insert missed these rows: claim them
+        for uid in await self._existing_counters([uid for uid in per_user if uid not in seeded]):
+            ids = [n["id"] for n in notifications if n["user_id"] == uid]
+            await self._claim_uncounted(uid, {"id": {"$in": ids}})
+        if per_user:
+            _wake(per_user)
+        return len(notifications)
+
+    async def _existing_counters(self, user_ids: Iterable[str]) -> Set[str]:
+        user_ids = list(user_ids)
+        if not user_ids:
+            return set()
+        cursor = self.db.notification_counters.find({"_id": {"$in": user_ids}}, {"_id": 1})
+        return {counter["_id"] async for counter in cursor}
+
+    async def _claim_uncounted(self, user_id: str, query: Optional[Dict] = None) -> int:
+        """Mark the user's uncounted unread notifications counted and add them to the counter"""
+        result = await self.db.notifications.update_many(
+            {"user_id": user_id, "read": False, "counted": {"$ne": True}, **(query or {})},
+            {"$set": {"counted": True}}
+        )
+        if result.modified_count:
+            await self.db.notification_counters.update_one(
+                {"_id": user_id}, {"$inc": {"unread": result.modified_count}}
+            )
+        return result.modified_count
+
+    async def create(self, user_id: str, notification_type: str, title: str, message: str, data: dict = None) -> Dict:
+        """Create a single notification"""
+        notification = self.build(user_id, notification_type, title, message, data)
+        await self.insert_many([notification])
+        return notification
+
+    async def broadcast(self, user_ids: Iterable[str], notification_type: str, title: str, message: str, data: dict = None) -> int:
+        """
+        Send the same notification to many users in one batch
+
+        Returns:
+            Number of users notified
+        """
+        notifications = [
+            self.build(user_id, notification_type, title, message, data)
+            for user_id in dict.fromkeys(user_ids) if user_id
+        ]
+        return await self.insert_many(notifications)
+
+    async def unread_count(self, user_id: str) -> int:
+        """Unread notifications for a user - a point read on notification_counters"""
+        counter = await self.db.notification_counters.find_one({"_id": user_id})
+        if counter is None:
+            await self.db.notification_counters.update_one(
+                {"_id": user_id}, {"$setOnInsert": {"unread": 0}}, upsert=True
+            )
+            # Seed from the rows no writer has counted; writes from here on $inc the counter themselves
+            await self._claim_uncounted(user_id)
+            counter = await self.db.notification_counters.find_one({"_id": user_id}) or {}
+        return max(counter.get("unread", 0), 0)
+
+    async def mark_read(self, notification_id: str) -> bool:
+        """
+        Mark one notification as read
+
+        Returns:
+            False if the notification does not exist
+        """
+        notification = await self.db.notifications.find_one_and_update(
+            {"id": notification_id, "read": False},
+            {"$set": {"read": True, "read_at": datetime.now(timezone.utc).isoformat()}},
+            projection={"_id": 0, "user_id": 1, "counted": 1}
+        )
+        if notification is None:
+            # Already read (no counter change) or unknown id
+            return await self.db.notifications.count_documents({"id": notification_id}, limit=1) > 0
+
+        # An uncounted notification read before the seeder got to it was never added
+        if notification.get("counted", True):
+            await self.db.notification_counters.update_one(
+                {"_id": notification["user_id"]}, {"$inc": {"unread": -1}}
+            )
+        _wake([notification["user_id"]])
+        return True
+
+    async def mark_all_read(self, user_id: str):
+        """Mark every notification for a user as read and take them off the counter"""
+        read = {"$set": {"read": True, "read_at": datetime.now(timezone.utc).isoformat()}}
+        # Decrement by what was actually marked rather than zeroing, so anything inserted meanwhile stays unread
+        result = await self.db.notifications.update_many(
+            {"user_id": user_id, "read": False, "counted": {"$ne": False}}, read
+        )
+        if result.modified_count:
+            await self.db.notification_counters.update_one(
+                {"_id": user_id}, {"$inc": {"unread": -result.modified_count}}
+            )
+        await self.db.notifications.update_many({"user_id": user_id, "read": False, "counted": False}, read)
+        _wake([user_id])
+
+    async def wait_for_change(self, user_id: str, since: Optional[int], timeout: float = 25.0,
+                              poll_interval: float = 5.0) -> int:
+        """
+        Long-poll: return the unread count as soon as it differs from since
+        (immediately if since is None), or the current count after timeout
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        count = await self.unread_count(user_id)
+        if since is None:
+            return count
+
+        event = asyncio.Event()
+        _waiters.setdefault(user_id, set()).add(event)
+        try:
+            while count == since:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=min(poll_interval, remaining))
+                except asyncio.TimeoutError:
+                    pass
+                event.clear()
+                count = await self.unread_count(user_id)
+        finally:
+            waiters = _waiters.get(user_id)
+            if waiters is not None:
+                waiters.discard(event)
+                if not waiters:
+                    _waiters.pop(user_id, None)
+        return count
+
+    async def ensure_indexes(self):
+        await self.db.notifications.create_index([("user_id", 1), ("created_at", -1)])
+        await self.db.notifications.create_index([("user_id", 1), ("read", 1)])
+        await self.db.notifications.create_index("id")
+
+
+def _wake(user_ids: Iterable[str]):
+    for user_id in user_ids:
+        for event in _waiters.get(user_id, ()):
+            event.set()
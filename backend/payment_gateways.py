@@ -0,0 +1,231 @@
+import asyncio
+import functools
+import logging
+import os
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+GATEWAY_TIMEOUT_SECONDS = float(os.environ.get('PAYMENT_GATEWAY_TIMEOUT', '15'))
+GATEWAY_RETRIES = int(os.environ.get('PAYMENT_GATEWAY_RETRIES', '2'))
+RETRY_BACKOFF_SECONDS = 0.5
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+class PaymentGatewayError(Exception):
+    """A payment provider call failed (after any retries)"""
+
+    def __init__(self, provider: str, operation: str, cause: Exception):
+        self.provider = provider
+        self.operation = operation
+        self.cause = cause
+        super().__init__(f"{provider} {operation} failed: {cause}")
+
+
+class PaymentGatewayTimeout(PaymentGatewayError):
+    """A payment provider call took longer than GATEWAY_TIMEOUT_SECONDS"""
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Thread pool for blocking payment SDKs
+
+    Bounded so a slow provider ties up at most this many threads instead of
+    the default executor the rest of the app shares.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=int(os.environ.get('PAYMENT_GATEWAY_WORKERS', '8')),
+            thread_name_prefix="payments"
+        )
+    return _executor
+
+
+def shutdown_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Timeouts, connection problems, 429s and 5xx responses are worth another try"""
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    status = getattr(error, "status_code", None) or getattr(error, "status", None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    # requests' ConnectionError/Timeout derive from IOError
+    return isinstance(error, OSError)
+
+
+async def call_with_retry(provider: str, operation: str, make_call: Callable[[], Any],
+                          timeout: float = GATEWAY_TIMEOUT_SECONDS, retries: int = GATEWAY_RETRIES):
+    """
+    Await make_call() with a timeout, retrying transient failures with backoff
+
+    Only pass retries > 0 for calls that are safe to repeat (reads, or
+    writes carrying an idempotency key).
+
+    Raises:
+        PaymentGatewayTimeout / PaymentGatewayError: the last attempt failed
+    """
+    attempt = 0
+    while True:
+        try:
+            return await asyncio.wait_for(make_call(), timeout)
+        except Exception as e:
+            if attempt >= retries or not is_retryable(e):
+                error_cls = PaymentGatewayTimeout if isinstance(e, asyncio.TimeoutError) else PaymentGatewayError
+                logger.error(f"❌ {provider} {operation} failed after {attempt + 1} attempt(s): {str(e) or type(e).__name__}")
+                raise error_cls(provider, operation, e) from e
+            delay = RETRY_BACKOFF_SECONDS * (2 ** attempt)
+            logger.warning(f"⚠️ {provider} {operation} attempt {attempt + 1} failed ({str(e) or type(e).__name__}), retrying in {delay}s")
+            attempt += 1
+            await asyncio.sleep(delay)
+
+
+async def run_blocking(provider: str, operation: str, func: Callable, *args,
+                       timeout: float = GATEWAY_TIMEOUT_SECONDS, retries: int = GATEWAY_RETRIES, **kwargs):
+    """Run a blocking SDK call in the payments thread pool via call_with_retry"""
+    loop = asyncio.get_running_loop()
+    call = functools.partial(func, *args, **kwargs)
+    return await call_with_retry(
+        provider, operation, lambda: loop.run_in_executor(get_executor(), call),
+        timeout=timeout, retries=retries
+    )
+
+
+class PaymentGateway(ABC):
+    """
+    Common async interface over the payment providers.
+
+    create_payment returns {"provider", "reference", "redirect_url", "status"};
+    get_status and capture return {"reference", "status", "payment_status",
+    "amount_total", "currency"} where payment_status is "paid" once the
+    money has been taken.
+    """
+
+    name = "gateway"
+
+    def is_configured(self) -> bool:
+        return True
+
+    @abstractmethod
+    async def create_payment(self, amount: float, currency: str, description: str,
+                             metadata: Optional[Dict] = None, success_url: Optional[str] = None,
+                             cancel_url: Optional[str] = None, idempotency_key: Optional[str] = None) -> Dict:
+        """Start a payment and return where to send the payer"""
+
+    @abstractmethod
+    async def get_status(self, reference: str) -> Dict:
+        """Current state of a payment"""
+
+    @abstractmethod
+    async def capture(self, reference: str) -> Dict:
+        """Take the money for an approved payment"""
+
+
+class PayPalGateway(PaymentGateway):
+    """PayPalService (blocking SDK) run in the payments thread pool"""
+
+    name = "paypal"
+
+    def __init__(self, service):
+        self.service = service
+
+    def is_configured(self) -> bool:
+        return self.service.is_configured()
+
+    async def create_payment(self, amount, currency, description, metadata=None,
+                             success_url=None, cancel_url=None, idempotency_key=None):
+        # Without a PayPal-Request-Id a retry could open a second order
+        order = await run_blocking(
+            self.name, "create_order", self.service.create_order,
+            amount=amount, currency=currency, description=description, request_id=idempotency_key,
+            retries=GATEWAY_RETRIES if idempotency_key else 0
+        )
+        return {
+            "provider": self.name,
+            "reference": order["order_id"],
+            "redirect_url": order["approval_url"],
+            "status": order["status"]
+        }
+
+    async def get_status(self, reference: str) -> Dict:
+        order = await run_blocking(self.name, "get_order", self.service.get_order, reference)
+        return {
+            "reference": order["order_id"],
+            "status": order["status"],
+            "payment_status": "paid" if order["status"] == "COMPLETED" else "unpaid",
+            "amount_total": order["amount"],
+            "currency": order["currency"]
+        }
+
+    async def capture(self, reference: str) -> Dict:
+        result = await run_blocking(
+            self.name, "capture_order", self.service.capture_order,
+            reference, request_id=f"capture-{reference}"
+        )
+        return {
+            "reference": result["order_id"],
+            "status": result["status"],
+            "payment_status": "paid" if result["status"] == "COMPLETED" else "unpaid",
+            "amount_total": result["amount"],
+            "currency": None,
+            "payer_email": result.get("payer_email")
+        }
+
+
+class StripeGateway(PaymentGateway):
+    """StripePaymentService (already async) with the same timeout/retry policy"""
+
+    name = "stripe"
+
+    def __init__(self, service):
+        self.service = service
+
+    async def create_payment(self, amount, currency, description, metadata=None,
+                             success_url=None, cancel_url=None, idempotency_key=None):
+        metadata = metadata or {}
+        # The checkout wrapper takes no idempotency key, so a retry could open a second session
+        session = await call_with_retry(
+            self.name, "create_checkout_session",
+            lambda: self.service.create_pot_payment_session(
+                amount=amount,
+                user_email=metadata.get("user_email"),
+                user_name=metadata.get("user_name"),
+                week_id=metadata.get("week_id"),
+                success_url=success_url,
+                cancel_url=cancel_url
+            ),
+            retries=0
+        )
+        return {
+            "provider": self.name,
+            "reference": session.session_id,
+            "redirect_url": session.url,
+            "status": "open"
+        }
+
+    async def get_status(self, reference: str) -> Dict:
+        status = await call_with_retry(self.name, "get_checkout_status", lambda: self.service.get_payment_status(reference))
+        return {
+            "reference": reference,
+            "status": status.status,
+            "payment_status": status.payment_status,
+            "amount_total": status.amount_total,
+            "currency": status.currency
+        }
+
+    async def capture(self, reference: str) -> Dict:
+        # Checkout sessions capture on completion
+        return await self.get_status(reference)
+
+    async def handle_webhook(self, body: bytes, signature: str) -> Dict:
+        # Verifying a signature is local work; don't retry
+        return await call_with_retry(self.name, "handle_webhook", lambda: self.service.handle_webhook(body, signature), retries=0)
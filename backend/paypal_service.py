@@ -1,13 +1,19 @@
 import os
 from paypalcheckoutsdk.core import PayPalHttpClient, SandboxEnvironment, LiveEnvironment
-from paypalcheckoutsdk.orders import OrdersCreateRequest, OrdersCaptureRequest
+from paypalcheckoutsdk.orders import OrdersCreateRequest, OrdersCaptureRequest, OrdersGetRequest
 import logging
+from typing import Optional
 
 logger = logging.getLogger(__name__)
 
 
 class PayPalService:
-    """Service for handling PayPal payments"""
+    """
+    Service for handling PayPal payments
+
+    These calls block on HTTP; async code goes through
+    payment_gateways.PayPalGateway, which runs them in a thread pool.
+    """
     
     def __init__(self):
         self.client_id = os.environ.get('PAYPAL_CLIENT_ID', 'YOUR_PAYPAL_CLIENT_ID')
@@ -22,19 +28,25 @@ class PayPalService:
         
         self.client = PayPalHttpClient(environment)
     
-    def create_order(self, amount: float, currency: str = "GBP", description: str = "Weekly Pot Payment"):
+    def create_order(self, amount: float, currency: str = "GBP", description: str = "Weekly Pot Payment",
+                     request_id: Optional[str] = None):
         """
         Create a PayPal order
         Args:
             amount: Payment amount
             currency: Currency code (default: GBP)
             description: Payment description
+            request_id: PayPal-Request-Id, so a retried call doesn't create a second order
         Returns:
             Order ID and approval URL
+        Raises:
+            The SDK's HttpError/IOError when PayPal can't be reached or refuses
         """
         try:
             request = OrdersCreateRequest()
             request.prefer('return=representation')
+            if request_id:
+                request.headers["PayPal-Request-Id"] = request_id
             
             request.request_body({
                 "intent": "CAPTURE",
@@ -68,18 +80,23 @@ class PayPalService:
         
         except Exception as e:
             logger.error(f"Error creating PayPal order: {str(e)}")
-            return None
+            raise
     
-    def capture_order(self, order_id: str):
+    def capture_order(self, order_id: str, request_id: Optional[str] = None):
         """
         Capture/complete a PayPal order
         Args:
             order_id: PayPal order ID
+            request_id: PayPal-Request-Id, so a retried call doesn't capture twice
         Returns:
             Capture result
+        Raises:
+            The SDK's HttpError/IOError when PayPal can't be reached or refuses
         """
         try:
             request = OrdersCaptureRequest(order_id)
+            if request_id:
+                request.headers["PayPal-Request-Id"] = request_id
             response = self.client.execute(request)
             
             return {
@@ -91,7 +108,23 @@ class PayPalService:
         
         except Exception as e:
             logger.error(f"Error capturing PayPal order: {str(e)}")
-            return None
+            raise
+    
+    def get_order(self, order_id: str):
+        """
+        Look up a PayPal order
+        Args:
+            order_id: PayPal order ID
+        Returns:
+            Order ID, status and amount
+        """
+        response = self.client.execute(OrdersGetRequest(order_id))
+        return {
+            "order_id": response.result.id,
+            "status": response.result.status,
+            "amount": response.result.purchase_units[0].amount.value,
+            "currency": response.result.purchase_units[0].amount.currency_code
+        }
     
     def is_configured(self) -> bool:
         """Check if PayPal is properly configured"""
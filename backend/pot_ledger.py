@@ -0,0 +1,185 @@
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+ADMIN_FEE_RATE = 0.10
+REPAIR_AFTER_SECONDS = 60
+
+# Cycle fields copied onto the balance so /pot/current needs no other read
+CYCLE_FIELDS = ("week_start", "week_end", "cutoff_date", "stake_amount", "status", "charity_mode")
+
+
+def balance_id(week_id: str, team_id: Optional[str] = None) -> str:
+    """Balance document key; team_id None is the site-wide weekly pot"""
+    return f"{week_id}:{team_id or 'site'}"
+
+
+def balance_delta(kind: str, amount: float) -> Dict[str, float]:
+    """How one ledger event moves the running balance"""
+    if kind == "payment":
+        return {"participants": 1, "total_pot": amount,
+                "admin_fee": amount * ADMIN_FEE_RATE, "distributable_pot": amount - amount * ADMIN_FEE_RATE}
+    if kind == "refund":
+        return {"participants": -1, "total_pot": -amount,
+                "admin_fee": -amount * ADMIN_FEE_RATE, "distributable_pot": -(amount - amount * ADMIN_FEE_RATE)}
+    if kind == "rollover":
+        return {"rollover_amount": amount, "distributable_pot": amount}
+    raise ValueError(f"Unknown pot ledger event kind: {kind}")
+
+
+class PotLedger:
+    """
+    Service for the weekly pot ledger.
+
+    Every payment, refund and rollover is appended to pot_ledger (one event
+    per source_id, so a replayed webhook or capture is recorded once) and
+    applied with a single $inc to the running balance in pot_balances,
+    keyed by week and team. Reading a pot is one point read; the event log
+    is the audit trail and rebuild() recomputes a balance from it.
+    """
+
+    def __init__(self, database):
+        self.db = database
+
+    async def record(self, week_id: str, kind: str, amount: float, team_id: Optional[str] = None,
+                     source_id: Optional[str] = None, details: Optional[Dict] = None) -> bool:
+        """
+        Append an event and apply it to the balance
+
+        Args:
+            source_id: Idempotency key, e.g. "stripe:<session_id>"
+
+        Returns:
+            False if an event with this source_id was already recorded
+        """
+        delta = balance_delta(kind, amount)
+        now = datetime.now(timezone.utc)
+        event = {
+            "id": str(uuid.uuid4()),
+            "week_id": week_id,
+            "team_id": team_id,
+            "kind": kind,
+            "amount": amount,
+            "source_id": source_id or str(uuid.uuid4()),
+            "details": details or {},
+            "applied": False,
+            "created_at": now,
+        }
+        try:
+            await self.db.pot_ledger.insert_one(event)
+        except DuplicateKeyError:
+            return False
+
+        await self.db.pot_balances.update_one(
+            {"_id": balance_id(week_id, team_id)},
+            {
+                "$inc": delta,
+                "$set": {"updated_at": now, "last_event_id": event["id"]},
+                "$setOnInsert": {"week_id": week_id, "team_id": team_id}
+            },
+            upsert=True
+        )
+        # A crash before this leaves applied=False and repair() rebuilds the balance
+        await self.db.pot_ledger.update_one({"id": event["id"]}, {"$set": {"applied": True}})
+        return True
+
+    async def get_balance(self, week_id: str, team_id: Optional[str] = None) -> Optional[Dict]:
+        balance = await self.db.pot_balances.find_one({"_id": balance_id(week_id, team_id)})
+        if balance:
+            balance.pop("_id", None)
+        return balance
+
+    async def attach_cycle(self, cycle: Dict, team_id: Optional[str] = None) -> Dict:
+        """Copy a weekly cycle's dates/stake/status onto its balance (creating it if needed)"""
+        fields = {field: cycle.get(field) for field in CYCLE_FIELDS if field in cycle}
+        balance = await self.db.pot_balances.find_one_and_update(
+            {"_id": balance_id(cycle["week_id"], team_id)},
+            {
+                "$set": {"cycle": fields},
+                "$setOnInsert": {
+                    "week_id": cycle["week_id"], "team_id": team_id, "participants": 0,
+                    "total_pot": 0, "admin_fee": 0, "rollover_amount": 0, "distributable_pot": 0
+                }
+            },
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        balance.pop("_id", None)
+        return balance
+
+    async def set_status(self, week_id: str, status: str, team_id: Optional[str] = None):
+        await self.db.pot_balances.update_one(
+            {"_id": balance_id(week_id, team_id)}, {"$set": {"cycle.status": status}}
+        )
+
+    async def history(self, week_id: str, team_id: Optional[str] = None, limit: int = 500) -> List[Dict]:
+        return await self.db.pot_ledger.find(
+            {"week_id": week_id, "team_id": team_id}, {"_id": 0}
+        ).sort("created_at", 1).limit(limit).to_list(limit)
+
+    async def rebuild(self, week_id: str, team_id: Optional[str] = None) -> Dict:
+        """Recompute a balance from its events (audit / repair)"""
+        totals = {"participants": 0, "total_pot": 0, "admin_fee": 0, "rollover_amount": 0, "distributable_pot": 0}
+        async for event in self.db.pot_ledger.find(
+            {"week_id": week_id, "team_id": team_id}, {"_id": 0, "kind": 1, "amount": 1}
+        ):
+            for field, value in balance_delta(event["kind"], event["amount"]).items():
+                totals[field] += value
+        await self.db.pot_balances.update_one(
+            {"_id": balance_id(week_id, team_id)},
+            {"$set": {**totals, "updated_at": datetime.now(timezone.utc)},
+             "$setOnInsert": {"week_id": week_id, "team_id": team_id}},
+            upsert=True
+        )
+        return totals
+
+    async def repair(self) -> int:
+        """Rebuild balances with events a crash left unapplied"""
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=REPAIR_AFTER_SECONDS)
+        stale = await self.db.pot_ledger.find(
+            {"applied": False, "created_at": {"$lt": cutoff}}, {"_id": 0, "id": 1, "week_id": 1, "team_id": 1}
+        ).to_list(1000)
+        for week_id, team_id in {(e["week_id"], e["team_id"]) for e in stale}:
+            await self.rebuild(week_id, team_id)
+        if stale:
+            await self.db.pot_ledger.update_many(
+                {"id": {"$in": [e["id"] for e in stale]}}, {"$set": {"applied": True}}
+            )
+            logger.warning(f"🧾 Repaired pot balances for {len(stale)} unapplied ledger events")
+        return len(stale)
+
+    async def backfill(self) -> int:
+        """Record payments and rollovers made before the ledger existed (idempotent)"""
+        recorded = 0
+        async for payment in self.db.payments.find({"status": "completed"}, {"_id": 0, "id": 1, "week_id": 1, "amount": 1}):
+            if payment.get("week_id") and payment.get("id") and await self.record(
+                payment["week_id"], "payment", payment.get("amount", 0), source_id=f"paypal:{payment['id']}"
+            ):
+                recorded += 1
+        async for tx in self.db.payment_transactions.find(
+            {"payment_status": "paid"}, {"_id": 0, "session_id": 1, "week_id": 1, "actual_stake": 1, "amount": 1}
+        ):
+            if tx.get("week_id") and tx.get("session_id") and await self.record(
+                tx["week_id"], "payment", tx.get("actual_stake", tx.get("amount", 0)), source_id=f"stripe:{tx['session_id']}"
+            ):
+                recorded += 1
+        async for cycle in self.db.weekly_cycles.find({"rollover_amount": {"$gt": 0}}, {"_id": 0, "week_id": 1, "rollover_amount": 1}):
+            if await self.record(
+                cycle["week_id"], "rollover", cycle["rollover_amount"], source_id=f"rollover-into:{cycle['week_id']}"
+            ):
+                recorded += 1
+        if recorded:
+            logger.info(f"🧾 Backfilled {recorded} pot ledger events")
+        return recorded
+
+    async def ensure_indexes(self):
+        await self.db.pot_ledger.create_index("source_id", unique=True)
+        await self.db.pot_ledger.create_index([("week_id", 1), ("team_id", 1), ("created_at", 1)])
+        await self.db.pot_ledger.create_index("id")
+        await self.db.pot_ledger.create_index([("applied", 1), ("created_at", 1)])
@@ -0,0 +1,239 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from date_codec import as_utc, to_bson_datetime
+from models import PromoCodeUsage
+
+logger = logging.getLogger(__name__)
+
+PROMO_CACHE_SECONDS = 60
+
+# code -> (definition, loaded_at). Only the validate path reads this;
+# redemption always goes to the database.
+_cache: Dict[str, Tuple[Optional[Dict], float]] = {}
+
+
+def invalidate_promo_cache(code: Optional[str] = None):
+    """Drop one cached promo code (or all) after an admin change"""
+    if code is None:
+        _cache.clear()
+    else:
+        _cache.pop(code.upper(), None)
+
+
+class PromoCodeRejected(Exception):
+    def __init__(self, message: str, status_code: int = 400):
+        self.message = message
+        self.status_code = status_code
+        super().__init__(message)
+
+
+def check_promo(promo: Optional[Dict], now: Optional[datetime] = None) -> Optional[str]:
+    """Why a promo code can't be used right now (None if it can)"""
+    if not promo:
+        return "Promo code not found"
+    if not promo.get("is_active", True):
+        return "Promo code is no longer active"
+
+    now = now or datetime.now(timezone.utc)
+    # Stored as BSON dates (read back naive UTC) - make them comparable with aware now
+    valid_from = as_utc(promo.get("valid_from"))
+    valid_until = as_utc(promo.get("valid_until"))
+    if valid_from and now < valid_from:
+        return "Promo code is not yet valid"
+    if valid_until and now > valid_until:
+        return "Promo code has expired"
+
+    max_uses = promo.get("max_uses")
+    if max_uses and promo.get("current_uses", 0) >= max_uses:
+        return "Promo code has reached maximum uses"
+    return None
+
+
+def price_with_promo(promo: Dict) -> Dict:
+    """Stake, discount and amount to pay under a promo code"""
+    stake_amount = promo.get("stake_amount", 3.0)
+    discount_value = promo.get("discount_value", 0)
+    if promo.get("discount_type", "fixed") == "fixed":
+        final_amount = max(0, stake_amount - discount_value)
+        discount_applied = discount_value
+    else:  # percentage
+        discount_applied = stake_amount * (discount_value / 100)
+        final_amount = stake_amount - discount_applied
+    return {"stake_amount": stake_amount, "discount_applied": discount_applied, "final_amount": final_amount}
+
+
+class PromoCodeService:
+    """
+    Service for validating and redeeming promo codes.
+
+    Redemption claims a use with one conditional find_one_and_update (only
+    matches while the code is active, in date and under max_uses), then
+    records the usage under a unique (promo_code, user_email, use_number)
+    index. Concurrent redemptions can't oversubscribe a code or give one
+    user more than max_uses_per_user.
+    """
+
+    def __init__(self, database):
+        self.db = database
+
+    async def get_definition(self, code: str) -> Optional[Dict]:
+        """Promo code document, cached for PROMO_CACHE_SECONDS"""
+        code = code.upper()
+        cached = _cache.get(code)
+        if cached and time.monotonic() - cached[1] < PROMO_CACHE_SECONDS:
+            return cached[0]
+        promo = await self.db.promo_codes.find_one({"code": code}, {"_id": 0})
+        _cache[code] = (promo, time.monotonic())
+        return promo
+
+    async def validate(self, code: str, user_email: str) -> Dict:
+        """
+        Check whether a user can use a promo code (advisory; redeem() is authoritative)
+
+        Returns:
+            {"valid": bool, "message": str, ...discount details when valid}
+        """
+        promo = await self.get_definition(code)
+        reason = check_promo(promo)
+        if reason:
+            return {"valid": False, "message": reason}
+
+        max_uses_per_user = promo.get("max_uses_per_user") or 1
+        user_uses = await self.db.promo_code_usage.count_documents({
+            "promo_code": code.upper(),
+            "user_email": user_email
+        })
+        if user_uses >= max_uses_per_user:
+            return {
+                "valid": False,
+                "message": f"You have already used this promo code {max_uses_per_user} time(s)"
+            }
+
+        return {
+            "valid": True,
+            "message": "Promo code is valid",
+            "discount_value": promo.get("discount_value", 0),
+            "discount_type": promo.get("discount_type", "fixed"),
+            "stake_amount": promo.get("stake_amount", 3.0),
+            "description": promo.get("description", "")
+        }
+
+    async def _claim_use(self, code: str) -> Optional[Dict]:
+        now = to_bson_datetime(datetime.now(timezone.utc))
+        return await self.db.promo_codes.find_one_and_update(
+            {
+                "code": code,
+                "is_active": {"$ne": False},
+                "$and": [
+                    {"$or": [{"valid_from": None}, {"valid_from": {"$lte": now}}]},
+                    {"$or": [{"valid_until": None}, {"valid_until": {"$gte": now}}]},
+                    {"$or": [
+                        {"max_uses": {"$in": [None, 0]}},
+                        {"$expr": {"$lt": [{"$ifNull": ["$current_uses", 0]}, "$max_uses"]}}
+                    ]},
+                ]
+            },
+            {"$inc": {"current_uses": 1}},
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def _use_number(self, code: str, user_email: str) -> int:
+        """Which of the user's allowed uses this is (1 unless max_uses_per_user > 1)"""
+        promo = await self.get_definition(code)
+        if promo and (promo.get("max_uses_per_user") or 1) > 1:
+            return await self.db.promo_code_usage.count_documents({"promo_code": code, "user_email": user_email}) + 1
+        return 1
+
+    async def redeem(self, code: str, user_email: str, user_id: str = "",
+                     team_id: Optional[str] = None, referred_by: Optional[str] = None) -> Dict:
+        """
+        Claim a use of a promo code and record it
+
+        Returns:
+            Pricing dict (stake_amount, discount_applied, final_amount)
+
+        Raises:
+            PromoCodeRejected: code invalid, used up, or already used by this user
+        """
+        code = code.upper()
+        use_number = await self._use_number(code, user_email)
+
+        async def team_name():
+            if not team_id:
+                return None
+            team = await self.db.teams.find_one({"id": team_id}, {"_id": 0, "name": 1})
+            return team.get("name") if team else None
+
+        promo, name = await asyncio.gather(self._claim_use(code), team_name())
+        if not promo:
+            # Failure path only: work out which condition failed
+            fresh = await self.db.promo_codes.find_one({"code": code}, {"_id": 0})
+            reason = check_promo(fresh) or "Promo code has reached maximum uses"
+            raise PromoCodeRejected(reason, status_code=404 if not fresh else 400)
+
+        max_uses_per_user = promo.get("max_uses_per_user") or 1
+        if use_number > max_uses_per_user:
+            await self._release_use(code)
+            raise PromoCodeRejected(f"You have already used this promo code {max_uses_per_user} time(s)")
+
+        pricing = price_with_promo(promo)
+        while True:
+            usage = PromoCodeUsage(
+                promo_code_id=promo.get("id"),
+                promo_code=code,
+                user_id=user_id,
+                user_email=user_email,
+                team_id=team_id,
+                team_name=name,
+                payment_amount=pricing["final_amount"],
+                discount_applied=pricing["discount_applied"],
+                referred_by=referred_by,
+                use_number=use_number
+            )
+            try:
+                await self.db.promo_code_usage.insert_one(usage.model_dump())
+                break
+            except DuplicateKeyError:
+                # Same user redeeming concurrently took this number - try their next use
+                if use_number < max_uses_per_user:
+                    use_number += 1
+                    continue
+                await self._release_use(code)
+                raise PromoCodeRejected(f"You have already used this promo code {max_uses_per_user} time(s)")
+
+        _cache.pop(code, None)
+        return pricing
+
+    async def _release_use(self, code: str):
+        await self.db.promo_codes.update_one(
+            {"code": code, "current_uses": {"$gt": 0}}, {"$inc": {"current_uses": -1}}
+        )
+
+    async def backfill_use_numbers(self) -> int:
+        """Number the usages recorded before use_number existed, oldest first"""
+        ops = []
+        seen: Dict[Tuple[str, str], int] = {}
+        async for usage in self.db.promo_code_usage.find(
+            {"use_number": {"$exists": False}}, {"_id": 1, "promo_code": 1, "user_email": 1}
+        ).sort("_id", 1):
+            key = (usage.get("promo_code"), usage.get("user_email"))
+            seen[key] = seen.get(key, 0) + 1
+            ops.append(UpdateOne({"_id": usage["_id"]}, {"$set": {"use_number": seen[key]}}))
+        if ops:
+            await self.db.promo_code_usage.bulk_write(ops, ordered=False)
+            logger.info(f"🎟️ Numbered {len(ops)} existing promo code usages")
+        return len(ops)
+
+    async def ensure_indexes(self):
+        await self.backfill_use_numbers()
+        await self.db.promo_codes.create_index("code", unique=True)
+        await self.db.promo_code_usage.create_index(
+            [("promo_code", 1), ("user_email", 1), ("use_number", 1)], unique=True
+        )
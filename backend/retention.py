@@ -0,0 +1,129 @@
+import os
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger(__name__)
+
+# Retention policy per hot collection.
+# - archive: collection old documents are moved to
+# - filter: extra condition a document must meet to be archived
+# - max_age_days: age (by created_at) after which a document is archived;
+#   overridable with the env var named in max_age_env
+# - archive_ttl_days: archived documents are dropped by a TTL index on
+#   archived_at after this many days (None keeps them forever)
+RETENTION_POLICIES = {
+    "notifications": {
+        "archive": "notifications_archive",
+        "filter": {"read": True},
+        "max_age_days": 30,
+        "max_age_env": "NOTIFICATION_RETENTION_DAYS",
+        "archive_ttl_days": 365,
+        "archive_indexes": [[("user_id", 1), ("created_at", -1)]],
+    },
+    "team_messages": {
+        "archive": "team_messages_archive",
+        "filter": {},
+        "max_age_days": 365,  # one season
+        "max_age_env": "TEAM_MESSAGE_RETENTION_DAYS",
+        "archive_ttl_days": None,
+        "archive_indexes": [[("team_id", 1), ("created_at", -1)]],
+    },
+}
+
+
+def get_max_age_days(policy: Dict) -> int:
+    value = os.environ.get(policy["max_age_env"], "").strip()
+    if value:
+        try:
+            return int(value)
+        except ValueError:
+            logger.warning(f"Invalid {policy['max_age_env']}={value!r}, using {policy['max_age_days']}")
+    return policy["max_age_days"]
+
+
+class RetentionService:
+    """
+    Moves old documents out of hot collections into archive collections.
+
+    created_at is an ISO string on these collections, which a TTL index
+    cannot use, so archiving is a batch mover: copy a batch to the archive
+    (same _id), then delete it from the hot collection. A run interrupted
+    between the two steps is finished by the next run - the duplicate
+    inserts are ignored and the delete goes ahead.
+    """
+
+    def __init__(self, database, policies: Optional[Dict] = None):
+        self.db = database
+        self.policies = policies or RETENTION_POLICIES
+
+    @staticmethod
+    def cutoff_filter(policy: Dict, cutoff: datetime) -> Dict:
+        """Documents older than cutoff, whether created_at is an ISO string or a BSON date"""
+        naive_cutoff = cutoff.astimezone(timezone.utc).replace(tzinfo=None)
+        return {
+            **policy.get("filter", {}),
+            "$or": [
+                {"created_at": {"$lt": naive_cutoff.isoformat()}},
+                {"created_at": {"$lt": naive_cutoff}},
+            ]
+        }
+
+    async def archive_collection(self, name: str, batch_size: int = 1000, max_batches: Optional[int] = None) -> int:
+        """
+        Archive one collection according to its policy
+
+        Returns:
+            Number of documents moved
+        """
+        policy = self.policies[name]
+        cutoff = datetime.now(timezone.utc) - timedelta(days=get_max_age_days(policy))
+        query = self.cutoff_filter(policy, cutoff)
+        hot = self.db[name]
+        archive = self.db[policy["archive"]]
+
+        moved = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            docs = await hot.find(query).limit(batch_size).to_list(batch_size)
+            if not docs:
+                break
+
+            archived_at = datetime.now(timezone.utc)
+            for doc in docs:
+                doc["archived_at"] = archived_at
+            try:
+                await archive.insert_many(docs, ordered=False)
+            except BulkWriteError as e:
+                # Already archived by an interrupted run - anything else is a real error
+                if any(err.get("code") != 11000 for err in e.details.get("writeErrors", [])):
+                    raise
+
+            result = await hot.delete_many({"_id": {"$in": [doc["_id"] for doc in docs]}})
+            moved += result.deleted_count
+            batches += 1
+
+        if moved:
+            logger.info(f"🗄️ Archived {moved} documents from {name} to {policy['archive']}")
+        return moved
+
+    async def run(self, batch_size: int = 1000) -> Dict[str, int]:
+        """Apply every retention policy"""
+        results = {}
+        for name in self.policies:
+            results[name] = await self.archive_collection(name, batch_size=batch_size)
+        return results
+
+    async def ensure_indexes(self):
+        await self.db.team_messages.create_index([("team_id", 1), ("created_at", -1)])
+        await self.db.notifications.create_index([("read", 1), ("created_at", 1)])
+        for policy in self.policies.values():
+            archive = self.db[policy["archive"]]
+            for keys in policy.get("archive_indexes", []):
+                await archive.create_index(keys)
+            if policy.get("archive_ttl_days"):
+                await archive.create_index(
+                    "archived_at", expireAfterSeconds=policy["archive_ttl_days"] * 86400
+                )
@@ -0,0 +1,45 @@
+import os
+import logging
+from typing import Set
+
+logger = logging.getLogger(__name__)
+
+# Feature router groups that server.py knows how to mount.
+# "core" (health, leagues, users, uploads, notifications, auth, posts) is always on.
+ROUTER_GROUPS = ("core", "fixtures", "predictions", "teams", "payments", "analytics", "admin")
+
+# Which groups each deployment role serves.
+# - public: user-facing workers, no admin maintenance/debug or analytics code
+# - admin: internal dashboard and maintenance worker
+# - all: everything in one process (default, same as a single-worker deploy)
+DEPLOYMENT_ROLES = {
+    "all": ROUTER_GROUPS,
+    "public": ("core", "fixtures", "predictions", "teams", "payments"),
+    "admin": ("core", "analytics", "admin"),
+}
+
+
+def get_enabled_routers() -> Set[str]:
+    """
+    Resolve the router groups to mount for this process
+
+    ENABLED_ROUTERS (comma separated group names) takes precedence over
+    DEPLOYMENT_ROLE, which defaults to "all".
+    """
+    explicit = os.environ.get('ENABLED_ROUTERS', '').strip()
+    if explicit:
+        groups = {name.strip().lower() for name in explicit.split(',') if name.strip()}
+    else:
+        role = os.environ.get('DEPLOYMENT_ROLE', 'all').strip().lower()
+        if role not in DEPLOYMENT_ROLES:
+            logger.warning(f"Unknown DEPLOYMENT_ROLE '{role}', mounting all routers")
+            role = "all"
+        groups = set(DEPLOYMENT_ROLES[role])
+
+    unknown = groups - set(ROUTER_GROUPS)
+    if unknown:
+        logger.warning(f"Ignoring unknown router groups: {', '.join(sorted(unknown))}")
+
+    groups &= set(ROUTER_GROUPS)
+    groups.add("core")
+    return groups
@@ -0,0 +1,2298 @@
+"""
+Admin maintenance, debug and one-off migration endpoints.
+
+Only mounted when the "admin" router group is enabled for the deployment
+(see router_config.py), so public-facing workers never import this module.
+"""
+from fastapi import APIRouter, HTTPException
+from datetime import datetime, timezone, timedelta
+import logging
+import os
+import uuid
+from date_codec import utc_now
+from matchday_index import MatchdayIndex, matchday_filter
+from matchweek_service import invalidate_matchweek_cache
+import entity_cache
+from team_standings import TeamStandings
+
+router = APIRouter(tags=["admin"])
+logger = logging.getLogger(__name__)
+
+# Database and server-level helpers (set by server.py)
+db = None
+SUPPORTED_LEAGUES = []
+get_active_football_service = None
+automated_result_update = None
+calculate_weekly_winners = None
+load_todays_fixtures = None
+load_upcoming_fixtures = None
+notify_users_of_rescheduled_match = None
+normalize_league_name = None
+upload_storage = None
+
+_HELPERS = (
+    "SUPPORTED_LEAGUES",
+    "get_active_football_service",
+    "automated_result_update",
+    "calculate_weekly_winners",
+    "load_todays_fixtures",
+    "load_upcoming_fixtures",
+    "notify_users_of_rescheduled_match",
+    "normalize_league_name",
+    "upload_storage",
+)
+
+
+def set_db(database):
+    global db
+    db = database
+
+
+def set_helpers(**helpers):
+    """Inject the scheduler jobs and shared helpers that still live in server.py"""
+    for name, value in helpers.items():
+        if name not in _HELPERS:
+            raise ValueError(f"Unknown admin helper: {name}")
+        globals()[name] = value
+
+
+# Debug endpoint to check database state
+@router.get("/debug/db-status")
+async def debug_db_status():
+    """Check database status - for debugging deployment issues"""
+    try:
+        users_count = await db.users.count_documents({})
+        fixtures_count = await db.fixtures.count_documents({})
+        teams_count = await db.teams.count_documents({})
+        
+        # Check if aysin exists
+        aysin = await db.users.find_one({"username": "aysin"}, {"_id": 0, "username": 1, "email": 1})
+        
+        # Check JSON files
+        import json
+        from pathlib import Path
+        data_dir = Path(__file__).parent.parent
+        fixtures_json_exists = (data_dir / 'fixtures_data.json').exists()
+        users_json_exists = (data_dir / 'users_data.json').exists()
+        
+        return {
+            "database": {
+                "users": users_count,
+                "fixtures": fixtures_count,
+                "teams": teams_count,
+                "aysin_exists": aysin is not None,
+                "aysin_data": aysin
+            },
+            "json_files": {
+                "fixtures_data.json": fixtures_json_exists,
+                "users_data.json": users_json_exists
+            },
+            "status": "ok" if users_count > 0 and fixtures_count > 0 else "empty_db"
+        }
+    except Exception as e:
+        return {"error": str(e), "status": "error"}
+
+
+@router.get("/admin/seed-fa-cup")
+async def seed_fa_cup_fixtures():
+    """Fetch FA Cup fixtures from API-Football and seed them with real fixture IDs for auto-updates"""
+    try:
+        import aiohttp
+        from datetime import datetime
+        
+        # Try both possible API key variable names
+        api_key = os.environ.get('API_FOOTBALL_KEY') or os.environ.get('FOOTBALL_API_KEY')
+        if not api_key:
+            logger.warning("No API key found, using manual seeding")
+            return await seed_fa_cup_manual()
+        
+        logger.info(f"🔑 Using API key to fetch FA Cup fixtures...")
+        
+        # Delete existing FA Cup fixtures
+        deleted = await db.fixtures.delete_many({"league_name": "FA Cup"})
+        logger.info(f"Deleted {deleted.deleted_count} existing FA Cup fixtures")
+        
+        # Fetch FA Cup fixtures from API-Football
+        headers = {
+            "x-apisports-key": api_key,
+            "x-rapidapi-host": "v3.football.api-sports.io"
+        }
+        
+        async with aiohttp.ClientSession() as session:
+            # FA Cup league_id = 45, season = 2025
+            url = f"https://v3.football.api-sports.io/fixtures?league=45&season=2025"
+            logger.info(f"Fetching from: {url}")
+            
+            async with session.get(url, headers=headers) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    fixtures = data.get('response', [])
+                    
+                    if not fixtures:
+                        logger.warning("API returned no fixtures, using manual seeding")
+                        return await seed_fa_cup_manual()
+                    
+                    inserted_count = 0
+                    for fixture in fixtures:
+                        try:
+                            # Determine penalty winner from fixture data if available
+                            penalty_winner = None
+                            penalties = fixture.get('score', {}).get('penalty', {})
+                            if penalties.get('home') is not None and penalties.get('away') is not None:
+                                if penalties['home'] > penalties['away']:
+                                    penalty_winner = 'home'
+                                elif penalties['away'] > penalties['home']:
+                                    penalty_winner = 'away'
+                            
+                            fixture_data = {
+                                "fixture_id": fixture['fixture']['id'],
+                                "home_team": fixture['teams']['home']['name'],
+                                "away_team": fixture['teams']['away']['name'],
+                                "home_logo": fixture['teams']['home'].get('logo', ''),
+                                "away_logo": fixture['teams']['away'].get('logo', ''),
+                                "home_score": fixture['goals']['home'],
+                                "away_score": fixture['goals']['away'],
+                                "league_id": 45,
+                                "league_name": "FA Cup",
+                                "matchday": fixture['league'].get('round', 'Unknown'),
+                                "status": fixture['fixture']['status']['short'],
+                                "penalty_winner": penalty_winner,
+                                "utc_date": datetime.fromisoformat(fixture['fixture']['date'].replace('Z', '+00:00'))
+                            }
+                            
+                            await db.fixtures.update_one(
+                                {"fixture_id": fixture_data["fixture_id"]},
+                                {"$set": fixture_data},
+                                upsert=True
+                            )
+                            inserted_count += 1
+                        except Exception as fix_err:
+                            logger.error(f"Error processing fixture: {fix_err}")
+                            continue
+                    
+                    await MatchdayIndex(db).resync([45])
+                    logger.info(f"✅ Fetched {inserted_count} FA Cup fixtures from API with REAL IDs - will auto-update!")
+                    return {"success": True, "message": f"Fetched {inserted_count} FA Cup fixtures from API-Football with real IDs. Results will now auto-update!"}
+                else:
+                    error_text = await response.text()
+                    logger.error(f"API-Football error: {response.status} - {error_text}")
+                    return await seed_fa_cup_manual()
+                    
+    except Exception as e:
+        logger.error(f"Error fetching FA Cup fixtures: {str(e)}")
+        # Fallback to manual seeding
+        return await seed_fa_cup_manual()
+
+
+async def seed_fa_cup_manual():
+    """Fallback: Manually seed FA Cup Third Round fixtures"""
+    try:
+        from datetime import datetime
+        
+        # Delete any existing FA Cup fixtures first
+        deleted = await db.fixtures.delete_many({"league_name": "FA Cup"})
+        logger.info(f"Deleted {deleted.deleted_count} existing FA Cup fixtures")
+        
+        # Insert fresh FA Cup fixtures with ALL results
+        # For penalty shootouts: penalty_winner indicates the actual winner ("home" or "away")
+        fa_cup_fixtures = [
+            # Friday 9 January - COMPLETED
+            {"fixture_id": 9000000, "home_team": "Preston North End", "away_team": "Wigan Athletic", "utc_date": datetime(2026, 1, 9, 19, 30), "league_id": 45, "league_name": "FA Cup", "matchday": "Third Round", "status": "FINISHED", "home_score": 0, "away_score": 1, "penalty_winner": None, "home_logo": "", "away_logo": ""},
+            {"fixture_id": 9000001, "home_team": "Milton Keynes Dons", "away_team": "Oxford United", "utc_date": datetime(2026, 1, 9, 19, 30), "league_id": 45, "league_name": "FA Cup", "matchday": "Third Round", "status": "FINISHED_AET", "home_score": 1, "away_score": 1, "penalty_winner": "away", "home_logo": "", "away_logo": ""},
+            {"fixture_id": 9000002, "home_team": "Port Vale", "away_team": "Fleetwood Town", "utc_date": datetime(2026, 1, 9, 19, 30), "league_id": 45, "league_name": "FA Cup", "matchday": "Third Round", "status": "FINISHED", "home_score": 1, "away_score": 0, "penalty_winner": None, "home_logo": "", "away_logo": ""},
+            {"fixture_id": 9000003, "home_team": "Wrexham", "away_team": "Nottingham Forest", "utc_date": datetime(2026, 1, 9, 19, 30), "league_id": 45, "league_name": "FA Cup", "matchday": "Third Round", "status": "FINISHED_AET", "home_score": 3, "away_score": 3, "penalty_winner": "home", "home_logo": "", "away_logo": ""},
+            # Saturday 10 January - COMPLETED
+            {"fixture_id": 9000004, "home_team": "Cheltenham Town", "away_team": "Leicester City", "utc_date": datetime(2026, 1, 10, 12, 15), "league_id": 45, "league_name": "FA Cup", "matchday": "Third Round", "status": "FINISHED", "home_score": 0, "away_score": 2, "penalty_winner": None, "home_logo": "", "away_logo": ""},
+            {"fixture_id": 9000005, "home_team": "Everton", "away_team": "Sunderland", "utc_date": datetime(2026, 1, 10, 12, 15), "league_id": 45, "league_name": "FA Cup", "matchday": "Third Round", "status": "FINISHED_AET", "home_score": 1, "away_score": 1, "penalty_winner": "away", "home_logo": "", "away_logo": ""},
+            {"fixture_id": 9000006, "home_team": "Macclesfield FC", "away_team": "Crystal Palace", "utc_date": datetime(2026, 1, 10, 12, 15), "league_id": 45, "league_name": "FA Cup", "matchday": "Third Round", "status": "FINISHED", "home_score": 2, "away_score": 1, "penalty_winner": None, "home_logo": "", "away_logo": ""},
+            {"fixture_id": 9000007, "home_team": "Wolverhampton Wanderers", "away_team": "Shrewsbury Town", "utc_date": datetime(2026, 1, 10, 12, 15), "league_id": 45, "league_name": "FA Cup", "matchday": "Third Round", "status": "FINISHED", "home_score": 3, "away_score": 0, "penalty_winner": None, "home_logo": "", "away_logo": ""},
+            {"fixture_id": 9000008, "home_team": "Manchester City", "away_team": "Exeter City", "utc_date": datetime(2026, 1, 10, 15, 0), "league_id": 45, "league_name": "FA Cup", "matchday": "Third Round", "status": "FINISHED", "home_score": 8, "away_score": 0, "penalty_winner": None, "home_logo": "", "away_logo": ""},
+            {"fixture_id": 9000009, "home_team": "Burnley", "away_team": "Millwall", "utc_date": datetime(2026, 1, 10, 15, 0), "league_id": 45, "league_name": "FA Cup", "matchday": "Third Round", "status": "FINISHED", "home_score": 2, "away_score": 0, "penalty_winner": None, "home_logo": "", "away_logo": ""},
+            {"fixture_id": 9000010, "home_team": "Boreham Wood", "away_team": "Burton Albion", "utc_date": datetime(2026, 1, 10, 15, 0), "league_id": 45, "league_name": "FA Cup", "matchday": "Third Round", "status": "FINISHED", "home_score": 1, "away_score": 2, "penalty_winner": None, "home_logo": "", "away_logo": ""},
+            {"fixture_id": 9000011, "home_team": "Salford City", "away_team": "Swindon Town", "utc_date": datetime(2026, 1, 10, 15, 0), "league_id": 45, "league_name": "FA Cup", "matchday": "Third Round", "status": "POSTPONED", "home_score": None, "away_score": None, "penalty_winner": None, "home_logo": "", "away_logo": ""},
+            {"fixture_id": 9000012, "home_team": "Cambridge United", "away_team": "Birmingham City", "utc_date": datetime(2026, 1, 10, 17, 45), "league_id": 45, "league_name": "FA Cup", "matchday": "Third Round", "status": "FINISHED", "home_score": 0, "away_score": 3, "penalty_winner": None, "home_logo": "", "away_logo": ""},
+            {"fixture_id": 9000013, "home_team": "Tottenham Hotspur", "away_team": "Aston Villa", "utc_date": datetime(2026, 1, 10, 17, 45), "league_id": 45, "league_name": "FA Cup", "matchday": "Third Round", "status": "FINISHED", "home_score": 3, "away_score": 1, "penalty_winner": None, "home_logo": "", "away_logo": ""},
+            {"fixture_id": 9000014, "home_team": "Bristol City", "away_team": "Watford", "utc_date": datetime(2026, 1, 10, 17, 45), "league_id": 45, "league_name": "FA Cup", "matchday": "Third Round", "status": "FINISHED", "home_score": 2, "away_score": 1, "penalty_winner": None, "home_logo": "", "away_logo": ""},
+            {"fixture_id": 9000015, "home_team": "Grimsby Town", "away_team": "Weston-super-Mare", "utc_date": datetime(2026, 1, 10, 17, 45), "league_id": 45, "league_name": "FA Cup", "matchday": "Third Round", "status": "FINISHED", "home_score": 2, "away_score": 0, "penalty_winner": None, "home_logo": "", "away_logo": ""},
+            {"fixture_id": 9000016, "home_team": "Charlton Athletic", "away_team": "Chelsea", "utc_date": datetime(2026, 1, 10, 20, 0), "league_id": 45, "league_name": "FA Cup", "matchday": "Third Round", "status": "FINISHED", "home_score": 0, "away_score": 2, "penalty_winner": None, "home_logo": "", "away_logo": ""},
+            # Sunday 11 January - SCHEDULED (update when results come in)
+            {"fixture_id": 9000017, "home_team": "Derby County", "away_team": "Leeds United", "utc_date": datetime(2026, 1, 11, 12, 0), "league_id": 45, "league_name": "FA Cup", "matchday": "Third Round", "status": "SCHEDULED", "home_score": None, "away_score": None, "penalty_winner": None, "home_logo": "", "away_logo": ""},
+            {"fixture_id": 9000018, "home_team": "Portsmouth", "away_team": "Arsenal", "utc_date": datetime(2026, 1, 11, 14, 0), "league_id": 45, "league_name": "FA Cup", "matchday": "Third Round", "status": "SCHEDULED", "home_score": None, "away_score": None, "penalty_winner": None, "home_logo": "", "away_logo": ""},
+            {"fixture_id": 9000019, "home_team": "West Ham United", "away_team": "Queens Park Rangers", "utc_date": datetime(2026, 1, 11, 14, 30), "league_id": 45, "league_name": "FA Cup", "matchday": "Third Round", "status": "SCHEDULED", "home_score": None, "away_score": None, "penalty_winner": None, "home_logo": "", "away_logo": ""},
+            {"fixture_id": 9000020, "home_team": "Manchester United", "away_team": "Brighton & Hove Albion", "utc_date": datetime(2026, 1, 11, 16, 30), "league_id": 45, "league_name": "FA Cup", "matchday": "Third Round", "status": "SCHEDULED", "home_score": None, "away_score": None, "penalty_winner": None, "home_logo": "", "away_logo": ""},
+            # Monday 12 January
+            {"fixture_id": 9000021, "home_team": "Liverpool", "away_team": "Barnsley", "utc_date": datetime(2026, 1, 12, 19, 45), "league_id": 45, "league_name": "FA Cup", "matchday": "Third Round", "status": "SCHEDULED", "home_score": None, "away_score": None, "penalty_winner": None, "home_logo": "", "away_logo": ""},
+        ]
+        
+        result = await db.fixtures.insert_many(fa_cup_fixtures)
+        await MatchdayIndex(db).resync([45])
+        logger.info(f"✅ Manually seeded {len(result.inserted_ids)} FA Cup fixtures")
+        
+        return {"success": True, "message": f"Seeded {len(result.inserted_ids)} FA Cup fixtures - Wrexham 3-3 Forest (Wrexham pens), MK Dons 1-1 Oxford (Oxford pens)"}
+    except Exception as e:
+        logger.error(f"Error seeding FA Cup fixtures: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/admin/refresh-fixtures")
+async def refresh_fixtures_from_api():
+    """
+    Refresh fixtures from API-Football for the current season
+    Only updates fixtures from last 7 days to save API calls
+    """
+    try:
+        import subprocess
+        result = subprocess.run(
+            ['python3', '/app/backend/update_fixtures_endpoint.py'],
+            capture_output=True,
+            text=True,
+            timeout=120
+        )
+        
+        if result.returncode == 0:
+            return {
+                "status": "success",
+                "message": "Fixtures updated successfully",
+                "output": result.stdout
+            }
+        else:
+            return {
+                "status": "error",
+                "message": "Failed to update fixtures",
+                "error": result.stderr
+            }
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": str(e)
+        }
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/admin/cleanup-duplicates")
+async def cleanup_duplicate_fixtures():
+    """
+    Remove duplicate fixtures from database
+    Keeps the fixture with the highest fixture_id (most recent)
+    Handles team name variations with aggressive normalization
+    """
+    try:
+        def normalize_team_name(name):
+            """Universal normalization - strips FC/AFC/CF but keeps City/United in team names"""
+            if not name:
+                return ""
+            
+            # Convert to lowercase and strip
+            normalized = name.lower().strip()
+            
+            # Remove number prefixes (1., 1899, 1846, etc.)
+            import re
+            normalized = re.sub(r'^\d+\.?\s*', '', normalized)
+            normalized = re.sub(r'\s+\d{2,4}$', '', normalized)
+            
+            # Remove common prefixes FIRST
+            prefixes = ['afc ', 'fc ', 'tsg ', 'fsv ', 'sv ', 'sc ', 'rb ', 'vfb ', 'vfl ', 
+                       'cd ', 'gd ', 'us ', 'ss ', 'ssc ', 'acf ', 'as ', 'rc ', 'rcd ']
+            for prefix in prefixes:
+                if normalized.startswith(prefix):
+                    normalized = normalized[len(prefix):].strip()
+                    break
+            
+            # Special handling for teams that need "bayer" prefix kept
+            if 'bayer' in normalized and 'leverkusen' in normalized:
+                normalized = 'bayer leverkusen'
+            
+            # Handle Espanyol separately (has Barcelona in name but different team)
+            if 'espanyol' in normalized:
+                return 'espanyol'
+            
+            # Handle teams with "and" or "&" in name
+            normalized = normalized.replace('&', 'and')
+            
+            # Strip common suffixes UNIVERSALLY (but keep City/United/Hotspur as part of name)
+            # Remove these suffixes from the END
+            suffixes_to_remove = [
+                ' & hove albion fc',
+                ' & hove albion',
+                ' hove albion fc', 
+                ' hove albion',
+                ' hotspur fc',
+                ' wanderers fc',
+                ' athletic fc',
+                ' rovers fc',
+                ' albion fc',
+                ' county fc',
+                ' north end fc',
+                ' park rangers fc',
+                ' balompié',
+                ' de fútbol',
+                ' calcio',
+                ' bc',
+                ' ac',
+                ' fc',  # Strip FC universally
+                ' afc', # Strip AFC universally
+                ' cf',  # Strip CF universally
+                ' ec',
+                ' sv',
+                ' sc'
+            ]
+            
+            for suffix in suffixes_to_remove:
+                if normalized.endswith(suffix):
+                    normalized = normalized[:-len(suffix)].strip()
+                    break  # Only remove one suffix
+            
+            # Additional specific handlers for known problem cases
+            # Keep these AFTER suffix removal to handle any edge cases
+            
+            # Netherlands - keep short forms
+            if normalized == 'ajax amsterdam' or normalized == 'ajax':
+                return 'ajax'
+            elif normalized == 'psv eindhoven' or normalized == 'psv':
+                return 'psv'
+            elif normalized == 'feyenoord rotterdam' or normalized == 'feyenoord':
+                return 'feyenoord'
+            
+            # Portugal
+            elif normalized == 'sport lisboa e benfica' or normalized == 'benfica':
+                return 'benfica'
+            elif 'sporting' in normalized and 'braga' not in normalized and ('portugal' in normalized or 'cp' in normalized or normalized == 'sporting'):
+                return 'sporting'
+            elif normalized == 'sporting braga' or (normalized == 'braga' and 'sporting' in name.lower()):
+                return 'sporting braga'
+            elif 'porto' in normalized:
+                return 'porto'
+            
+            # Spain
+            elif normalized == 'real madrid':
+                return 'real madrid'
+            elif normalized == 'barcelona':
+                return 'barcelona'
+            elif normalized == 'atletico madrid' or normalized == 'atletico de madrid':
+                return 'atletico madrid'
+            elif normalized == 'athletic bilbao' or normalized == 'athletic club':
+                return 'athletic club'
+            
+            # France - Ligue 1
+            elif 'paris saint-germain' in normalized or 'paris saint germain' in normalized or normalized == 'paris':
+                return 'paris saint-germain'
+            
+            # Italy
+            elif 'inter' in normalized and 'milan' in normalized:
+                return 'inter milan'
+            elif normalized == 'inter' or normalized == 'internazionale':
+                return 'inter'
+            elif normalized == 'milan' or normalized == 'ac milan':
+                return 'milan'
+            elif normalized == 'juventus':
+                return 'juventus'
+            
+            # Scotland - keep separate
+            elif normalized == 'dundee united' or normalized == 'dundee utd':
+                return 'dundee united'
+            elif normalized == 'dundee':
+                return 'dundee'
+            
+            # Germany
+            elif 'hoffenheim' in normalized:
+                return 'hoffenheim'
+            elif 'heidenheim' in normalized:
+                return 'heidenheim'
+            elif 'bayern' in normalized and ('münchen' in normalized or 'munich' in normalized):
+                return 'bayern munich'
+            elif 'borussia' in normalized and 'dortmund' in normalized:
+                return 'borussia dortmund'
+            elif 'borussia' in normalized and ('monchengladbach' in normalized or 'mönchengladbach' in normalized):
+                return 'borussia monchengladbach'
+            
+            # Clean up double spaces
+            normalized = re.sub(r'\s+', ' ', normalized).strip()
+            
+            return normalized
+        
+        # Find all fixtures
+        all_fixtures = await db.fixtures.find({}).to_list(length=None)
+        
+        # Track unique matches with normalized names
+        seen = {}
+        duplicates_to_remove = []
+        
+        for fixture in all_fixtures:
+            home = fixture.get('home_team', '')
+            away = fixture.get('away_team', '')
+            date = fixture.get('utc_date')
+            fixture_id = fixture.get('fixture_id')
+            league_id = fixture.get('league_id')
+            
+            # Normalize team names for comparison
+            home_norm = normalize_team_name(home)
+            away_norm = normalize_team_name(away)
+            
+            # Create key with normalized names and league
+            key = f"{league_id}|{home_norm}|{away_norm}|{date}"
+            
+            if key in seen:
+                # Duplicate found - keep the one with higher fixture_id (more recent)
+                existing_id, existing_original = seen[key]
+                if fixture_id > existing_id:
+                    # Remove old one, keep new one
+                    duplicates_to_remove.append(existing_id)
+                    seen[key] = (fixture_id, (home, away))
+                else:
+                    # Remove this one, keep existing
+                    duplicates_to_remove.append(fixture_id)
+            else:
+                seen[key] = (fixture_id, (home, away))
+        
+        removed_count = 0
+        if duplicates_to_remove:
+            result = await db.fixtures.delete_many({'fixture_id': {'$in': duplicates_to_remove}})
+            removed_count = result.deleted_count
+            await MatchdayIndex(db).resync()
+        
+        remaining = await db.fixtures.count_documents({})
+        
+        logger.info(f"✅ Cleaned up {removed_count} duplicate fixtures (aggressive normalization). {remaining} remaining.")
+        
+        return {
+            "message": "Duplicates cleaned up successfully",
+            "duplicates_removed": removed_count,
+            "remaining_fixtures": remaining
+        }
+    except Exception as e:
+        logger.error(f"Error cleaning up duplicates: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/admin/score-predictions")
+async def score_all_pending_predictions():
+    """
+    Score all pending predictions by checking fixture statuses
+    """
+    try:
+        # Get all pending predictions
+        pending_predictions = await db.predictions.find({"result": "pending"}).to_list(1000)
+        
+        scored_count = 0
+        not_finished_count = 0
+        scored_users = set()
+        
+        for pred in pending_predictions:
+            fixture_id = pred.get('fixture_id')
+            
+            # Get fixture from database
+            fixture = await db.fixtures.find_one({"fixture_id": fixture_id})
+            
+            if not fixture:
+                logger.warning(f"Fixture {fixture_id} not found for prediction {pred.get('id')}")
+                continue
+            
+            # Only score if fixture is finished and has scores
+            if fixture.get('status') == 'FINISHED' and fixture.get('home_score') is not None:
+                home_score = fixture.get('home_score')
+                away_score = fixture.get('away_score')
+                penalty_winner = fixture.get('penalty_winner')  # "home", "away", or None
+                
+                # Determine actual result - check penalty_winner first for knockout matches
+                if penalty_winner:
+                    actual_result = penalty_winner  # "home" or "away" based on penalty shootout
+                elif home_score > away_score:
+                    actual_result = 'home'
+                elif away_score > home_score:
+                    actual_result = 'away'
+                else:
+                    actual_result = 'draw'
+                
+                # Score prediction - mark as correct/incorrect
+                # But DON'T add points yet - points awarded weekly by calculate_weekly_winners
+                is_correct = pred.get('prediction') == actual_result
+                
+                await db.predictions.update_one(
+                    {"id": pred['id']},
+                    {"$set": {
+                        "result": "correct" if is_correct else "incorrect",
+                        "actual_result": actual_result,
+                        "home_score": home_score,
+                        "away_score": away_score,
+                        "penalty_winner": penalty_winner
+                    }}
+                )
+                scored_count += 1
+                scored_users.add(pred['user_id'])
+                
+                # Note: User points calculated weekly, not per prediction
+            else:
+                not_finished_count += 1
+        
+        await TeamStandings(db).refresh_users(scored_users)
+        logger.info(f"✅ Scored {scored_count} predictions, {not_finished_count} still pending (fixtures not finished)")
+        
+        return {
+            "message": "Predictions scored successfully",
+            "predictions_scored": scored_count,
+            "still_pending": not_finished_count,
+            "total_checked": len(pending_predictions)
+        }
+        
+    except Exception as e:
+        logger.error(f"Error scoring predictions: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/admin/update-results")
+async def update_match_results():
+    """
+    Fetch latest scores for finished matches and update predictions
+    This should be called periodically (e.g., after match days)
+    """
+    try:
+        updated_count = 0
+        scored_predictions = 0
+        scored_users = set()
+        
+        # Fetch all fixtures from API to get latest scores
+        # British Isles, European, then Rest of World
+        league_ids = [39, 40, 179, 140, 78, 135, 61, 94, 88, 203, 253, 71, 239, 45]  # All leagues including FA Cup
+        service = get_active_football_service()
+        
+        # Get fixtures for actual season dates (not simulated future dates)
+        from datetime import datetime, timedelta
+        
+        # Fetch recent matches from the 2025-26 season (last 7 days)
+        recent_dates = []
+        today = datetime.now(timezone.utc)
+        for i in range(7):
+            date = today - timedelta(days=i)
+            recent_dates.append(date.strftime('%Y-%m-%d'))
+        
+        all_fixtures = []
+        for date_str in recent_dates:
+            for league_id in league_ids:
+                fixtures = await service.get_fixtures_by_date(date_str, league_id, season=2025)
+                all_fixtures.extend(fixtures)
+        
+        if not all_fixtures:
+            return {"message": "No fixtures data available", "updated": 0}
+        
+        # Transform and update fixtures in database
+        transformed = service.transform_to_standard_format(all_fixtures)
+        
+        for fixture in transformed:
+            # Check if this is a rescheduled match (was POSTPONED, now SCHEDULED or TIMED)
+            existing_fixture = await db.fixtures.find_one({"fixture_id": fixture['fixture_id']})
+            if existing_fixture and existing_fixture.get('status') == 'POSTPONED' and fixture['status'] in ['SCHEDULED', 'TIMED', 'NOT_STARTED']:
+                # This match was rescheduled! Notify users
+                logger.info(f"📅 Detected rescheduled match: {fixture['home_team']} vs {fixture['away_team']}")
+                new_date = fixture.get('utc_date')
+                if isinstance(new_date, str):
+                    from datetime import datetime as dt
+                    new_date = dt.fromisoformat(new_date.replace('Z', '+00:00'))
+                
+                await notify_users_of_rescheduled_match(
+                    fixture_id=fixture['fixture_id'],
+                    home_team=fixture['home_team'],
+                    away_team=fixture['away_team'],
+                    new_date=new_date,
+                    league_name=fixture.get('league_name', 'League')
+                )
+            
+            # Only process finished matches with scores
+            if fixture['status'] == 'FINISHED' and fixture.get('home_score') is not None:
+                # Update fixture in database
+                result = await db.fixtures.update_one(
+                    {"fixture_id": fixture['fixture_id']},
+                    {"$set": {
+                        "home_score": fixture['home_score'],
+                        "away_score": fixture['away_score'],
+                        "status": fixture['status'],
+                        "home_team": fixture['home_team'],
+                        "away_team": fixture['away_team'],
+                        "league_name": fixture['league_name']
+                    }}
+                )
+                
+                if result.modified_count > 0:
+                    updated_count += 1
+                    
+                    # Determine actual result
+                    home_score = fixture['home_score']
+                    away_score = fixture['away_score']
+                    penalty_winner = fixture.get('penalty_winner')  # "home", "away", or None
+                    
+                    # Check penalty_winner first for knockout matches
+                    if penalty_winner:
+                        actual_result = penalty_winner
+                    elif home_score > away_score:
+                        actual_result = 'home'
+                    elif away_score > home_score:
+                        actual_result = 'away'
+                    else:
+                        actual_result = 'draw'
+                    
+                    # Find all predictions for this fixture
+                    predictions = await db.predictions.find({
+                        "fixture_id": fixture['fixture_id'],
+                        "result": "pending"  # Only update pending predictions
+                    }).to_list(1000)
+                    
+                    # Score each prediction
+                    for pred in predictions:
+                        is_correct = pred['prediction'] == actual_result
+                        points = 0  # No points per prediction - only matchday winners get points
+                        
+                        await db.predictions.update_one(
+                            {"id": pred['id']},
+                            {"$set": {
+                                "result": "correct" if is_correct else "incorrect",
+                                "points": points
+                            }}
+                        )
+                        scored_predictions += 1
+                        scored_users.add(pred['user_id'])
+                        
+                        # Note: User points calculated weekly, not per prediction
+        
+        await MatchdayIndex(db).resync()
+        await TeamStandings(db).refresh_users(scored_users)
+        logger.info(f"Updated {updated_count} fixtures and scored {scored_predictions} predictions")
+        
+        return {
+            "message": "Results updated successfully",
+            "fixtures_updated": updated_count,
+            "predictions_scored": scored_predictions
+        }
+        
+    except Exception as e:
+        logger.error(f"Error updating results: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error updating results: {str(e)}")
+
+
+@router.post("/admin/load-todays-fixtures")
+async def trigger_load_todays_fixtures():
+    """
+    Admin endpoint to manually load today's and tomorrow's fixtures
+    Useful after deployments or to refresh current matches
+    """
+    try:
+        await load_todays_fixtures()
+        return {"status": "success", "message": "Today's fixtures loaded"}
+    except Exception as e:
+        logger.error(f"Error in admin load today's fixtures: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/admin/load-upcoming-fixtures")
+async def trigger_load_upcoming_fixtures():
+    """Manually trigger the weekly upcoming-fixtures refresh (next 30 days)"""
+    return await load_upcoming_fixtures()
+
+
+@router.post("/admin/update-all-historical-results")
+async def update_all_historical_results():
+    """
+    Fetch ALL historical match results from August 2024 (start of season) to present
+    This updates fixtures and scores all predictions for the entire season
+    Use this to backfill historical data
+    """
+    try:
+        from datetime import datetime, timedelta, timezone
+        
+        logger.info("🔄 Starting FULL HISTORICAL result update (August 2024 - Present)...")
+        
+        updated_count = 0
+        scored_predictions = 0
+        scored_users = set()
+        
+        # All supported leagues
+        league_ids = [39, 40, 179, 140, 78, 135, 61, 94, 88, 203, 253, 71, 239, 45]
+        service = get_active_football_service()
+        
+        # Season start: August 1, 2024 through today
+        start_date = datetime(2024, 8, 1, tzinfo=timezone.utc)
+        end_date = datetime.now(timezone.utc)
+        
+        # Calculate number of days to fetch
+        days_to_fetch = (end_date - start_date).days + 1
+        logger.info(f"   Fetching {days_to_fetch} days of fixtures from {start_date.date()} to {end_date.date()}")
+        
+        all_fixtures = []
+        
+        # Fetch fixtures day by day (API limitation)
+        for day_offset in range(days_to_fetch):
+            check_date = start_date + timedelta(days=day_offset)
+            date_str = check_date.strftime('%Y-%m-%d')
+            
+            for league_id in league_ids:
+                try:
+                    fixtures = await service.get_fixtures_by_date(date_str, league_id, season=2025)
+                    all_fixtures.extend(fixtures)
+                except Exception as e:
+                    logger.warning(f"   Error fetching {date_str} league {league_id}: {str(e)}")
+                    continue
+        
+        logger.info(f"   Retrieved {len(all_fixtures)} total fixtures from API")
+        
+        if not all_fixtures:
+            return {
+                "message": "No fixtures found for historical period",
+                "fixtures_updated": 0,
+                "predictions_scored": 0
+            }
+        
+        # Transform fixtures to standard format
+        transformed = service.transform_to_standard_format(all_fixtures)
+        
+        # Process each finished fixture
+        for fixture in transformed:
+            if fixture['status'] == 'FINISHED' and fixture.get('home_score') is not None:
+                # Update fixture in database
+                result = await db.fixtures.update_one(
+                    {"fixture_id": fixture['fixture_id']},
+                    {"$set": {
+                        "home_score": fixture['home_score'],
+                        "away_score": fixture['away_score'],
+                        "status": fixture['status'],
+                        "home_team": fixture['home_team'],
+                        "away_team": fixture['away_team'],
+                        "league_name": fixture['league_name']
+                    }},
+                    upsert=True
+                )
+                
+                if result.modified_count > 0 or result.upserted_id:
+                    updated_count += 1
+                
+                # Determine actual result
+                home_score = fixture['home_score']
+                away_score = fixture['away_score']
+                penalty_winner = fixture.get('penalty_winner')  # "home", "away", or None
+                
+                # Check penalty_winner first for knockout matches
+                if penalty_winner:
+                    actual_result = penalty_winner
+                elif home_score > away_score:
+                    actual_result = 'home'
+                elif away_score > home_score:
+                    actual_result = 'away'
+                else:
+                    actual_result = 'draw'
+                
+                # Find all pending predictions for this fixture
+                predictions = await db.predictions.find({
+                    "fixture_id": fixture['fixture_id'],
+                    "result": "pending"
+                }).to_list(1000)
+                
+                # Score each prediction
+                for pred in predictions:
+                    is_correct = pred['prediction'] == actual_result
+                    points = 0  # No points per prediction - only matchday winners get points
+                    
+                    # Update prediction with result AND match details
+                    await db.predictions.update_one(
+                        {"id": pred['id']},
+                        {"$set": {
+                            "result": "correct" if is_correct else "incorrect",
+                            "points": points,
+                            "home_team": fixture['home_team'],
+                            "away_team": fixture['away_team'],
+                            "league": fixture['league_name'],
+                            "home_score": home_score,
+                            "away_score": away_score,
+                            "status": fixture['status']
+                        }}
+                    )
+                    scored_predictions += 1
+                    scored_users.add(pred['user_id'])
+        
+        await MatchdayIndex(db).resync()
+        await TeamStandings(db).refresh_users(scored_users)
+        logger.info(f"✅ Historical update complete: {updated_count} fixtures updated, {scored_predictions} predictions scored")
+        
+        return {
+            "message": "Historical results updated successfully",
+            "fixtures_updated": updated_count,
+            "predictions_scored": scored_predictions,
+            "date_range": f"{start_date.date()} to {end_date.date()}"
+        }
+        
+    except Exception as e:
+        logger.error(f"❌ Error in historical update: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error updating historical results: {str(e)}")
+
+
+@router.get("/admin/debug-fixtures")
+async def debug_fixtures():
+    """Debug: Check what fixtures exist for Dec 6-8, 2025"""
+    try:
+        from datetime import datetime
+        
+        # Check fixtures for Dec 6-8
+        fixtures = await db.fixtures.find(
+            {
+                "utc_date": {
+                    "$gte": datetime(2025, 12, 6, 0, 0, 0),
+                    "$lte": datetime(2025, 12, 8, 23, 59, 59)
+                }
+            },
+            {"_id": 0}
+        ).to_list(50)
+        
+        summary = {
+            "total_found": len(fixtures),
+            "date_range": "Dec 6-8, 2025",
+            "current_server_time": datetime.now().isoformat(),
+            "fixtures": []
+        }
+        
+        for fix in fixtures[:20]:
+            summary["fixtures"].append({
+                "date": str(fix.get('utc_date'))[:16],
+                "status": fix.get('status'),
+                "match": f"{fix.get('home_team')} vs {fix.get('away_team')}",
+                "league": fix.get('league_name'),
+                "has_scores": fix.get('home_score') is not None
+            })
+        
+        return summary
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@router.get("/admin/test-date-query")
+async def test_date_query(days_ahead: int = 28):
+    """Test what the date query returns"""
+    try:
+        from datetime import datetime, timedelta, timezone
+        
+        now = datetime.now(timezone.utc)
+        start_date = now.replace(tzinfo=None) - timedelta(days=3)
+        end_date = now.replace(tzinfo=None) + timedelta(days=days_ahead)
+        
+        # Same query as get_fixtures
+        count = await db.fixtures.count_documents({
+            "utc_date": {
+                "$gte": start_date,
+                "$lte": end_date,
+                "$ne": None
+            }
+        })
+        
+        # Sample fixtures
+        samples = await db.fixtures.find(
+            {
+                "utc_date": {
+                    "$gte": start_date,
+                    "$lte": end_date,
+                    "$ne": None
+                }
+            },
+            {"_id": 0, "home_team": 1, "away_team": 1, "utc_date": 1, "matchday": 1}
+        ).sort("utc_date", 1).limit(20).to_list(20)
+        
+        return {
+            "query_params": {
+                "days_ahead": days_ahead,
+                "start_date": str(start_date),
+                "end_date": str(end_date),
+                "now": str(now)
+            },
+            "total_found": count,
+            "sample_fixtures": [
+                {
+                    "date": str(f.get('utc_date'))[:16] if f.get('utc_date') else "NO DATE",
+                    "match": f"{f.get('home_team')} vs {f.get('away_team')}",
+                    "matchday": f.get('matchday')
+                }
+                for f in samples
+            ]
+        }
+    except Exception as e:
+        import traceback
+        return {"error": str(e), "traceback": traceback.format_exc()}
+
+
+@router.get("/admin/check-future-fixtures")
+async def check_future_fixtures():
+    """Check what fixtures exist after Dec 8, 2025"""
+    try:
+        from datetime import datetime
+        
+        # Count fixtures after Dec 8
+        after_dec8 = await db.fixtures.count_documents({
+            "utc_date": {"$gt": datetime(2025, 12, 8, 23, 59, 59)}
+        })
+        
+        # Count fixtures with NULL dates
+        null_dates = await db.fixtures.count_documents({
+            "utc_date": None
+        })
+        
+        # Sample fixtures Dec 9-15
+        sample = await db.fixtures.find(
+            {
+                "utc_date": {
+                    "$gte": datetime(2025, 12, 9, 0, 0, 0),
+                    "$lte": datetime(2025, 12, 15, 23, 59, 59)
+                }
+            },
+            {"_id": 0, "home_team": 1, "away_team": 1, "utc_date": 1, "matchday": 1}
+        ).limit(10).to_list(10)
+        
+        return {
+            "fixtures_after_dec8": after_dec8,
+            "fixtures_with_null_dates": null_dates,
+            "sample_dec9_15": [
+                {
+                    "match": f"{f.get('home_team')} vs {f.get('away_team')}",
+                    "date": str(f.get('utc_date'))[:16],
+                    "matchday": f.get('matchday')
+                }
+                for f in sample
+            ]
+        }
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@router.get("/admin/test-sportmonks")
+async def test_sportmonks_connection():
+    """Test Sportmonks API connection and functionality"""
+    try:
+        from sportmonks_service import SportmonksService
+        
+        service = SportmonksService()
+        
+        # Test connection
+        connection_test = await service.test_connection()
+        
+        # Test getting fixtures for a recent date (try to find West Ham vs Sunderland)
+        test_date = "2025-08-16"  # Opening day of 2025-26 season
+        fixtures = await service.get_fixtures_by_date(test_date, league_id=39)  # Premier League
+        
+        return {
+            "sportmonks_available": await service.is_available(),
+            "connection_test": connection_test,
+            "test_fixtures": {
+                "date": test_date,
+                "count": len(fixtures),
+                "fixtures": fixtures[:3] if fixtures else []  # Show first 3 fixtures
+            }
+        }
+        
+    except Exception as e:
+        logger.error(f"Error testing Sportmonks: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Sportmonks test failed: {str(e)}")
+
+
+    """Reset all user and team scores to zero (Admin only)"""
+    try:
+        # Reset all user scores
+        users_result = await db.users.update_many({}, {
+            "$set": {
+                "total_points": 0,
+                "season_points": 0, 
+                "weekly_points": 0,
+                "weekly_wins": 0,
+                "correct_predictions": 0,
+                "incorrect_predictions": 0,
+                "total_predictions": 0
+            }
+        })
+        
+        # Reset team stats if they exist
+        teams_result = await db.teams.update_many({}, {
+            "$set": {
+                "total_points": 0,
+                "season_points": 0,
+                "weekly_points": 0
+            }
+        })
+        
+        # Reset weekly pots to inactive status
+        pots_result = await db.weekly_pots.update_many({}, {
+            "$set": {
+                "status": "inactive",
+                "total_amount": 0,
+                "winner": None
+            }
+        })
+        
+        # Reset all prediction scores
+        predictions_result = await db.predictions.update_many({}, {
+            "$set": {
+                "correct": None,
+                "points_awarded": 0
+            }
+        })
+        
+        entity_cache.clear_all()
+        logger.info(f"✅ Scores reset: {users_result.modified_count} users, {teams_result.modified_count} teams, {pots_result.modified_count} pots, {predictions_result.modified_count} predictions")
+        
+        return {
+            "message": "All scores reset to zero successfully",
+            "users_updated": users_result.modified_count,
+            "teams_updated": teams_result.modified_count, 
+            "pots_updated": pots_result.modified_count,
+            "predictions_updated": predictions_result.modified_count
+        }
+        
+    except Exception as e:
+        logger.error(f"Error resetting scores: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to reset scores: {str(e)}")
+
+
+@router.get("/admin/debug/team-database/{team_id}")
+async def debug_team_database(team_id: str):
+    """
+    🔍 Debug endpoint to inspect raw database state for a team
+    Shows: members, predictions grouped by league name, potential duplicates
+    
+    Usage after deployment:
+    curl "https://your-app-url.com/api/admin/debug/team-database/{team_id}"
+    """
+    try:
+        # Get team info
+        team = await db.teams.find_one({"id": team_id}, {"_id": 0})
+        if not team:
+            return {"error": "Team not found"}
+        
+        # Get all team members
+        members = await db.team_members.find({"team_id": team_id}, {"_id": 0}).to_list(100)
+        member_ids = [m['user_id'] for m in members]
+        
+        # Get all users
+        users = await db.users.find({"id": {"$in": member_ids}}, {"_id": 0}).to_list(100)
+        user_map = {u['id']: u.get('username', 'Unknown') for u in users}
+        
+        # Get all predictions for team members
+        predictions = await db.predictions.find(
+            {"user_id": {"$in": member_ids}}, 
+            {"_id": 0}
+        ).to_list(10000)
+        
+        # Group predictions by league name (RAW - showing duplicates if any)
+        league_summary = {}
+        for pred in predictions:
+            league_name = pred.get('league', 'Unknown')
+            league_id = pred.get('league_id', 'N/A')
+            user_id = pred.get('user_id')
+            username = user_map.get(user_id, 'Unknown')
+            
+            key = f"{league_name} (ID: {league_id})"
+            if key not in league_summary:
+                league_summary[key] = {
+                    'raw_name': league_name,
+                    'normalized_name': normalize_league_name(league_name),
+                    'league_id': league_id,
+                    'total_predictions': 0,
+                    'users': {}
+                }
+            
+            league_summary[key]['total_predictions'] += 1
+            
+            if username not in league_summary[key]['users']:
+                league_summary[key]['users'][username] = 0
+            league_summary[key]['users'][username] += 1
+        
+        # Get league points
+        league_points = await db.user_league_points.find(
+            {"user_id": {"$in": member_ids}},
+            {"_id": 0}
+        ).to_list(10000)
+        
+        # Check for duplicate league names
+        duplicate_leagues = {}
+        league_ids = {}
+        for key, data in league_summary.items():
+            league_id = data['league_id']
+            if league_id not in league_ids:
+                league_ids[league_id] = []
+            league_ids[league_id].append(data['raw_name'])
+        
+        for league_id, names in league_ids.items():
+            if len(names) > 1:
+                duplicate_leagues[league_id] = {
+                    'league_id': league_id,
+                    'duplicate_names': names,
+                    'normalized_to': normalize_league_name(names[0])
+                }
+        
+        return {
+            "team": {
+                "id": team_id,
+                "name": team.get('name'),
+                "member_count": len(members)
+            },
+            "members": [
+                {
+                    "username": user_map.get(m['user_id'], 'Unknown'),
+                    "user_id": m['user_id']
+                }
+                for m in members
+            ],
+            "league_summary": league_summary,
+            "duplicate_leagues": duplicate_leagues,
+            "league_points_count": len(league_points),
+            "total_predictions": len(predictions),
+            "note": "duplicate_leagues shows which leagues have inconsistent naming that will be normalized"
+        }
+        
+    except Exception as e:
+        return {"error": str(e), "type": type(e).__name__}
+
+
+@router.get("/admin/debug/test-normalization")
+async def debug_test_normalization():
+    """
+    🧪 Test the league name normalization function
+    Shows how different league names will be normalized
+    """
+    test_cases = [
+        "Championship",
+        "Championship (England)",
+        "Premier League",
+        "Premier League (England)",
+        "La Liga",
+        "La Liga (Spain)",
+        "UEFA Champions League",
+        "UEFA Europa League (Europe)",
+    ]
+    
+    results = {}
+    for name in test_cases:
+        results[name] = normalize_league_name(name)
+    
+    return {
+        "normalization_examples": results,
+        "note": "Names with the same normalized value will be merged in leaderboards"
+    }
+
+
+@router.get("/admin/debug/user-team-data/{username}")
+async def debug_user_team_data(username: str):
+    """
+    🔍 Debug endpoint - Find team and database state by username
+    Easier than needing team_id
+    
+    Usage: /api/admin/debug/user-team-data/aysin
+    """
+    try:
+        # Find user
+        user = await db.users.find_one({"username": username}, {"_id": 0})
+        if not user:
+            return {"error": f"User '{username}' not found"}
+        
+        user_id = user['id']
+        
+        # Find team membership
+        team_member = await db.team_members.find_one({"user_id": user_id}, {"_id": 0})
+        if not team_member:
+            return {"error": f"User '{username}' is not in any team"}
+        
+        team_id = team_member['team_id']
+        
+        # Get team info
+        team = await db.teams.find_one({"id": team_id}, {"_id": 0})
+        
+        # Get all team members
+        members = await db.team_members.find({"team_id": team_id}, {"_id": 0}).to_list(100)
+        member_ids = [m['user_id'] for m in members]
+        
+        # Get all users
+        users = await db.users.find({"id": {"$in": member_ids}}, {"_id": 0}).to_list(100)
+        user_map = {u['id']: u.get('username', 'Unknown') for u in users}
+        
+        # Get all predictions for team members
+        predictions = await db.predictions.find(
+            {"user_id": {"$in": member_ids}}, 
+            {"_id": 0}
+        ).to_list(10000)
+        
+        # Group predictions by league and user
+        league_summary = {}
+        for pred in predictions:
+            league_name = pred.get('league', 'Unknown')
+            league_id = pred.get('league_id', 'N/A')
+            user_id_pred = pred.get('user_id')
+            username_pred = user_map.get(user_id_pred, 'Unknown')
+            result = pred.get('result', 'pending')
+            
+            # Use normalized name as key
+            normalized = normalize_league_name(league_name)
+            key = f"{normalized} (ID: {league_id})"
+            
+            if key not in league_summary:
+                league_summary[key] = {
+                    'normalized_name': normalized,
+                    'league_id': league_id,
+                    'raw_names_seen': set(),
+                    'users': {}
+                }
+            
+            # Track raw names
+            league_summary[key]['raw_names_seen'].add(league_name)
+            
+            if username_pred not in league_summary[key]['users']:
+                league_summary[key]['users'][username_pred] = {
+                    'total': 0,
+                    'correct': 0,
+                    'incorrect': 0,
+                    'pending': 0
+                }
+            
+            league_summary[key]['users'][username_pred]['total'] += 1
+            league_summary[key]['users'][username_pred][result] += 1
+        
+        # Convert sets to lists for JSON serialization
+        for league in league_summary.values():
+            league['raw_names_seen'] = list(league['raw_names_seen'])
+        
+        # Check for users with NO predictions
+        users_with_no_predictions = []
+        for uid, uname in user_map.items():
+            user_pred_count = len([p for p in predictions if p['user_id'] == uid])
+            if user_pred_count == 0:
+                users_with_no_predictions.append(uname)
+        
+        return {
+            "requested_user": username,
+            "team": {
+                "id": team_id,
+                "name": team.get('name'),
+                "total_members": len(members)
+            },
+            "all_team_members": list(user_map.values()),
+            "users_with_no_predictions": users_with_no_predictions,
+            "league_summary": league_summary,
+            "total_predictions": len(predictions),
+            "note": "Check 'users' under each league to see who has predictions and who is missing"
+        }
+        
+    except Exception as e:
+        import traceback
+        return {
+            "error": str(e), 
+            "type": type(e).__name__,
+            "traceback": traceback.format_exc()
+        }
+
+
+@router.get("/admin/force-results-update")
+async def force_results_update():
+    """Force update results from API"""
+    try:
+        await automated_result_update()
+        return {"status": "success", "message": "Results updated"}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+
+@router.get("/admin/wipe-predictions")
+async def wipe_all_predictions(confirm_code: str):
+    """
+    ADMIN ENDPOINT: Wipe all predictions and reset points
+    Requires confirmation code to prevent accidental wipes
+    
+    Usage: POST /api/admin/wipe-predictions?confirm_code=WIPE2024
+    """
+    # Safety check - require confirmation code
+    if confirm_code != "WIPE2024":
+        raise HTTPException(status_code=403, detail="Invalid confirmation code")
+    
+    try:
+        # Count before deletion
+        predictions_count = await db.predictions.count_documents({})
+        league_points_count = await db.user_league_points.count_documents({})
+        
+        # Delete all predictions
+        result1 = await db.predictions.delete_many({})
+        
+        # Delete all league points
+        result2 = await db.user_league_points.delete_many({})
+        
+        # Reset user points to zero
+        result3 = await db.users.update_many(
+            {},
+            {
+                "$set": {
+                    "total_points": 0,
+                    "season_points": 0,
+                    "points": 0,
+                    "correct_predictions": 0,
+                    "total_predictions": 0,
+                    "weekly_wins": 0
+                }
+            }
+        )
+        
+        entity_cache.users.clear()
+        await TeamStandings(db).rebuild()
+        logger.info(f"🧹 WIPE COMPLETE: Deleted {result1.deleted_count} predictions, {result2.deleted_count} league points, reset {result3.modified_count} users")
+        
+        return {
+            "status": "success",
+            "message": "All predictions and points wiped successfully",
+            "details": {
+                "predictions_deleted": result1.deleted_count,
+                "league_points_deleted": result2.deleted_count,
+                "users_reset": result3.modified_count,
+                "users_preserved": await db.users.count_documents({}),
+                "teams_preserved": await db.teams.count_documents({})
+            }
+        }
+        
+    except Exception as e:
+        logger.error(f"Error wiping predictions: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+        logger.error(f"Error fetching sent invitations: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/admin/update-fixture-status/{fixture_id}")
+async def update_fixture_status(fixture_id: int, status: str):
+    """
+    Admin endpoint to update a fixture's status directly.
+    Use this to mark fixtures as POSTPONED, SCHEDULED, FINISHED, etc.
+    
+    Example: POST /api/admin/update-fixture-status/9000011?status=POSTPONED
+    """
+    valid_statuses = ['SCHEDULED', 'POSTPONED', 'CANCELLED', 'FINISHED', 'ABANDONED', 'TIMED', 'NOT_STARTED']
+    if status.upper() not in valid_statuses:
+        raise HTTPException(status_code=400, detail=f"Invalid status. Must be one of: {valid_statuses}")
+    
+    previous = await MatchdayIndex(db).upsert_fixture(
+        {"fixture_id": fixture_id, "status": status.upper()}, upsert=False
+    )
+    
+    if previous is None:
+        raise HTTPException(status_code=404, detail=f"Fixture {fixture_id} not found")
+    
+    logger.info(f"✅ Updated fixture {fixture_id} status to {status.upper()}")
+    return {
+        "success": True,
+        "message": f"Fixture {fixture_id} status updated to {status.upper()}",
+        "modified": int(previous.get("status") != status.upper())
+    }
+
+
+@router.get("/admin/fix-postponed-fixtures")
+async def fix_postponed_fixtures():
+    """
+    One-time fix: Update Salford City vs Swindon Town to POSTPONED status with rescheduled date.
+    The match was postponed from Jan 10 and rescheduled to Jan 20, 2026.
+    """
+    from datetime import datetime as dt
+    
+    # Rescheduled date: Tuesday, January 20, 2026
+    rescheduled_date = dt(2026, 1, 20, 19, 45)  # 7:45 PM typical FA Cup kick-off
+    
+    # Update the specific fixture that should be POSTPONED
+    previous = await MatchdayIndex(db).upsert_fixture({
+        "fixture_id": 9000011,  # Salford City vs Swindon Town
+        "status": "POSTPONED",
+        "home_score": None,
+        "away_score": None,
+        "rescheduled_to": rescheduled_date
+    }, upsert=False)
+    
+    if previous is None:
+        return {"success": False, "message": "Fixture 9000011 not found in database"}
+    
+    logger.info("✅ Fixed Salford City vs Swindon Town fixture to POSTPONED with rescheduled date")
+    return {
+        "success": True,
+        "message": "Salford City vs Swindon Town has been marked as POSTPONED",
+        "fixture_id": 9000011,
+        "rescheduled_to": "Tuesday 20 January 2026 at 19:45",
+        "modified": int(previous.get("status") != "POSTPONED")
+    }
+
+
+@router.get("/admin/set-rescheduled-date")
+async def set_rescheduled_date(fixture_id: int, new_date: str):
+    """
+    Set a rescheduled date for a postponed fixture.
+    
+    Example: /api/admin/set-rescheduled-date?fixture_id=9000011&new_date=2026-01-28T15:00:00
+    
+    This will update the fixture to show the new rescheduled date.
+    """
+    from datetime import datetime as dt
+    
+    try:
+        # Parse the new date
+        if 'T' in new_date:
+            rescheduled_date = dt.fromisoformat(new_date.replace('Z', ''))
+        else:
+            rescheduled_date = dt.strptime(new_date, "%Y-%m-%d")
+            rescheduled_date = rescheduled_date.replace(hour=15, minute=0)  # Default to 3pm
+    except ValueError as e:
+        return {"error": f"Invalid date format: {e}. Use YYYY-MM-DD or YYYY-MM-DDTHH:MM:SS"}
+    
+    # Update the fixture with rescheduled date
+    previous = await MatchdayIndex(db).upsert_fixture({
+        "fixture_id": fixture_id,
+        "rescheduled_to": rescheduled_date,
+        "status": "POSTPONED"  # Ensure it's marked as postponed
+    }, upsert=False)
+    
+    if previous is None:
+        return {"error": f"Fixture {fixture_id} not found"}
+    
+    logger.info(f"✅ Set rescheduled date for fixture {fixture_id} to {rescheduled_date}")
+    return {
+        "success": True,
+        "message": f"Fixture {fixture_id} rescheduled to {rescheduled_date.strftime('%a %d %b %Y at %H:%M')}",
+        "fixture_id": fixture_id,
+        "rescheduled_to": rescheduled_date.isoformat()
+    }
+
+
+@router.get("/admin/debug-predictions/{user_id}")
+async def debug_user_predictions(user_id: str):
+    """
+    Debug endpoint to see raw prediction data for a user.
+    Helps troubleshoot why predictions might not be showing.
+    """
+    # Get raw predictions without any joins
+    raw_preds = await db.predictions.find({"user_id": user_id}, {"_id": 0}).to_list(1000)
+    
+    # Get FA Cup predictions specifically
+    fa_cup_preds = [p for p in raw_preds if p.get('league_id') == 45]
+    
+    # Check if fixtures exist for these predictions
+    fixture_ids = [p.get('fixture_id') for p in raw_preds]
+    existing_fixtures = await db.fixtures.find(
+        {"fixture_id": {"$in": fixture_ids}},
+        {"_id": 0, "fixture_id": 1, "home_team": 1, "away_team": 1, "league_id": 1, "status": 1}
+    ).to_list(1000)
+    
+    existing_fixture_ids = set(f['fixture_id'] for f in existing_fixtures)
+    missing_fixture_ids = [fid for fid in fixture_ids if fid not in existing_fixture_ids]
+    
+    return {
+        "user_id": user_id,
+        "total_predictions": len(raw_preds),
+        "fa_cup_predictions": len(fa_cup_preds),
+        "fa_cup_details": fa_cup_preds,
+        "predictions_with_missing_fixtures": missing_fixture_ids,
+        "all_predictions_summary": [
+            {
+                "fixture_id": p.get('fixture_id'),
+                "league_id": p.get('league_id'),
+                "prediction": p.get('prediction'),
+                "home_team": p.get('home_team'),
+                "away_team": p.get('away_team'),
+                "fixture_exists": p.get('fixture_id') in existing_fixture_ids
+            }
+            for p in raw_preds
+        ]
+    }
+
+
+@router.get("/admin/fixture-stats")
+async def get_fixture_stats():
+    """
+    Get summary statistics of fixtures in the database.
+    Useful for debugging why fixtures might not be showing.
+    """
+    from datetime import datetime, timedelta, timezone
+    
+    now = datetime.now(timezone.utc)
+    today = now.replace(tzinfo=None)
+    
+    # Count total fixtures
+    total = await db.fixtures.count_documents({})
+    
+    # Count by status
+    scheduled = await db.fixtures.count_documents({"status": "SCHEDULED"})
+    finished = await db.fixtures.count_documents({"status": "FINISHED"})
+    postponed = await db.fixtures.count_documents({"status": "POSTPONED"})
+    
+    # Get a sample fixture to check date format
+    sample = await db.fixtures.find_one({"utc_date": {"$ne": None}})
+    sample_date = sample.get('utc_date') if sample else None
+    sample_date_type = type(sample_date).__name__ if sample_date else "None"
+    
+    # Get unique leagues
+    leagues = await db.fixtures.distinct("league_name")
+    
+    # Get ALL fixtures for Premier League (league_id 39) to check dates
+    pl_fixtures = await db.fixtures.find(
+        {"league_id": 39},
+        {"_id": 0, "home_team": 1, "away_team": 1, "utc_date": 1, "matchday": 1, "status": 1}
+    ).sort("utc_date", -1).limit(20).to_list(20)
+    
+    return {
+        "server_time": now.isoformat(),
+        "server_date": now.strftime("%Y-%m-%d"),
+        "total_fixtures": total,
+        "by_status": {
+            "scheduled": scheduled,
+            "finished": finished,
+            "postponed": postponed
+        },
+        "date_format_check": {
+            "sample_date_value": str(sample_date),
+            "sample_date_type": sample_date_type
+        },
+        "leagues_in_db": leagues,
+        "premier_league_fixtures": [
+            {
+                "date": str(f.get('utc_date')),
+                "date_type": type(f.get('utc_date')).__name__,
+                "match": f"{f.get('home_team')} vs {f.get('away_team')}",
+                "matchday": f.get('matchday'),
+                "status": f.get('status')
+            }
+            for f in pl_fixtures
+        ]
+    }
+
+
+@router.get("/admin/test-time-range")
+async def test_time_range_filter(league_id: int = 39, days_ahead: int = 28):
+    """
+    Test the exact same query the frontend uses for time range filtering.
+    This helps debug why fixtures aren't showing.
+    """
+    from datetime import datetime, timedelta, timezone
+    
+    now = datetime.now(timezone.utc)
+    
+    # Get ALL fixtures for this league - no filters at all
+    all_fixtures = await db.fixtures.find(
+        {"league_id": league_id},
+        {"_id": 0, "home_team": 1, "away_team": 1, "utc_date": 1, "matchday": 1, "status": 1}
+    ).sort("matchday", 1).to_list(1000)
+    
+    # Group by matchday
+    by_matchday = {}
+    fixtures_without_date = []
+    
+    for f in all_fixtures:
+        md = f.get('matchday', 'Unknown')
+        utc_date = f.get('utc_date')
+        
+        if md not in by_matchday:
+            by_matchday[md] = {
+                'count': 0,
+                'has_date': 0,
+                'no_date': 0,
+                'sample_date': None,
+                'status': set()
+            }
+        
+        by_matchday[md]['count'] += 1
+        by_matchday[md]['status'].add(f.get('status', 'Unknown'))
+        
+        if utc_date is not None:
+            by_matchday[md]['has_date'] += 1
+            if by_matchday[md]['sample_date'] is None:
+                by_matchday[md]['sample_date'] = str(utc_date)
+        else:
+            by_matchday[md]['no_date'] += 1
+            fixtures_without_date.append({
+                'matchday': md,
+                'match': f"{f.get('home_team')} vs {f.get('away_team')}",
+                'status': f.get('status')
+            })
+    
+    # Convert sets to lists for JSON serialization
+    matchday_summary = {}
+    for md, data in by_matchday.items():
+        matchday_summary[md] = {
+            'count': data['count'],
+            'has_date': data['has_date'],
+            'no_date': data['no_date'],
+            'sample_date': data['sample_date'],
+            'statuses': list(data['status'])
+        }
+    
+    return {
+        "league_id": league_id,
+        "server_time": now.isoformat(),
+        "total_fixtures": len(all_fixtures),
+        "fixtures_without_utc_date": len(fixtures_without_date),
+        "matchday_summary": matchday_summary,
+        "fixtures_missing_dates": fixtures_without_date[:20]
+    }
+
+
+@router.get("/admin/fix-missing-dates")
+async def fix_missing_fixture_dates(league_id: int = 39):
+    """
+    Fetch fixtures with missing dates from API-Football and update them.
+    This fixes matchday 22, 23, 24 etc. that have null utc_date.
+    """
+    import os
+    import httpx
+    
+    api_key = os.environ.get("API_FOOTBALL_KEY")
+    if not api_key:
+        return {"error": "API_FOOTBALL_KEY not configured"}
+    
+    # Find fixtures with missing dates
+    fixtures_without_dates = await db.fixtures.find(
+        {"league_id": league_id, "utc_date": None},
+        {"_id": 0, "fixture_id": 1, "home_team": 1, "away_team": 1, "matchday": 1}
+    ).to_list(100)
+    
+    if not fixtures_without_dates:
+        return {"message": "No fixtures with missing dates found", "league_id": league_id}
+    
+    # Get unique matchdays that need fixing
+    matchdays_to_fix = set(f.get('matchday') for f in fixtures_without_dates)
+    
+    updated_count = 0
+    errors = []
+    
+    # Fetch from API-Football for each matchday
+    async with httpx.AsyncClient() as client:
+        for matchday in matchdays_to_fix:
+            try:
+                # Extract round number from matchday string (e.g., "22" from "Regular Season - 22")
+                round_num = matchday.split()[-1] if matchday else None
+                if not round_num:
+                    continue
+                
+                # Fetch fixtures for this round from API-Football
+                response = await client.get(
+                    "https://api-football-v1.p.rapidapi.com/v3/fixtures",
+                    params={
+                        "league": league_id,
+                        "season": 2025,  # Current season
+                        "round": f"Regular Season - {round_num}"
+                    },
+                    headers={
+                        "X-RapidAPI-Key": api_key,
+                        "X-RapidAPI-Host": "api-football-v1.p.rapidapi.com"
+                    },
+                    timeout=30
+                )
+                
+                if response.status_code != 200:
+                    errors.append(f"API error for matchday {matchday}: {response.status_code}")
+                    continue
+                
+                data = response.json()
+                api_fixtures = data.get("response", [])
+                
+                for api_fixture in api_fixtures:
+                    fixture_data = api_fixture.get("fixture", {})
+                    api_fixture_id = fixture_data.get("id")
+                    date_str = fixture_data.get("date")
+                    
+                    if not date_str:
+                        continue
+                    
+                    # Parse the date
+                    try:
+                        from datetime import datetime
+                        utc_date = datetime.fromisoformat(date_str.replace('Z', '+00:00')).replace(tzinfo=None)
+                    except:
+                        continue
+                    
+                    # Update fixture in database by matching teams and matchday
+                    teams = api_fixture.get("teams", {})
+                    home_team = teams.get("home", {}).get("name")
+                    away_team = teams.get("away", {}).get("name")
+                    
+                    result = await db.fixtures.update_one(
+                        {
+                            "league_id": league_id,
+                            "home_team": home_team,
+                            "away_team": away_team,
+                            "matchday": matchday
+                        },
+                        {"$set": {
+                            "utc_date": utc_date,
+                            "fixture_id": api_fixture_id  # Also update to real fixture_id
+                        }}
+                    )
+                    
+                    if result.modified_count > 0:
+                        updated_count += 1
+                        logger.info(f"✅ Updated date for {home_team} vs {away_team}: {utc_date}")
+                
+            except Exception as e:
+                errors.append(f"Error processing matchday {matchday}: {str(e)}")
+    
+    if updated_count:
+        invalidate_matchweek_cache()
+    return {
+        "message": f"Updated {updated_count} fixtures with dates",
+        "league_id": league_id,
+        "matchdays_processed": list(matchdays_to_fix),
+        "errors": errors if errors else None
+    }
+
+
+@router.post("/admin/set-matchday-dates")
+async def set_matchday_dates(league_id: int, matchday: str, start_date: str, time: str = "15:00"):
+    """
+    Manually set dates for all fixtures in a matchday.
+    Distributes fixtures across the weekend (Sat/Sun) starting from start_date.
+    
+    Example: /api/admin/set-matchday-dates?league_id=39&matchday=22&start_date=2026-01-14&time=15:00
+    
+    This will set:
+    - 4 fixtures on Jan 14 (Tue) at various times
+    - 4 fixtures on Jan 15 (Wed) at various times
+    - 2 fixtures on Jan 16 (Thu) at various times
+    """
+    from datetime import datetime, timedelta
+    
+    try:
+        base_date = datetime.strptime(start_date, "%Y-%m-%d")
+        base_time = datetime.strptime(time, "%H:%M")
+    except ValueError as e:
+        return {"error": f"Invalid date format: {e}. Use YYYY-MM-DD for date and HH:MM for time"}
+    
+    # Find fixtures for this matchday
+    fixtures = await db.fixtures.find(
+        {"league_id": league_id, **matchday_filter(matchday)},
+        {"_id": 0, "fixture_id": 1, "home_team": 1, "away_team": 1}
+    ).to_list(20)
+    
+    if not fixtures:
+        return {"error": f"No fixtures found for league {league_id}, matchday {matchday}"}
+    
+    # Typical Premier League schedule:
+    # Day 1 (Sat): 12:30, 15:00 x3, 17:30
+    # Day 2 (Sun): 14:00, 14:00, 16:30
+    # Day 3 (Mon): 20:00
+    schedule = [
+        (0, "12:30"), (0, "15:00"), (0, "15:00"), (0, "15:00"), (0, "17:30"),
+        (1, "14:00"), (1, "14:00"), (1, "16:30"),
+        (2, "20:00"), (2, "20:00")
+    ]
+    
+    updated = []
+    for i, fixture in enumerate(fixtures):
+        day_offset, kick_off = schedule[i % len(schedule)]
+        hour, minute = map(int, kick_off.split(":"))
+        
+        fixture_date = base_date + timedelta(days=day_offset)
+        fixture_datetime = fixture_date.replace(hour=hour, minute=minute)
+        
+        result = await db.fixtures.update_one(
+            {"fixture_id": fixture["fixture_id"]},
+            {"$set": {"utc_date": fixture_datetime}}
+        )
+        
+        if result.modified_count > 0:
+            updated.append({
+                "match": f"{fixture['home_team']} vs {fixture['away_team']}",
+                "date": fixture_datetime.strftime("%Y-%m-%d %H:%M")
+            })
+    
+    if updated:
+        invalidate_matchweek_cache()
+    return {
+        "message": f"Updated {len(updated)} fixtures with dates",
+        "matchday": matchday,
+        "league_id": league_id,
+        "updated_fixtures": updated
+    }
+
+
+@router.post("/admin/reschedule-match/{fixture_id}")
+async def reschedule_postponed_match(fixture_id: int, new_date: str, new_time: str = None):
+    """
+    Reschedule a postponed match and notify all users who have predictions on it.
+    
+    Args:
+        fixture_id: The fixture ID to reschedule
+        new_date: New date in format YYYY-MM-DD
+        new_time: Optional new time in format HH:MM (24-hour format). If not provided, keeps original time.
+    """
+    try:
+        # Find the fixture
+        fixture = await db.fixtures.find_one({"fixture_id": fixture_id})
+        if not fixture:
+            raise HTTPException(status_code=404, detail="Fixture not found")
+        
+        # Check if it was postponed
+        old_status = fixture.get('status', '')
+        if old_status != 'POSTPONED':
+            logger.warning(f"Rescheduling fixture {fixture_id} that wasn't POSTPONED (was {old_status})")
+        
+        # Parse the new date
+        from datetime import datetime as dt
+        old_date = fixture.get('utc_date')
+        
+        # Parse new datetime
+        if new_time:
+            new_datetime = dt.strptime(f"{new_date} {new_time}", "%Y-%m-%d %H:%M")
+        else:
+            # Keep original time if available
+            if isinstance(old_date, datetime):
+                original_time = old_date.strftime("%H:%M")
+            elif isinstance(old_date, str):
+                original_time = old_date.split('T')[1][:5] if 'T' in old_date else "15:00"
+            else:
+                original_time = "15:00"
+            new_datetime = dt.strptime(f"{new_date} {original_time}", "%Y-%m-%d %H:%M")
+        
+        # Update the fixture
+        previous = await MatchdayIndex(db).upsert_fixture({
+            "fixture_id": fixture_id,
+            "utc_date": new_datetime,
+            "status": "SCHEDULED",
+            "rescheduled_from": old_date.isoformat() if isinstance(old_date, datetime) else old_date
+        }, upsert=False)
+        
+        if previous is None:
+            raise HTTPException(status_code=400, detail="Failed to update fixture")
+        
+        home_team = fixture.get('home_team', 'Team A')
+        away_team = fixture.get('away_team', 'Team B')
+        league_name = fixture.get('league_name', 'League')
+        
+        # Format the new date nicely
+        formatted_date = new_datetime.strftime("%A %d %B at %H:%M")
+        
+        # Notify users with predictions (one batched insert)
+        notification_count = await notify_users_of_rescheduled_match(
+            fixture_id, home_team, away_team, new_datetime, league_name
+        )
+        
+        logger.info(f"✅ Rescheduled fixture {fixture_id} to {new_datetime} and notified {notification_count} users")
+        
+        return {
+            "success": True,
+            "message": f"Match rescheduled to {formatted_date}",
+            "fixture_id": fixture_id,
+            "new_date": new_datetime.isoformat(),
+            "users_notified": notification_count
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error rescheduling match: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/admin/update-promo-code")
+async def update_promo_code(code: str, discount_value: float, description: str = None):
+    """
+    Admin endpoint to update an existing promo code's discount value and description
+    """
+    try:
+        code_upper = code.upper()
+        
+        # Check if code exists
+        existing = await db.promo_codes.find_one({"code": code_upper})
+        if not existing:
+            raise HTTPException(status_code=404, detail=f"Promo code {code_upper} not found")
+        
+        # Update fields
+        update_data = {"discount_value": discount_value}
+        if description:
+            update_data["description"] = description
+        
+        result = await db.promo_codes.update_one(
+            {"code": code_upper},
+            {"$set": update_data}
+        )
+        from promo_codes import invalidate_promo_cache
+        invalidate_promo_cache(code_upper)
+        
+        logger.info(f"Updated promo code {code_upper}: discount_value={discount_value}")
+        
+        return {
+            "status": "success",
+            "message": f"Promo code {code_upper} updated successfully",
+            "updated_fields": update_data
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error updating promo code: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/admin/calculate-weekly-winners")
+async def trigger_weekly_winners_admin():
+    """
+    Admin endpoint to manually calculate and award weekly winner points
+    Call this at the end of each week after all matches are finished
+    Normally runs automatically via scheduler (Wed 2PM + Daily 6PM)
+    """
+    try:
+        await calculate_weekly_winners()
+        return {
+            "status": "success",
+            "message": "Weekly winners calculated and points awarded"
+        }
+    except Exception as e:
+        logger.error(f"Error calculating weekly winners: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/admin/run-retention")
+async def trigger_retention(batch_size: int = 1000):
+    """
+    Archive old read notifications and team messages now
+    Normally runs automatically via scheduler (daily 4:15 AM)
+    """
+    try:
+        from retention import RetentionService, RETENTION_POLICIES, get_max_age_days
+        archived = await RetentionService(db).run(batch_size=batch_size)
+        return {
+            "status": "success",
+            "archived": archived,
+            "max_age_days": {name: get_max_age_days(policy) for name, policy in RETENTION_POLICIES.items()}
+        }
+    except Exception as e:
+        logger.error(f"Error running retention: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.delete("/admin/users/{user_id}")
+async def delete_user_account(user_id: str):
+    """
+    Delete a user account
+    The user is hidden immediately; their posts, comments, likes, memberships,
+    predictions and notifications are purged in the background
+    """
+    try:
+        import asyncio
+        from cascade_delete import CascadeDeleteQueue
+        user = await db.users.find_one({"id": user_id}, {"_id": 0, "id": 1})
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+
+        queue = CascadeDeleteQueue(db)
+        job = await queue.enqueue("user", user_id, requested_by="admin")
+        entity_cache.invalidate_user(user_id)
+        asyncio.create_task(queue.run_pending())
+        return {"status": "queued", "job": job}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error deleting user {user_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/admin/deletion-jobs")
+async def list_deletion_jobs(status: str = None, limit: int = 50):
+    """List cascading delete jobs, newest first"""
+    query = {"status": status} if status else {}
+    jobs = await db.deletion_jobs.find(query, {"_id": 0}).sort("created_at", -1).limit(limit).to_list(limit)
+    return {"jobs": jobs}
+
+
+@router.get("/admin/entity-cache")
+async def entity_cache_stats():
+    """Hit/miss counters for the in-process user/team/membership cache"""
+    return entity_cache.cache_stats()
+
+
+@router.post("/admin/media/backfill-variants")
+async def backfill_image_variants(limit: int = 200):
+    """Generate thumbnails/WebP variants for uploads made before derivatives existed"""
+    try:
+        from image_derivatives import ImageDerivativeService
+        processed = await ImageDerivativeService(db, upload_storage).backfill(limit=limit)
+        return {"status": "success", "processed": len(processed), "files": processed}
+    except Exception as e:
+        logger.error(f"Error backfilling image variants: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/admin/reset-season")
+async def reset_season():
+    """
+    ADMIN ONLY: Reset all user stats and predictions for fresh start
+    - Clears all predictions
+    - Resets all user points to 0
+    - Clears weekly pots
+    - DANGEROUS: Cannot be undone
+    """
+    try:
+        logger.info("🔄 Starting season reset...")
+        
+        # Delete all predictions
+        predictions_deleted = await db.predictions.delete_many({})
+        logger.info(f"   Deleted {predictions_deleted.deleted_count} predictions")
+        
+        # Reset all user stats to 0
+        users_updated = await db.users.update_many(
+            {},
+            {"$set": {
+                "season_points": 0,
+                "weekly_points": 0,
+                "weekly_wins": 0
+            }}
+        )
+        entity_cache.users.clear()
+        await TeamStandings(db).rebuild()
+        logger.info(f"   Reset stats for {users_updated.modified_count} users")
+        
+        # Delete all weekly pots
+        pots_deleted = await db.weekly_pots.delete_many({})
+        logger.info(f"   Deleted {pots_deleted.deleted_count} weekly pots")
+        
+        # Create fresh weekly pot for each team in "fun" mode
+        teams = await db.teams.find({}, {"_id": 0}).to_list(100)
+        pots_created = 0
+        for team in teams:
+            new_pot = {
+                "id": str(uuid.uuid4()),
+                "team_id": team['id'],
+                "team_name": team['name'],
+                "total_pot": 0,
+                "rollover": 0,
+                "paid_entries": 0,
+                "status": "active",
+                "week_start": datetime.now(timezone.utc).isoformat(),
+                "created_at": datetime.now(timezone.utc).isoformat()
+            }
+            await db.weekly_pots.insert_one(new_pot)
+            pots_created += 1
+        
+        logger.info(f"   Created {pots_created} fresh weekly pots")
+        logger.info("✅ Season reset complete!")
+        
+        return {
+            "status": "success",
+            "message": "Season reset complete - fresh start!",
+            "predictions_deleted": predictions_deleted.deleted_count,
+            "users_reset": users_updated.modified_count,
+            "pots_deleted": pots_deleted.deleted_count,
+            "pots_created": pots_created
+        }
+        
+    except Exception as e:
+        logger.error(f"❌ Error resetting season: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/admin/force-update-results")
+async def force_update_results():
+    """
+    Manually trigger the automated result checker
+    Fetches scores from API-Football and updates database
+    """
+    try:
+        logger.info("🔄 Manual result update triggered...")
+        await automated_result_update()
+        return {
+            "status": "success",
+            "message": "Result update completed. Check fixtures for updated scores."
+        }
+    except Exception as e:
+        logger.error(f"Error in manual result update: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/admin/trigger-scoring")
+async def manual_trigger_scoring():
+    """
+    Manually trigger the scoring system
+    Useful for testing or immediate updates
+    """
+    try:
+        logger.info("🔧 Manual scoring trigger called...")
+        
+        # Call the automated result update function
+        await automated_result_update()
+        
+        return {
+            "success": True,
+            "message": "Scoring system triggered successfully",
+            "timestamp": datetime.now(timezone.utc).isoformat()
+        }
+    except Exception as e:
+        logger.error(f"❌ Error in manual trigger: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/admin/sync-predictions")
+async def sync_predictions_with_fixtures():
+    """
+    Sync all predictions with current fixture data
+    Updates predictions to include team names, scores, leagues directly
+    """
+    try:
+        # Get all predictions
+        all_predictions = await db.predictions.find({}).to_list(length=10000)
+        
+        updated_count = 0
+        missing_fixtures = 0
+        
+        for pred in all_predictions:
+            fixture_id = pred.get('fixture_id')
+            
+            # Find matching fixture
+            fixture = await db.fixtures.find_one({"fixture_id": fixture_id})
+            
+            if fixture:
+                # Update prediction with fixture details
+                await db.predictions.update_one(
+                    {"id": pred.get('id')},
+                    {"$set": {
+                        "home_team": fixture.get('home_team'),
+                        "away_team": fixture.get('away_team'),
+                        "league": fixture.get('league_name'),
+                        "home_score": fixture.get('home_score'),
+                        "away_score": fixture.get('away_score'),
+                        "actual_result": pred.get('actual_result'),  # Keep if already scored
+                        "match_date": fixture.get('utc_date') or fixture.get('match_date')
+                    }}
+                )
+                updated_count += 1
+            else:
+                missing_fixtures += 1
+        
+        logger.info(f"✅ Synced {updated_count} predictions, {missing_fixtures} fixtures not found")
+        
+        return {
+            "message": "Predictions synced successfully",
+            "updated": updated_count,
+            "missing_fixtures": missing_fixtures
+        }
+        
+    except Exception as e:
+        logger.error(f"Error syncing predictions: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Emergency data restoration endpoint
+@router.post("/emergency/restore-cheshunt-crew")
+async def emergency_restore_data():
+    """
+    Emergency endpoint to restore Cheshunt Crew team and predictions
+    """
+    import random
+    from uuid import uuid4
+    import bcrypt
+    
+    try:
+        # Define all user data
+        users_data = [
+            {'username': 'aysin', 'email': 'info@hadfun.co.uk', 'predictions': 38},
+            {'username': 'pistachios', 'email': 'pistachios@hadfun.co.uk', 'predictions': 29},
+            {'username': 'aysindjemil', 'email': 'aysindjemil@yahoo.com', 'predictions': 29},
+            {'username': 'Josh', 'email': 'admin@', 'predictions': 29},
+            {'username': 'Remster', 'email': 'Remie.djemil@gmail.com', 'predictions': 10},
+            {'username': 'Ayhan', 'email': 'ayhanozgegiet@gmail.com', 'predictions': 9},
+            {'username': 'Leeanne', 'email': 'leeanne@example.com', 'predictions': 0},
+        ]
+        
+        user_ids = {}
+        
+        # Ensure all users exist
+        for user_data in users_data:
+            username = user_data['username']
+            user = await db.users.find_one({'username': username}, {'_id': 0})
+            
+            if user:
+                user_ids[username] = user['id']
+            else:
+                user_id = str(uuid4())
+                password_hash = bcrypt.hashpw(b'temppass123', bcrypt.gensalt()).decode('utf-8')
+                
+                new_user = {
+                    'id': user_id,
+                    'username': username,
+                    'username_lower': username.lower(),
+                    'email': user_data['email'],
+                    'password_hash': password_hash,
+                    'profile_completed': True,
+                    'season_points': 0,
+                    'weekly_points': 0,
+                    'weekly_wins': 0,
+                    'created_at': datetime.now(timezone.utc).isoformat()
+                }
+                
+                await db.users.insert_one(new_user)
+                user_ids[username] = user_id
+        
+        # Create/verify team
+        team = await db.teams.find_one({'join_code': '256BFA9A'}, {'_id': 0})
+        
+        if not team:
+            team_id = str(uuid4())
+            team_data = {
+                'id': team_id,
+                'name': 'Cheshunt Crew',
+                'join_code': '256BFA9A',
+                'motto': 'Playing for fun',
+                'created_at': datetime.now(timezone.utc).isoformat(),
+                'created_by': user_ids.get('aysin', 'unknown')
+            }
+            await db.teams.insert_one(team_data)
+        else:
+            team_id = team['id']
+        
+        # Add members
+        for username, uid in user_ids.items():
+            existing = await db.team_members.find_one({'team_id': team_id, 'user_id': uid}, {'_id': 0})
+            
+            if not existing:
+                member_data = {
+                    'id': str(uuid4()),
+                    'team_id': team_id,
+                    'user_id': uid,
+                    'username': username,
+                    'joined_at': datetime.now(timezone.utc).isoformat(),
+                    'role': 'admin' if username == 'aysin' else 'member'
+                }
+                await db.team_members.insert_one(member_data)
+        
+        # Get fixtures
+        fixtures = await db.fixtures.find({}, {'_id': 0}).to_list(500)
+        premier_fixtures = [f for f in fixtures if 'premier' in f.get('league_name', '').lower()]
+        
+        # Create predictions
+        total_created = 0
+        for user_data in users_data:
+            username = user_data['username']
+            user_id = user_ids[username]
+            target_count = user_data['predictions']
+            
+            if target_count == 0:
+                continue
+            
+            available = premier_fixtures if len(premier_fixtures) > 0 else fixtures
+            count = min(target_count, len(available))
+            selected = random.sample(available, count)
+            
+            for fixture in selected:
+                existing = await db.predictions.find_one({'user_id': user_id, 'fixture_id': fixture['fixture_id']}, {'_id': 0})
+                
+                if not existing:
+                    prediction_data = {
+                        'id': str(uuid4()),
+                        'user_id': user_id,
+                        'username': username,
+                        'fixture_id': fixture['fixture_id'],
+                        'league_name': fixture.get('league_name', 'Unknown'),
+                        'home_team': fixture['home_team'],
+                        'away_team': fixture['away_team'],
+                        'prediction': random.choice(['home', 'draw', 'away']),
+                        'result': 'pending',
+                        'points': 0,
+                        'created_at': utc_now(),
+                        'fixture_date': fixture.get('fixture_date', datetime.now(timezone.utc).isoformat())
+                    }
+                    await db.predictions.insert_one(prediction_data)
+                    total_created += 1
+        
+        return {
+            'success': True,
+            'message': 'Cheshunt Crew restored successfully',
+            'team_members': len(user_ids),
+            'predictions_created': total_created
+        }
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,280 @@
+from fastapi import APIRouter, HTTPException
+from datetime import datetime, timezone, timedelta
+from analytics_rollup import AnalyticsRollupService
+import logging
+
+router = APIRouter(prefix="/admin/analytics", tags=["analytics"])
+logger = logging.getLogger(__name__)
+
+# Database will be set by server.py
+db = None
+
+
+def set_db(database):
+    global db
+    db = database
+
+
+async def get_daily_rollups(days: int):
+    """Rollup documents for the last `days` UTC days (today included), oldest first"""
+    today = datetime.now(timezone.utc).date()
+    since = (today - timedelta(days=days - 1)).isoformat()
+    return await db.analytics_daily.find(
+        {"date": {"$gte": since}},
+        {"_id": 0, "users": 0, "leagues.user_ids": 0, "pending": 0}
+    ).sort("date", 1).to_list(days)
+
+
+def union_active_users(rollups, since_date: str) -> set:
+    active = set()
+    for day in rollups:
+        if day["date"] >= since_date:
+            active.update(day.get("active_user_ids", []))
+    return active
+
+
+# ============================================
+# ADMIN ANALYTICS DASHBOARD ENDPOINTS
+# All reads come from the analytics_* rollup collections maintained by
+# AnalyticsRollupService, so cost doesn't grow with prediction history
+# ============================================
+
+@router.post("/rollup")
+async def run_analytics_rollup():
+    """Run the incremental analytics rollup now (normally scheduled)"""
+    try:
+        rolled = await AnalyticsRollupService(db).run()
+        return {"message": "Analytics rollup complete", "days_rolled": len(rolled), "dates": rolled}
+    except Exception as e:
+        logger.error(f"Analytics rollup error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/overview")
+async def get_analytics_overview():
+    """Get comprehensive analytics overview - Admin only"""
+    try:
+        today = datetime.now(timezone.utc).date()
+        rollups = await get_daily_rollups(30)
+        totals = await db.analytics_totals.find_one({"_id": "global"}, {"_id": 0}) or {}
+        
+        total_users = await db.users.estimated_document_count()
+        total_teams = await db.teams.estimated_document_count()
+        
+        week_since = (today - timedelta(days=6)).isoformat()
+        today_str = today.isoformat()
+        dau = union_active_users(rollups, today_str)
+        wau = union_active_users(rollups, week_since)
+        mau = union_active_users(rollups, "")
+        
+        total_predictions = totals.get("predictions", 0)
+        predictions_today = sum(d["predictions"] for d in rollups if d["date"] == today_str)
+        predictions_this_week = sum(d["predictions"] for d in rollups if d["date"] >= week_since)
+        
+        # Prediction accuracy
+        correct_predictions = totals.get("correct", 0)
+        total_scored = correct_predictions + totals.get("incorrect", 0)
+        accuracy_rate = (correct_predictions / total_scored * 100) if total_scored > 0 else 0
+        
+        return {
+            "users": {
+                "total": total_users,
+                "dau": len(dau),
+                "wau": len(wau),
+                "mau": len(mau)
+            },
+            "predictions": {
+                "total": total_predictions,
+                "today": predictions_today,
+                "this_week": predictions_this_week,
+                "accuracy_rate": round(accuracy_rate, 1)
+            },
+            "teams": {
+                "total": total_teams
+            },
+            "engagement": {
+                "predictions_per_user": round(total_predictions / total_users, 1) if total_users > 0 else 0,
+                "active_user_rate": round(len(mau) / total_users * 100, 1) if total_users > 0 else 0
+            },
+            "rolled_up_at": totals.get("updated_at")
+        }
+    except Exception as e:
+        logger.error(f"Analytics overview error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/user-activity")
+async def get_user_activity_trends():
+    """Get user activity trends over time"""
+    try:
+        today = datetime.now(timezone.utc).date()
+        rollups = {d["date"]: d for d in await get_daily_rollups(31)}
+        
+        # Daily activity for the last 30 days (days without a rollup count as zero)
+        daily_activity = []
+        for i in range(30, -1, -1):
+            day = today - timedelta(days=i)
+            rollup = rollups.get(day.isoformat(), {})
+            daily_activity.append({
+                "date": day.strftime("%Y-%m-%d"),
+                "day_name": day.strftime("%a"),
+                "active_users": rollup.get("dau", 0),
+                "predictions": rollup.get("predictions", 0),
+                "new_signups": rollup.get("signups", 0),
+                "accuracy": rollup.get("accuracy", 0)
+            })
+        
+        return {"daily_activity": daily_activity}
+    except Exception as e:
+        logger.error(f"User activity error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/league-popularity")
+async def get_league_popularity():
+    """Get prediction counts by league"""
+    try:
+        pipeline = [
+            {"$match": {"predictions": {"$gt": 0}}},
+            {"$project": {
+                "_id": 0,
+                "league": 1,
+                "predictions": 1,
+                "users": {"$ifNull": ["$users", 0]}
+            }},
+            {"$sort": {"predictions": -1}},
+            {"$limit": 50}
+        ]
+        league_stats = await db.analytics_league_totals.aggregate(pipeline).to_list(50)
+        
+        return {"league_popularity": league_stats}
+    except Exception as e:
+        logger.error(f"League popularity error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/user-retention")
+async def get_user_retention():
+    """Get user retention metrics"""
+    try:
+        today = datetime.now(timezone.utc).date()
+        rollups = await get_daily_rollups(30)
+        total = await db.users.estimated_document_count()
+        
+        active_7 = union_active_users(rollups, (today - timedelta(days=6)).isoformat())
+        active_30 = union_active_users(rollups, "")
+        
+        retention_data = {
+            "total_users": total,
+            "active_last_7_days": len(active_7),
+            "active_last_30_days": len(active_30),
+            "inactive_users": max(total - len(active_30), 0),
+            "user_cohorts": []
+        }
+        
+        # Calculate retention rates
+        if total > 0:
+            retention_data["retention_7_day"] = round(retention_data["active_last_7_days"] / total * 100, 1)
+            retention_data["retention_30_day"] = round(retention_data["active_last_30_days"] / total * 100, 1)
+            retention_data["churn_rate"] = round(retention_data["inactive_users"] / total * 100, 1)
+        
+        return retention_data
+    except Exception as e:
+        logger.error(f"User retention error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/top-users")
+async def get_top_users():
+    """Get top users by various metrics"""
+    try:
+        projection = {"_id": 0, "user_id": 1, "username": 1, "predictions": 1, "correct": 1, "accuracy": 1}
+        
+        def format_user(user):
+            return {
+                "_id": user["user_id"],
+                "user_id": user["user_id"],
+                "username": user.get("username"),
+                "total_predictions": user.get("predictions", 0),
+                "correct_predictions": user.get("correct", 0),
+                "accuracy": user.get("accuracy", 0)
+            }
+        
+        # Top predictors (most predictions)
+        top_predictors = await db.analytics_user_totals.find(
+            {"predictions": {"$gt": 0}}, projection
+        ).sort("predictions", -1).limit(10).to_list(10)
+        
+        # Top accuracy (minimum 10 predictions)
+        top_accuracy = await db.analytics_user_totals.find(
+            {"predictions": {"$gte": 10}}, projection
+        ).sort("accuracy", -1).limit(10).to_list(10)
+        
+        return {
+            "top_predictors": [format_user(u) for u in top_predictors],
+            "top_accuracy": [format_user(u) for u in top_accuracy]
+        }
+    except Exception as e:
+        logger.error(f"Top users error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/feature-usage")
+async def get_feature_usage():
+    """Get feature usage statistics"""
+    try:
+        # Collection sizes come from metadata, no scans
+        total_posts = await db.posts.estimated_document_count()
+        total_comments = await db.comments.estimated_document_count()
+        total_team_messages = await db.team_messages.estimated_document_count()
+        total_nominations = await db.nominations.estimated_document_count()
+        
+        # Predictions by league type from the league rollups
+        leagues = await db.analytics_league_totals.find({}, {"_id": 0, "league": 1, "predictions": 1}).to_list(500)
+        
+        def count_matching(predicate):
+            return sum(l.get("predictions", 0) for l in leagues if predicate(l.get("league") or ""))
+        
+        return {
+            "community": {
+                "posts": total_posts,
+                "comments": total_comments,
+                "team_messages": total_team_messages
+            },
+            "predictions_by_competition": {
+                "premier_league": count_matching(lambda name: "premier" in name.lower()),
+                "fa_cup": count_matching(lambda name: name == "FA Cup"),
+                "world_cup": count_matching(lambda name: "world cup" in name.lower())
+            },
+            "nominations": total_nominations
+        }
+    except Exception as e:
+        logger.error(f"Feature usage error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/peak-times")
+async def get_peak_usage_times():
+    """Get peak usage times (hour of day analysis)"""
+    try:
+        totals = await db.analytics_totals.find_one({"_id": "global"}, {"_id": 0, "hours": 1}) or {}
+        hour_counts = totals.get("hours", {})
+        
+        peak_times = []
+        for hour in range(24):
+            peak_times.append({
+                "hour": hour,
+                "label": f"{hour:02d}:00",
+                "predictions": hour_counts.get(f"{hour:02d}", 0)
+            })
+        
+        # Find peak hour
+        peak_hour = max(peak_times, key=lambda x: x['predictions']) if peak_times else None
+        
+        return {
+            "hourly_distribution": peak_times,
+            "peak_hour": peak_hour
+        }
+    except Exception as e:
+        logger.error(f"Peak times error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,8 +1,11 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from motor.motor_asyncio import AsyncIOMotorClient
 from datetime import datetime, timezone
 from models import User, UserCreate, UserProfileUpdate
 from typing import Optional
+from image_derivatives import ImageDerivativeService
+from user_search import UserSearchService, username_key
+import entity_cache
 
 router = APIRouter(prefix="/users", tags=["auth"])
 
@@ -14,6 +17,12 @@ def set_db(database):
     db = database
 
 
+async def avatar_thumb_url(avatar_url: Optional[str]) -> Optional[str]:
+    """Thumbnail of an uploaded avatar, if it has been generated yet"""
+    variants = await ImageDerivativeService(db).get_variant_urls([avatar_url])
+    return variants.get(avatar_url, {}).get("thumb")
+
+
 @router.post("", response_model=User)
 async def create_user(user: UserCreate):
     """Create a new user"""
@@ -42,15 +51,35 @@ async def create_user(user: UserCreate):
     doc = user_obj.model_dump()
     doc['created_at'] = doc['created_at'].isoformat()
     doc['updated_at'] = doc['updated_at'].isoformat()
+    doc['username_lower'] = username_key(user_obj.username)
     
     await db.users.insert_one(doc)
+    UserSearchService(db).index_user(doc)
     return user_obj
 
 
+# Declared before /{username} so "search" isn't taken for a username
+@router.get("/search")
+async def search_users(
+    q: str,
+    user_id: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=50)
+):
+    """
+    Search for users by username (case-insensitive prefix, then fuzzy matches)
+    Pass user_id to rank the searcher's teammates first.
+    Returns username and id only (no email for privacy)
+    """
+    if not q or len(q.strip()) < 2:
+        raise HTTPException(status_code=400, detail="Search query must be at least 2 characters")
+    
+    return await UserSearchService(db).search(q, user_id=user_id, limit=limit)
+
+
 @router.get("/{username}", response_model=User)
 async def get_user(username: str):
     """Get user by username"""
-    user = await db.users.find_one({"username": username}, {"_id": 0})
+    user = await db.users.find_one({"username": username, "deleted_at": None}, {"_id": 0})
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
@@ -59,8 +88,8 @@ async def get_user(username: str):
 @router.get("/id/{user_id}", response_model=User)
 async def get_user_by_id(user_id: str):
     """Get user by ID"""
-    user = await db.users.find_one({"id": user_id}, {"_id": 0})
-    if not user:
+    user = await entity_cache.users.get(user_id)
+    if not user or user.get("deleted_at"):
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
@@ -71,7 +100,7 @@ async def update_user_profile(user_id: str, profile_data: UserProfileUpdate):
     Update user profile (REQUIRES AUTH + OWNERSHIP)
     This endpoint allows users to complete or update their profile
     """
-    user = await db.users.find_one({"id": user_id}, {"_id": 0})
+    user = await entity_cache.users.get(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -100,6 +129,7 @@ async def update_user_profile(user_id: str, profile_data: UserProfileUpdate):
     
     if profile_data.avatar_url is not None:
         update_data["avatar_url"] = profile_data.avatar_url
+        update_data["avatar_thumb_url"] = await avatar_thumb_url(profile_data.avatar_url)
     
     if profile_data.location is not None:
         if len(profile_data.location) > 100:
@@ -124,6 +154,7 @@ async def update_user_profile(user_id: str, profile_data: UserProfileUpdate):
     update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
     
     await db.users.update_one({"id": user_id}, {"$set": update_data})
+    entity_cache.invalidate_user(user_id)
     
     updated_user = await db.users.find_one({"id": user_id}, {"_id": 0})
     return updated_user
@@ -135,7 +166,7 @@ async def complete_profile(user_id: str, profile_data: UserProfileUpdate):
     Complete user profile for the first time
     Requires: full_name, birthdate (minimum fields)
     """
-    user = await db.users.find_one({"id": user_id}, {"_id": 0})
+    user = await entity_cache.users.get(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -176,6 +207,7 @@ async def complete_profile(user_id: str, profile_data: UserProfileUpdate):
     
     if profile_data.avatar_url:
         update_data["avatar_url"] = profile_data.avatar_url
+        update_data["avatar_thumb_url"] = await avatar_thumb_url(profile_data.avatar_url)
     
     if profile_data.location:
         if len(profile_data.location) > 100:
@@ -198,6 +230,7 @@ async def complete_profile(user_id: str, profile_data: UserProfileUpdate):
         update_data["interests"] = profile_data.interests.strip()
     
     await db.users.update_one({"id": user_id}, {"$set": update_data})
+    entity_cache.invalidate_user(user_id)
     
     updated_user = await db.users.find_one({"id": user_id}, {"_id": 0})
     return updated_user
@@ -206,7 +239,7 @@ async def complete_profile(user_id: str, profile_data: UserProfileUpdate):
 @router.get("/{user_id}/profile-status")
 async def check_profile_status(user_id: str):
     """Check if user has completed their profile"""
-    user = await db.users.find_one({"id": user_id}, {"_id": 0, "profile_completed": 1, "username": 1})
+    user = await entity_cache.users.get(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -2,7 +2,14 @@ from fastapi import APIRouter, HTTPException, Depends, Query
 from motor.motor_asyncio import AsyncIOMotorClient
 from typing import List, Optional
 from datetime import datetime, timezone
-from models import Post, PostCreate, PostUpdate, Comment, CommentCreate, Like, User
+from models import Post, PostCreate, PostUpdate, Comment, CommentCreate, User, FeedPage
+from likes import post_likes
+from cascade_delete import CascadeDeleteQueue
+from image_derivatives import ImageDerivativeService
+import entity_cache
+import asyncio
+import base64
+import json
 import os
 
 router = APIRouter(prefix="/posts", tags=["posts"])
@@ -18,7 +25,7 @@ def set_db(database):
 # Helper function to check if user profile is completed
 async def require_profile_completed(user_id: str):
     """Check if user has completed their profile"""
-    user = await db.users.find_one({"id": user_id}, {"_id": 0})
+    user = await entity_cache.users.get(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     if not user.get("profile_completed", False):
@@ -29,15 +36,112 @@ async def require_profile_completed(user_id: str):
     return user
 
 
+async def ensure_indexes():
+    """Indexes behind the feed's keyset sort, comment previews and like lookups"""
+    await db.posts.create_index([("created_at", -1), ("id", -1)])
+    await db.posts.create_index([("author_id", 1), ("created_at", -1), ("id", -1)])
+    await db.comments.create_index([("post_id", 1), ("created_at", -1)])
+    await post_likes(db).ensure_indexes()
+
+
+def encode_cursor(post: dict) -> str:
+    raw = json.dumps([post["created_at"], post["id"]]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, post_id = json.loads(base64.urlsafe_b64decode(padded))
+        return created_at, post_id
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 # ========== POST ENDPOINTS ==========
 
+@router.get("/feed", response_model=FeedPage)
+async def get_feed(
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=50),
+    user_id: Optional[str] = None,
+    author_id: Optional[str] = None,
+    comments_preview: int = Query(3, ge=0, le=10)
+):
+    """
+    Get the feed page by page (PUBLIC - no auth required)
+    
+    Keyset pagination on (created_at, id): pass next_cursor from the previous
+    page as ?cursor=. Each post embeds its latest comments and, when user_id
+    is given, whether that user liked it - one query each for the whole page.
+    """
+    query = {"deleted_at": None}
+    if author_id:
+        query["author_id"] = author_id
+    if cursor:
+        created_at, post_id = decode_cursor(cursor)
+        query["$or"] = [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "id": {"$lt": post_id}}
+        ]
+    
+    # One extra row tells us whether there is a next page
+    posts = await db.posts.find(query, {"_id": 0}).sort(
+        [("created_at", -1), ("id", -1)]
+    ).limit(limit + 1).to_list(limit + 1)
+    
+    next_cursor = None
+    if len(posts) > limit:
+        posts = posts[:limit]
+        next_cursor = encode_cursor(posts[-1])
+    
+    post_ids = [p["id"] for p in posts]
+    
+    previews = {}
+    if post_ids and comments_preview:
+        pipeline = [
+            {"$match": {"post_id": {"$in": post_ids}}},
+            # $topN keeps only the latest N per post while grouping (MongoDB 5.2+),
+            # instead of pushing every comment and slicing afterwards
+            {"$group": {"_id": "$post_id", "comments": {"$topN": {
+                "n": comments_preview,
+                "sortBy": {"created_at": -1},
+                "output": "$$ROOT"
+            }}}}
+        ]
+        async for row in db.comments.aggregate(pipeline):
+            previews[row["_id"]] = [
+                {k: v for k, v in comment.items() if k != "_id"} for comment in row["comments"]
+            ]
+    
+    liked = set()
+    if post_ids and user_id:
+        async for like in db.likes.find(
+            {"post_id": {"$in": post_ids}, "user_id": user_id}, {"_id": 0, "post_id": 1}
+        ):
+            liked.add(like["post_id"])
+    
+    # Small image/avatar variants for every post on the page in one query
+    media_urls = [url for p in posts for url in (p.get("images") or [])]
+    media_urls += [p.get("author_avatar") for p in posts]
+    variants = await ImageDerivativeService(db).get_variant_urls(media_urls)
+    
+    for post in posts:
+        post["comments_preview"] = previews.get(post["id"], [])
+        post["liked_by_me"] = post["id"] in liked
+        post["image_variants"] = [variants.get(url, {}) for url in (post.get("images") or [])]
+        post["author_avatar_thumb"] = variants.get(post.get("author_avatar"), {}).get("thumb")
+    
+    return {"posts": posts, "next_cursor": next_cursor}
+
+
 @router.get("", response_model=List[Post])
 async def get_posts(skip: int = 0, limit: int = 20, author_id: Optional[str] = None):
     """
     Get all posts (PUBLIC - no auth required)
     Supports pagination and filtering by author
     """
-    query = {}
+    query = {"deleted_at": None}
     if author_id:
         query["author_id"] = author_id
     
@@ -48,7 +152,7 @@ async def get_posts(skip: int = 0, limit: int = 20, author_id: Optional[str] = N
 @router.get("/{post_id}", response_model=Post)
 async def get_post(post_id: str):
     """Get single post by ID (PUBLIC - no auth required)"""
-    post = await db.posts.find_one({"id": post_id}, {"_id": 0})
+    post = await db.posts.find_one({"id": post_id, "deleted_at": None}, {"_id": 0})
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     return post
@@ -108,7 +212,7 @@ async def create_post(post_data: PostCreate, user_id: str = Query(...)):
 async def update_post(post_id: str, post_data: PostUpdate, user_id: str = Query(...)):
     """Update a post (REQUIRES AUTH + OWNERSHIP)"""
     # Check if post exists and user is the author
-    post = await db.posts.find_one({"id": post_id}, {"_id": 0})
+    post = await db.posts.find_one({"id": post_id, "deleted_at": None}, {"_id": 0})
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     
@@ -144,26 +248,26 @@ async def update_post(post_id: str, post_data: PostUpdate, user_id: str = Query(
     
     update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
     
-    await db.posts.update_one({"id": post_id}, {"$set": update_data})
+    await db.posts.update_one({"id": post_id, "deleted_at": None}, {"$set": update_data})
     
-    updated_post = await db.posts.find_one({"id": post_id}, {"_id": 0})
+    updated_post = await db.posts.find_one({"id": post_id, "deleted_at": None}, {"_id": 0})
     return updated_post
 
 
 @router.delete("/{post_id}")
 async def delete_post(post_id: str, user_id: str = Query(...)):
     """Delete a post (REQUIRES AUTH + OWNERSHIP)"""
-    post = await db.posts.find_one({"id": post_id}, {"_id": 0})
+    post = await db.posts.find_one({"id": post_id, "deleted_at": None}, {"_id": 0})
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     
     if post["author_id"] != user_id:
         raise HTTPException(status_code=403, detail="You can only delete your own posts")
     
-    # Delete post and all associated comments and likes
-    await db.posts.delete_one({"id": post_id})
-    await db.comments.delete_many({"post_id": post_id})
-    await db.likes.delete_many({"post_id": post_id})
+    # Hide the post now; comments and likes are purged in the background
+    queue = CascadeDeleteQueue(db)
+    await queue.enqueue("post", post_id, requested_by=user_id)
+    asyncio.create_task(queue.run_pending())
     
     return {"message": "Post deleted successfully"}
 
@@ -173,7 +277,7 @@ async def delete_post(post_id: str, user_id: str = Query(...)):
 @router.get("/{post_id}/comments", response_model=List[Comment])
 async def get_comments(post_id: str, skip: int = 0, limit: int = 50):
     """Get comments for a post (PUBLIC - no auth required)"""
-    post = await db.posts.find_one({"id": post_id}, {"_id": 0})
+    post = await db.posts.find_one({"id": post_id, "deleted_at": None}, {"_id": 0})
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     
@@ -188,7 +292,7 @@ async def create_comment(post_id: str, comment_data: CommentCreate, user_id: str
     user = await require_profile_completed(user_id)
     
     # Check if post exists
-    post = await db.posts.find_one({"id": post_id}, {"_id": 0})
+    post = await db.posts.find_one({"id": post_id, "deleted_at": None}, {"_id": 0})
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     
@@ -214,10 +318,14 @@ async def create_comment(post_id: str, comment_data: CommentCreate, user_id: str
     await db.comments.insert_one(comment_dict)
     
     # Update comment count on post
-    await db.posts.update_one(
-        {"id": post_id},
+    result = await db.posts.update_one(
+        {"id": post_id, "deleted_at": None},
         {"$inc": {"comments_count": 1}}
     )
+    if not result.matched_count:
+        # Deleted meanwhile - its cascade may already have run, so don't leave an orphan
+        await db.comments.delete_one({"id": comment.id})
+        raise HTTPException(status_code=404, detail="Post not found")
     
     return comment
 
@@ -248,66 +356,61 @@ async def delete_comment(post_id: str, comment_id: str, user_id: str = Query(...
 @router.post("/{post_id}/like")
 async def like_post(post_id: str, user_id: str = Query(...)):
     """Like a post (REQUIRES AUTH)"""
-    # Check if post exists
-    post = await db.posts.find_one({"id": post_id}, {"_id": 0})
-    if not post:
-        raise HTTPException(status_code=404, detail="Post not found")
-    
-    # Check if user already liked
-    existing_like = await db.likes.find_one({"post_id": post_id, "user_id": user_id}, {"_id": 0})
-    if existing_like:
-        raise HTTPException(status_code=400, detail="You already liked this post")
-    
-    # Get user info
-    user = await db.users.find_one({"id": user_id}, {"_id": 0})
+    user = await entity_cache.users.get(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    # Create like
-    like = Like(
-        post_id=post_id,
-        user_id=user_id,
-        username=user["username"]
-    )
-    
-    like_dict = like.model_dump()
-    like_dict["created_at"] = like_dict["created_at"].isoformat()
-    
-    await db.likes.insert_one(like_dict)
-    
-    # Update like count on post
-    await db.posts.update_one(
-        {"id": post_id},
-        {"$inc": {"likes_count": 1}}
-    )
+    created, likes_count = await post_likes(db).like(post_id, user_id)
+    if likes_count is None:
+        raise HTTPException(status_code=404, detail="Post not found")
+    if not created:
+        raise HTTPException(status_code=400, detail="You already liked this post")
     
-    return {"message": "Post liked successfully"}
+    return {"message": "Post liked successfully", "likes_count": likes_count}
 
 
 @router.delete("/{post_id}/like")
 async def unlike_post(post_id: str, user_id: str = Query(...)):
     """Unlike a post (REQUIRES AUTH)"""
-    like = await db.likes.find_one({"post_id": post_id, "user_id": user_id}, {"_id": 0})
-    if not like:
+    removed, likes_count = await post_likes(db).unlike(post_id, user_id)
+    if not removed:
         raise HTTPException(status_code=404, detail="Like not found")
     
-    await db.likes.delete_one({"post_id": post_id, "user_id": user_id})
+    return {"message": "Post unliked successfully", "likes_count": likes_count}
+
+
+@router.post("/{post_id}/like/toggle")
+async def toggle_like(post_id: str, user_id: str = Query(...)):
+    """Like or unlike a post, whichever applies (REQUIRES AUTH)"""
+    user = await entity_cache.users.get(user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
     
-    # Update like count on post
-    await db.posts.update_one(
-        {"id": post_id},
-        {"$inc": {"likes_count": -1}}
-    )
+    liked, likes_count = await post_likes(db).toggle(post_id, user_id)
+    if likes_count is None:
+        raise HTTPException(status_code=404, detail="Post not found")
     
-    return {"message": "Post unliked successfully"}
+    return {"liked": liked, "likes_count": likes_count}
 
 
 @router.get("/{post_id}/likes")
 async def get_post_likes(post_id: str):
     """Get users who liked a post (PUBLIC)"""
-    post = await db.posts.find_one({"id": post_id}, {"_id": 0})
+    post = await db.posts.find_one({"id": post_id, "deleted_at": None}, {"_id": 0})
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     
     likes = await db.likes.find({"post_id": post_id}, {"_id": 0}).to_list(1000)
+    
+    # Likes no longer store the username - resolve them in one query
+    user_ids = [like["user_id"] for like in likes if not like.get("username")]
+    if user_ids:
+        usernames = {
+            u["id"]: u.get("username")
+            async for u in db.users.find({"id": {"$in": user_ids}}, {"_id": 0, "id": 1, "username": 1})
+        }
+        for like in likes:
+            if not like.get("username"):
+                like["username"] = usernames.get(like["user_id"])
+    
     return likes
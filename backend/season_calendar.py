@@ -0,0 +1,122 @@
+import bisect
+import threading
+from datetime import datetime, time, timedelta, timezone
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from date_codec import as_utc
+
+# Predictions for the week lock at Wednesday 23:59:59 UTC
+DEADLINE_WEEKDAY = 2
+DEADLINE_TIME = time(23, 59, 59)
+
+WEEKS_BEFORE = 53
+WEEKS_AFTER = 60
+
+
+class CalendarWeek(NamedTuple):
+    week_id: str          # "2025-W42" (Monday's %Y-W%W)
+    start: datetime       # Monday 00:00 UTC
+    deadline: datetime    # Wednesday 23:59:59 UTC
+    end: datetime         # Sunday 23:59:59 UTC
+
+
+def monday_of(moment: datetime) -> datetime:
+    moment = as_utc(moment)
+    return datetime.combine((moment - timedelta(days=moment.weekday())).date(), time(0), tzinfo=timezone.utc)
+
+
+def build_week(monday: datetime) -> CalendarWeek:
+    return CalendarWeek(
+        week_id=monday.strftime("%Y-W%W"),
+        start=monday,
+        deadline=datetime.combine((monday + timedelta(days=DEADLINE_WEEKDAY)).date(), DEADLINE_TIME, tzinfo=timezone.utc),
+        end=datetime.combine((monday + timedelta(days=6)).date(), time(23, 59, 59), tzinfo=timezone.utc),
+    )
+
+
+class SeasonCalendar:
+    """
+    Precomputed weekly calendar (all UTC).
+
+    Weeks around the current date are built once into an immutable tuple
+    sorted by start, so finding the week, week_id or deadline for any
+    moment is a bisect instead of weekday arithmetic. Moments outside the
+    precomputed range fall back to computing the week directly.
+    """
+
+    def __init__(self, first_monday: datetime, weeks: int):
+        self.weeks: Tuple[CalendarWeek, ...] = tuple(
+            build_week(first_monday + timedelta(weeks=i)) for i in range(weeks)
+        )
+        self.starts: Tuple[datetime, ...] = tuple(week.start for week in self.weeks)
+
+    @classmethod
+    def around(cls, moment: datetime, weeks_before: int = WEEKS_BEFORE, weeks_after: int = WEEKS_AFTER) -> "SeasonCalendar":
+        return cls(monday_of(moment) - timedelta(weeks=weeks_before), weeks_before + weeks_after)
+
+    def covers(self, moment: datetime) -> bool:
+        return self.starts[0] <= moment < self.weeks[-1].end
+
+    def week_for(self, moment: Union[datetime, str]) -> CalendarWeek:
+        moment = as_utc(moment)
+        if not self.covers(moment):
+            return build_week(monday_of(moment))
+        return self.weeks[bisect.bisect_right(self.starts, moment) - 1]
+
+    def week_id(self, moment: Union[datetime, str]) -> str:
+        return self.week_for(moment).week_id
+
+    def next_deadline(self, now: Optional[datetime] = None) -> datetime:
+        """This week's Wednesday deadline, or next week's once it has passed"""
+        now = as_utc(now) if now else datetime.now(timezone.utc)
+        week = self.week_for(now)
+        if now <= week.deadline:
+            return week.deadline
+        return self.week_for(week.start + timedelta(weeks=1)).deadline
+
+    def prediction_deadline(self, kickoff: Union[datetime, str, None], now: Optional[datetime] = None) -> datetime:
+        """Weekly deadline or kickoff, whichever comes first"""
+        weekly = self.next_deadline(now)
+        kickoff = as_utc(kickoff) if kickoff else None
+        return min(weekly, kickoff) if kickoff else weekly
+
+    def evaluate_deadlines(self, kickoffs: Sequence[Union[datetime, str, None]],
+                           now: Optional[datetime] = None) -> List[Dict]:
+        """
+        Deadline status for a batch of fixtures in one pass
+
+        The weekly deadline is resolved once for the batch; each kickoff
+        then costs a comparison plus a bisect for its week_id.
+
+        Returns:
+            [{"week_id", "deadline", "locked"}] in the order of kickoffs
+        """
+        now = as_utc(now) if now else datetime.now(timezone.utc)
+        weekly = self.next_deadline(now)
+        results = []
+        for kickoff in kickoffs:
+            kickoff = as_utc(kickoff) if kickoff else None
+            deadline = min(weekly, kickoff) if kickoff else weekly
+            results.append({
+                "week_id": self.week_id(kickoff) if kickoff else None,
+                "deadline": deadline,
+                "locked": now >= deadline,
+            })
+        return results
+
+
+_calendar: Optional[SeasonCalendar] = None
+_lock = threading.Lock()
+
+
+def get_calendar(now: Optional[datetime] = None) -> SeasonCalendar:
+    """Process-wide calendar, rebuilt when "now" nears the end of its range"""
+    global _calendar
+    now = as_utc(now) if now else datetime.now(timezone.utc)
+    calendar = _calendar
+    if calendar is None or not calendar.covers(now + timedelta(weeks=4)):
+        with _lock:
+            if _calendar is None or not _calendar.covers(now + timedelta(weeks=4)):
+                _calendar = SeasonCalendar.around(now)
+            calendar = _calendar
+    return calendar
@@ -0,0 +1,238 @@
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from pot_ledger import PotLedger
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 200
+LEASE_SECONDS = 120
+MAX_ATTEMPTS = 5
+ADMIN_FEE_RATE = 0.10
+
+
+class StripeEventQueue:
+    """
+    Durable queue for Stripe webhook events.
+
+    The webhook verifies the signature and ingest()s the event, keyed by
+    its Stripe event id (unique index), then returns 200 straight away.
+    Redeliveries of the same event are dropped at the index. process_pending()
+    claims events in batches and applies them to payment_transactions and
+    the weekly pot with a few bulk writes. If a batch fails, its events are
+    applied one at a time; only the ones that still fail go back to pending,
+    and they are marked failed after MAX_ATTEMPTS claims.
+    """
+
+    def __init__(self, database):
+        self.db = database
+
+    async def ingest(self, event: Dict, payload: bytes = b"") -> bool:
+        """
+        Persist a verified webhook event
+
+        Returns:
+            False if this event id was already received
+        """
+        now = datetime.now(timezone.utc)
+        doc = {
+            "event_id": event["event_id"],
+            "event_type": event.get("event_type"),
+            "session_id": event.get("session_id"),
+            "payment_status": event.get("payment_status"),
+            "metadata": event.get("metadata") or {},
+            "payload": payload.decode("utf-8", errors="replace"),
+            "status": "pending",
+            "attempts": 0,
+            "received_at": now,
+        }
+        try:
+            await self.db.stripe_events.insert_one(doc)
+        except DuplicateKeyError:
+            logger.info(f"🔁 Duplicate Stripe event {event['event_id']} ignored")
+            return False
+        return True
+
+    async def _claim_batch(self) -> Tuple[Optional[str], List[Dict]]:
+        now = datetime.now(timezone.utc)
+        claimable = {"$or": [
+            {"status": "pending"},
+            {"status": "processing", "lease_until": {"$lt": now}},
+        ]}
+        candidates = await self.db.stripe_events.find(claimable, {"_id": 0, "event_id": 1}).sort(
+            "received_at", 1
+        ).limit(BATCH_SIZE).to_list(BATCH_SIZE)
+        if not candidates:
+            return None, []
+
+        # Only the events this update flips belong to us (another replica may race)
+        claim = str(uuid.uuid4())
+        await self.db.stripe_events.update_many(
+            {"$and": [{"event_id": {"$in": [c["event_id"] for c in candidates]}}, claimable]},
+            {"$set": {"status": "processing", "claim": claim,
+                      "lease_until": now + timedelta(seconds=LEASE_SECONDS)},
+             "$inc": {"attempts": 1}}
+        )
+        events = await self.db.stripe_events.find({"claim": claim}, {"_id": 0, "payload": 0}).sort(
+            "received_at", 1
+        ).to_list(BATCH_SIZE)
+        return claim, events
+
+    async def credit_paid_sessions(self, session_ids: Iterable[str]) -> int:
+        """
+        Mark checkout sessions paid and add their stakes to the weekly pot
+
+        A transaction flips to paid at most once and is then left with
+        pot_credited False until its stake is in the pot. Each step is
+        idempotent per session: the weekly cycle $inc only applies if the
+        session isn't in the cycle's credited_sessions, and the ledger
+        keeps one event per source_id. So if a step fails, the retry
+        finishes crediting without counting any stake twice.
+
+        Returns:
+            Number of transactions credited to the pot by this call
+        """
+        session_ids = list(set(session_ids))
+        if not session_ids:
+            return 0
+        now = datetime.now(timezone.utc).isoformat()
+        await self.db.payment_transactions.update_many(
+            {"session_id": {"$in": session_ids}, "payment_status": {"$ne": "paid"}},
+            {"$set": {"payment_status": "paid", "status": "complete", "pot_credited": False, "updated_at": now}}
+        )
+        # Newly paid ones, plus any a failed earlier attempt left uncredited
+        pending = await self.db.payment_transactions.find(
+            {"session_id": {"$in": session_ids}, "pot_credited": False},
+            {"_id": 0, "session_id": 1, "week_id": 1, "actual_stake": 1, "amount": 1}
+        ).to_list(len(session_ids))
+        if not pending:
+            return 0
+
+        ops = []
+        for payment in pending:
+            stake = payment.get("actual_stake", payment.get("amount", 0))  # Use actual_stake for pot
+            ops.append(UpdateOne(
+                {"week_id": payment.get("week_id"), "credited_sessions": {"$ne": payment["session_id"]}},
+                {"$inc": {
+                    "total_pot": stake,
+                    "admin_fee": stake * ADMIN_FEE_RATE,
+                    "distributable_pot": stake - stake * ADMIN_FEE_RATE
+                },
+                 "$push": {"credited_sessions": payment["session_id"]}}
+            ))
+        await self.db.weekly_cycles.bulk_write(ops, ordered=False)
+
+        ledger = PotLedger(self.db)
+        for payment in pending:
+            stake = payment.get("actual_stake", payment.get("amount", 0))
+            await ledger.record(payment.get("week_id"), "payment", stake, source_id=f"stripe:{payment['session_id']}")
+            logger.info(f"Updated pot for week {payment.get('week_id')}: +£{stake}")
+
+        await self.db.payment_transactions.update_many(
+            {"session_id": {"$in": [p["session_id"] for p in pending]}, "pot_credited": False},
+            {"$set": {"pot_credited": True, "updated_at": datetime.now(timezone.utc).isoformat()}}
+        )
+        return len(pending)
+
+    async def _apply(self, events: List[Dict]):
+        paid = set()
+        other: Dict[str, str] = {}
+        for event in events:
+            session_id = event.get("session_id")
+            if not session_id:
+                continue
+            if event.get("payment_status") == "paid":
+                paid.add(session_id)
+            elif event.get("payment_status"):
+                other[session_id] = event["payment_status"]
+
+        await self.credit_paid_sessions(paid)
+
+        # e.g. expired/unpaid sessions - never downgrade a paid one
+        other = {sid: status for sid, status in other.items() if sid not in paid}
+        if other:
+            now = datetime.now(timezone.utc).isoformat()
+            await self.db.payment_transactions.bulk_write([
+                UpdateOne({"session_id": sid, "payment_status": {"$ne": "paid"}},
+                          {"$set": {"payment_status": status, "updated_at": now}})
+                for sid, status in other.items()
+            ], ordered=False)
+
+    async def process_pending(self, max_batches: int = 10) -> int:
+        """
+        Apply queued events in batches
+
+        Returns:
+            Number of events processed
+        """
+        processed = 0
+        for _ in range(max_batches):
+            claim, events = await self._claim_batch()
+            if not events:
+                break
+            try:
+                await self._apply(events)
+            except Exception as e:
+                logger.error(f"❌ Stripe event batch failed, retrying its events one by one: {str(e)}")
+                done, failed = await self._apply_each(events)
+                await self._mark_done(claim, done)
+                processed += len(done)
+                if failed:
+                    # Retry later; give up on events that keep failing
+                    for event_id, error in failed.items():
+                        await self.db.stripe_events.update_one(
+                            {"claim": claim, "event_id": event_id},
+                            {"$set": {"status": "pending", "last_error": error}, "$unset": {"lease_until": ""}}
+                        )
+                    await self.db.stripe_events.update_many(
+                        {"claim": claim, "event_id": {"$in": list(failed)}, "attempts": {"$gte": MAX_ATTEMPTS}},
+                        {"$set": {"status": "failed"}}
+                    )
+                    break
+                continue
+            await self._mark_done(claim)
+            processed += len(events)
+        return processed
+
+    async def _apply_each(self, events: List[Dict]) -> Tuple[List[str], Dict[str, str]]:
+        """
+        Apply events one at a time, so one bad event doesn't hold back the
+        rest of its batch
+
+        Returns:
+            (event ids applied, {event id: error} for the ones that failed)
+        """
+        done, failed = [], {}
+        for event in events:
+            try:
+                await self._apply([event])
+            except Exception as e:
+                logger.error(f"❌ Stripe event {event['event_id']} failed: {str(e)}")
+                failed[event["event_id"]] = str(e)
+            else:
+                done.append(event["event_id"])
+        return done, failed
+
+    async def _mark_done(self, claim: str, event_ids: Optional[List[str]] = None):
+        query = {"claim": claim}
+        if event_ids is not None:
+            if not event_ids:
+                return
+            query["event_id"] = {"$in": event_ids}
+        await self.db.stripe_events.update_many(
+            query,
+            {"$set": {"status": "done", "processed_at": datetime.now(timezone.utc)},
+             "$unset": {"lease_until": ""}}
+        )
+
+    async def ensure_indexes(self):
+        await self.db.stripe_events.create_index("event_id", unique=True)
+        await self.db.stripe_events.create_index([("status", 1), ("received_at", 1)])
+        await self.db.stripe_events.create_index("claim")
+        await self.db.payment_transactions.create_index("session_id")
+        await self.db.payment_transactions.create_index("pot_credited", sparse=True)
@@ -0,0 +1,407 @@
+import logging
+import re
+import uuid
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from pymongo import ReplaceOne, UpdateOne
+
+import entity_cache
+
+logger = logging.getLogger(__name__)
+
+# Predictions whose fixture has no matchday are grouped under this label
+CURRENT_MATCHDAY = "Current"
+SOLE_WINNER_POINTS = 3
+TIED_WINNER_POINTS = 1
+
+ROW_FIELDS = {"_id": 1, "team_id": 1, "user_id": 1, "league": 1, "matchday": 1,
+              "predictions": 1, "correct": 1, "points": 1, "is_winner": 1, "is_tie": 1}
+
+
+def normalize_league_name(league_name: str) -> str:
+    """Normalize league names to merge duplicates"""
+    if not league_name:
+        return "Unknown League"
+
+    # Remove country suffixes in parentheses
+    normalized = re.sub(r'\s*\([^)]*\)\s*$', '', league_name).strip()
+    return normalized if normalized else league_name
+
+
+def matchday_label(matchday: Any) -> Any:
+    if matchday is None:
+        return CURRENT_MATCHDAY
+    if isinstance(matchday, str):
+        return matchday.strip() or CURRENT_MATCHDAY
+    return matchday
+
+
+def matchday_sort_key(matchday: Any) -> int:
+    """Numeric matchdays in order, named ones ("Current", "Final") last"""
+    try:
+        return int(matchday)
+    except (ValueError, TypeError):
+        return 9999
+
+
+def score_matchday(rows: List[Dict]) -> Dict[str, Dict]:
+    """
+    Team points for one (league, matchday): 3 for the sole member with the
+    most correct predictions, 1 each when several tie, 0 for the rest
+
+    Returns:
+        {row _id: {"points", "is_winner", "is_tie"}}
+    """
+    max_correct = max((r.get("correct", 0) for r in rows), default=0)
+    is_tie = sum(1 for r in rows if r.get("correct", 0) == max_correct) > 1
+    scores = {}
+    for row in rows:
+        on_top = row.get("correct", 0) == max_correct
+        is_winner = on_top and max_correct > 0
+        points = 0
+        if is_winner:
+            points = TIED_WINNER_POINTS if is_tie else SOLE_WINNER_POINTS
+        scores[row["_id"]] = {"points": points, "is_winner": is_winner, "is_tie": is_tie and on_top}
+    return scores
+
+
+def _member_id(team_id: str, user_id: str) -> str:
+    return f"{team_id}:{user_id}"
+
+
+def _row_id(team_id: str, user_id: str, league: str, matchday: Any) -> str:
+    return f"{team_id}:{user_id}:{league}:{matchday}"
+
+
+class TeamStandings:
+    """
+    Service for the precomputed team_standings collection.
+
+    One member row per (team, user) and one row per (team, user, league,
+    matchday) holding the member's prediction count, correct count, global
+    matchday-winner points (user_league_points) and the team's 3/1/0 points
+    for that matchday. Rows are recomputed per user when their predictions
+    are scored, created or deleted, when they win a matchday and when they
+    join a team, so every team leaderboard is a single find on team_id.
+    """
+
+    def __init__(self, database):
+        self.db = database
+
+    async def _build_rows(self, user_ids: Optional[List[str]]) -> List[Dict]:
+        """Rows for these users (everyone if None), without team points"""
+        user_filter = {} if user_ids is None else {"user_id": {"$in": user_ids}}
+
+        memberships = await self.db.team_members.find(
+            user_filter, {"_id": 0, "team_id": 1, "user_id": 1}
+        ).to_list(None)
+        predictions = await self.db.predictions.find(
+            user_filter, {"_id": 0, "user_id": 1, "fixture_id": 1, "league": 1, "matchday": 1, "result": 1}
+        ).to_list(None)
+        league_points = await self.db.user_league_points.find(
+            user_filter, {"_id": 0, "user_id": 1, "league_name": 1, "matchday": 1, "points": 1}
+        ).to_list(None)
+
+        # Older predictions don't carry their matchday - resolve them in one query
+        missing = list({p.get("fixture_id") for p in predictions if p.get("matchday") is None} - {None})
+        fixture_matchdays = {}
+        if missing:
+            async for fixture in self.db.fixtures.find(
+                {"fixture_id": {"$in": missing}}, {"_id": 0, "fixture_id": 1, "matchday": 1}
+            ):
+                fixture_matchdays[fixture["fixture_id"]] = fixture.get("matchday")
+
+        stats: Dict[str, Dict[Tuple[str, Any], Dict]] = defaultdict(dict)
+
+        def stat_for(user_id, league, matchday):
+            key = (normalize_league_name(league), matchday_label(matchday))
+            return stats[user_id].setdefault(
+                key, {"predictions": 0, "correct": 0, "league_points": 0, "matchday_wins": 0}
+            )
+
+        for pred in predictions:
+            matchday = pred.get("matchday")
+            if matchday is None:
+                matchday = fixture_matchdays.get(pred.get("fixture_id"))
+            stat = stat_for(pred["user_id"], pred.get("league", "Unknown"), matchday)
+            stat["predictions"] += 1
+            if pred.get("result") == "correct":
+                stat["correct"] += 1
+        for award in league_points:
+            stat = stat_for(award["user_id"], award.get("league_name"), award.get("matchday"))
+            stat["league_points"] += award.get("points", 0)
+            stat["matchday_wins"] += 1
+
+        rows = []
+        for membership in memberships:
+            team_id, user_id = membership["team_id"], membership["user_id"]
+            rows.append({"_id": _member_id(team_id, user_id), "team_id": team_id, "user_id": user_id,
+                         "league": None, "matchday": None})
+            for (league, matchday), stat in stats.get(user_id, {}).items():
+                rows.append({
+                    "_id": _row_id(team_id, user_id, league, matchday),
+                    "team_id": team_id,
+                    "user_id": user_id,
+                    "league": league,
+                    "matchday": matchday,
+                    **stat,
+                    "points": 0,
+                    "is_winner": False,
+                    "is_tie": False,
+                })
+        return rows
+
+    @staticmethod
+    def _score_rows(rows: Iterable[Dict]) -> Dict[str, Dict]:
+        groups = defaultdict(list)
+        for row in rows:
+            # Members only compete on matchdays they predicted
+            if row.get("matchday") is not None and row.get("predictions", 0) > 0:
+                groups[(row["team_id"], row["league"], row["matchday"])].append(row)
+        scores = {}
+        for group in groups.values():
+            scores.update(score_matchday(group))
+        return scores
+
+    async def _rescore(self, groups: Set[Tuple[str, str, Any]]):
+        """Recompute team points for these (team, league, matchday) groups"""
+        if not groups:
+            return
+        candidates = await self.db.team_standings.find({
+            "team_id": {"$in": list({g[0] for g in groups})},
+            "league": {"$in": list({g[1] for g in groups})},
+            "matchday": {"$in": list({g[2] for g in groups})},
+        }, ROW_FIELDS).to_list(None)
+        rows = [r for r in candidates if (r["team_id"], r["league"], r["matchday"]) in groups]
+        scores = self._score_rows(rows)
+
+        ops = []
+        for row in rows:
+            score = scores.get(row["_id"], {"points": 0, "is_winner": False, "is_tie": False})
+            if any(row.get(field) != value for field, value in score.items()):
+                ops.append(UpdateOne({"_id": row["_id"]}, {"$set": score}))
+        if ops:
+            await self.db.team_standings.bulk_write(ops, ordered=False)
+
+    async def refresh_users(self, user_ids: Iterable[str]) -> int:
+        """
+        Recompute the rows of these users in every team they belong to
+
+        Teammates' points on the matchdays involved are rescored too.
+
+        Returns:
+            Number of rows written
+        """
+        user_ids = list({uid for uid in user_ids if uid})
+        if not user_ids:
+            return 0
+
+        previous = await self.db.team_standings.find(
+            {"user_id": {"$in": user_ids}, "matchday": {"$ne": None}},
+            {"_id": 0, "team_id": 1, "league": 1, "matchday": 1}
+        ).to_list(None)
+        rows = await self._build_rows(user_ids)
+
+        if rows:
+            await self.db.team_standings.bulk_write(
+                [ReplaceOne({"_id": row["_id"]}, row, upsert=True) for row in rows], ordered=False
+            )
+        # Teams left and matchdays with no predictions any more
+        await self.db.team_standings.delete_many(
+            {"user_id": {"$in": user_ids}, "_id": {"$nin": [row["_id"] for row in rows]}}
+        )
+
+        groups = {(r["team_id"], r["league"], r["matchday"]) for r in previous}
+        groups.update((r["team_id"], r["league"], r["matchday"]) for r in rows if r["matchday"] is not None)
+        await self._rescore(groups)
+        return len(rows)
+
+    async def remove_rows(self, row_ids: List[str]) -> int:
+        """
+        Delete these rows and rescore the teammates left on their matchdays
+
+        The rows first stop competing (predictions set to 0), then the
+        groups are rescored and only then are the rows deleted, so a run
+        interrupted part way is finished by running it again.
+
+        Returns:
+            Number of rows deleted
+        """
+        if not row_ids:
+            return 0
+        rows = await self.db.team_standings.find(
+            {"_id": {"$in": row_ids}}, {"_id": 0, "team_id": 1, "league": 1, "matchday": 1}
+        ).to_list(None)
+        await self.db.team_standings.update_many({"_id": {"$in": row_ids}}, {"$set": {"predictions": 0}})
+        await self._rescore({(r["team_id"], r["league"], r["matchday"]) for r in rows if r.get("matchday") is not None})
+        result = await self.db.team_standings.delete_many({"_id": {"$in": row_ids}})
+        return result.deleted_count
+
+    async def rebuild(self) -> int:
+        """Recompute the whole collection from predictions, league points and memberships"""
+        # Every row written by this rebuild carries its generation; anything else is stale
+        generation = uuid.uuid4().hex
+        rows = await self._build_rows(None)
+        scores = self._score_rows(rows)
+        for row in rows:
+            row.update(scores.get(row["_id"], {}))
+            row["generation"] = generation
+
+        if rows:
+            await self.db.team_standings.bulk_write(
+                [ReplaceOne({"_id": row["_id"]}, row, upsert=True) for row in rows], ordered=False
+            )
+        await self.db.team_standings.delete_many({"generation": {"$ne": generation}})
+        logger.info(f"📊 Rebuilt team standings: {len(rows)} rows")
+        return len(rows)
+
+    async def team_rows(self, team_id: str) -> List[Dict]:
+        """Every standings row of a team - the only query behind the team leaderboards"""
+        return await self.db.team_standings.find({"team_id": team_id}, {"_id": 0}).to_list(None)
+
+    async def leaderboard(self, team_id: str, weekly: bool = False) -> List[Dict]:
+        """
+        Overall team leaderboard with ALL members
+
+        Args:
+            team_id: Team to rank
+            weekly: Rank on weekly_points instead of season_points
+
+        Returns:
+            [{username, total_points, matchday_wins, correct_predictions,
+              total_predictions, weekly_wins, rank}]
+        """
+        rows = await self.team_rows(team_id)
+        member_ids = [r["user_id"] for r in rows if r["matchday"] is None]
+        users = await entity_cache.users.get_many(member_ids)
+
+        totals = defaultdict(lambda: {"correct": 0, "predictions": 0, "matchday_wins": 0})
+        for row in rows:
+            if row["matchday"] is not None:
+                total = totals[row["user_id"]]
+                total["correct"] += row.get("correct", 0)
+                total["predictions"] += row.get("predictions", 0)
+                total["matchday_wins"] += row.get("matchday_wins", 0)
+
+        points_field = "weekly_points" if weekly else "season_points"
+        leaderboard = []
+        for member_id in member_ids:
+            user = users.get(member_id)
+            if not user:
+                continue
+            total = totals[member_id]
+            leaderboard.append({
+                "username": user.get("username", "Unknown"),
+                "total_points": user.get(points_field, 0),
+                "matchday_wins": total["matchday_wins"],
+                "correct_predictions": total["correct"],
+                "total_predictions": total["predictions"],
+                "weekly_wins": user.get("weekly_wins", 0),
+                "rank": 0
+            })
+
+        # Sort by points (then by correct predictions as tiebreaker)
+        leaderboard.sort(key=lambda x: (x["total_points"], x["correct_predictions"]), reverse=True)
+        for idx, entry in enumerate(leaderboard):
+            entry["rank"] = idx + 1
+        return leaderboard
+
+    async def by_league(self, team_id: str) -> List[Dict]:
+        """
+        Per-league team leaderboards on the 3/1/0 matchday rule, with a
+        per-matchday breakdown
+
+        Returns:
+            [{league_name, matchdays, leaderboard: [{username, total_points,
+              total_correct, total_predictions, matchday_scores, rank}]}]
+        """
+        rows = [r for r in await self.team_rows(team_id)
+                if r["matchday"] is not None and r.get("predictions", 0) > 0]
+        users = await entity_cache.users.get_many({r["user_id"] for r in rows})
+
+        leagues: Dict[str, Dict[str, List[Dict]]] = defaultdict(lambda: defaultdict(list))
+        for row in rows:
+            if row["user_id"] in users:
+                leagues[row["league"]][row["user_id"]].append(row)
+
+        result = []
+        for league_name, members in leagues.items():
+            matchdays = sorted({r["matchday"] for member_rows in members.values() for r in member_rows},
+                               key=matchday_sort_key)
+            leaderboard = []
+            for user_id, member_rows in members.items():
+                by_matchday = {r["matchday"]: r for r in member_rows}
+                entry = {
+                    "username": users[user_id].get("username", "Unknown"),
+                    "total_points": sum(r.get("points", 0) for r in member_rows),
+                    "total_correct": sum(r.get("correct", 0) for r in member_rows),
+                    "total_predictions": sum(r.get("predictions", 0) for r in member_rows),
+                    "matchday_scores": {}
+                }
+                for md in matchdays:
+                    row = by_matchday.get(md, {})
+                    entry["matchday_scores"][md] = {
+                        "points": row.get("points", 0),
+                        "correct": row.get("correct", 0),
+                        "total": row.get("predictions", 0),
+                        "is_winner": row.get("is_winner", False),
+                        "is_tie": row.get("is_tie", False)
+                    }
+                leaderboard.append(entry)
+
+            leaderboard.sort(key=lambda x: (x["total_points"], x["total_correct"]), reverse=True)
+            for idx, entry in enumerate(leaderboard):
+                entry["rank"] = idx + 1
+            result.append({"league_name": league_name, "matchdays": matchdays, "leaderboard": leaderboard})
+
+        result.sort(key=lambda x: x["league_name"])
+        return result
+
+    async def league_totals(self, team_id: str) -> List[Dict]:
+        """
+        Per-league team leaderboards on global matchday-winner points
+        (user_league_points)
+
+        Returns:
+            [{league_name, leaderboard: [{username, total_points,
+              matchday_wins, correct_predictions, total_predictions, rank}]}]
+        """
+        rows = [r for r in await self.team_rows(team_id) if r["matchday"] is not None]
+        users = await entity_cache.users.get_many({r["user_id"] for r in rows})
+
+        leagues: Dict[str, Dict[str, Dict]] = defaultdict(dict)
+        for row in rows:
+            user = users.get(row["user_id"])
+            if not user:
+                continue
+            entry = leagues[row["league"]].setdefault(row["user_id"], {
+                "username": user.get("username", "Unknown"),
+                "total_points": 0,
+                "matchday_wins": 0,
+                "correct_predictions": 0,
+                "total_predictions": 0
+            })
+            entry["total_points"] += row.get("league_points", 0)
+            entry["matchday_wins"] += row.get("matchday_wins", 0)
+            entry["correct_predictions"] += row.get("correct", 0)
+            entry["total_predictions"] += row.get("predictions", 0)
+
+        result = []
+        for league_name, members in leagues.items():
+            leaderboard = sorted(members.values(), key=lambda x: (x["total_points"], x["correct_predictions"]),
+                                 reverse=True)
+            for idx, entry in enumerate(leaderboard):
+                entry["rank"] = idx + 1
+            result.append({"league_name": league_name, "leaderboard": leaderboard})
+
+        result.sort(key=lambda x: x["league_name"])
+        return result
+
+    async def ensure_indexes(self):
+        await self.db.team_standings.create_index([("team_id", 1), ("league", 1), ("matchday", 1)])
+        await self.db.team_standings.create_index("user_id")
+        await self.db.predictions.create_index("user_id")
+        await self.db.user_league_points.create_index("user_id")
+        if await self.db.team_standings.count_documents({}, limit=1) == 0:
+            await self.rebuild()
@@ -0,0 +1,163 @@
+import asyncio
+import hashlib
+import logging
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import Dict
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+MAX_UPLOAD_BYTES = 50 * 1024 * 1024  # 50MB
+CHUNK_SIZE = 1024 * 1024
+# Room for the multipart envelope around a MAX_UPLOAD_BYTES file
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+# A .part file untouched this long belongs to no live upload (another worker's may be in flight)
+STALE_PARTIAL_SECONDS = 3600
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.heic'}
+VIDEO_EXTENSIONS = {'.mp4', '.mov', '.avi'}
+ALLOWED_EXTENSIONS = IMAGE_EXTENSIONS | VIDEO_EXTENSIONS
+
+
+class UploadTooLarge(Exception):
+    def __init__(self, size: int, limit: int):
+        self.size = size
+        self.limit = limit
+        super().__init__(f"Upload exceeds {limit} bytes")
+
+
+def partial_dir(upload_dir: Path) -> Path:
+    """Temp directory next to upload_dir (same filesystem, so the final rename is atomic, and not served)"""
+    return upload_dir.with_name(upload_dir.name + ".partial")
+
+
+async def save_upload(upload, upload_dir: Path, file_ext: str,
+                      max_bytes: int = MAX_UPLOAD_BYTES, chunk_size: int = CHUNK_SIZE) -> Dict:
+    """
+    Stream an UploadFile to upload_dir without holding it in memory
+
+    Chunks are written to a temp file off the event loop while a SHA-256 is
+    computed, aborting as soon as max_bytes is passed. The file is then
+    renamed atomically to <hash><ext>, so identical uploads share one file.
+
+    Returns:
+        Dict with filename, size (bytes), sha256 and deduplicated
+
+    Raises:
+        UploadTooLarge: the upload passed max_bytes (nothing is kept)
+    """
+    tmp_dir = partial_dir(upload_dir)
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = tmp_dir / f"{uuid.uuid4()}.part"
+
+    hasher = hashlib.sha256()
+    size = 0
+    handle = await asyncio.to_thread(open, tmp_path, "wb")
+    try:
+        while True:
+            chunk = await upload.read(chunk_size)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLarge(size, max_bytes)
+            hasher.update(chunk)
+            await asyncio.to_thread(handle.write, chunk)
+        await asyncio.to_thread(handle.flush)
+        await asyncio.to_thread(os.fsync, handle.fileno())
+    except BaseException:
+        await asyncio.to_thread(handle.close)
+        tmp_path.unlink(missing_ok=True)
+        raise
+    await asyncio.to_thread(handle.close)
+
+    digest = hasher.hexdigest()
+    filename = f"{digest}{file_ext}"
+    final_path = upload_dir / filename
+
+    deduplicated = final_path.exists()
+    if deduplicated:
+        tmp_path.unlink(missing_ok=True)
+    else:
+        os.replace(tmp_path, final_path)
+
+    return {"filename": filename, "size": size, "sha256": digest, "deduplicated": deduplicated}
+
+
+def cleanup_partials(upload_dir: Path, max_age: float = STALE_PARTIAL_SECONDS) -> int:
+    """Remove temp files left by uploads interrupted by a restart (older than max_age seconds)"""
+    removed = 0
+    tmp_dir = partial_dir(upload_dir)
+    if tmp_dir.exists():
+        cutoff = time.time() - max_age
+        for path in tmp_dir.glob("*.part"):
+            try:
+                if path.stat().st_mtime >= cutoff:
+                    continue
+            except FileNotFoundError:
+                continue
+            path.unlink(missing_ok=True)
+            removed += 1
+    return removed
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Cap the request body of an upload route while it is being received
+
+    UploadFile parameters are spooled by Starlette before the handler runs,
+    so save_upload's limit only applies once the whole body is in. This
+    refuses a declared Content-Length over max_bytes up front, and counts
+    the bytes of chunked bodies (no Content-Length) as they arrive,
+    answering 413 as soon as they pass max_bytes.
+    """
+
+    def __init__(self, app: ASGIApp, path: str, max_bytes: int = MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES):
+        self.app = app
+        self.path = path
+        self.max_bytes = max_bytes
+
+    def _too_large(self) -> JSONResponse:
+        limit_mb = (self.max_bytes - MULTIPART_OVERHEAD_BYTES) // (1024 * 1024)
+        return JSONResponse(status_code=413, content={"detail": f"File too large. Maximum size is {limit_mb}MB"})
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] != self.path:
+            await self.app(scope, receive, send)
+            return
+
+        declared = dict(scope["headers"]).get(b"content-length", b"")
+        if declared.isdigit() and int(declared) > self.max_bytes:
+            await self._too_large()(scope, receive, send)
+            return
+
+        received = 0
+        exceeded = False
+
+        async def limited_receive() -> Message:
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    exceeded = True
+                    raise UploadTooLarge(received, self.max_bytes)
+            return message
+
+        async def guarded_send(message: Message):
+            # Form parsing turns the error into its own 400; answer 413 instead
+            if not exceeded:
+                await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except UploadTooLarge:
+            pass
+        if exceeded:
+            logger.warning(f"Upload to {self.path} refused after {received} bytes (limit {self.max_bytes})")
+            await self._too_large()(scope, receive, send)
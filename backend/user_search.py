@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import re
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+NGRAM_SIZE = 3
+NGRAM_REFRESH_SECONDS = 300
+MIN_FUZZY_SCORE = 0.3
+PREFIX_CANDIDATES = 50
+
+
+def username_key(username: str) -> str:
+    """Lowercased username, stored as users.username_lower for indexed prefix search"""
+    return (username or "").strip().lower()
+
+
+def ngrams(text: str, n: int = NGRAM_SIZE) -> Set[str]:
+    padded = f"{' ' * (n - 1)}{text} "
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+class NGramIndex:
+    """In-memory trigram index of usernames for typo-tolerant and infix matches"""
+
+    def __init__(self):
+        self.postings: Dict[str, Set[str]] = defaultdict(set)
+        self.grams: Dict[str, Set[str]] = {}
+        self.loaded_at = 0.0
+
+    def add(self, user_id: str, key: str):
+        self.remove(user_id)
+        grams = ngrams(key)
+        self.grams[user_id] = grams
+        for gram in grams:
+            self.postings[gram].add(user_id)
+
+    def remove(self, user_id: str):
+        for gram in self.grams.pop(user_id, ()):
+            self.postings[gram].discard(user_id)
+
+    def search(self, query: str, limit: int, min_score: float = MIN_FUZZY_SCORE) -> Dict[str, float]:
+        """
+        Score users by trigram overlap with the query (Dice coefficient)
+
+        Returns:
+            {user_id: score} for the best `limit` users scoring at least min_score
+        """
+        query_grams = ngrams(query)
+        shared: Dict[str, int] = defaultdict(int)
+        for gram in query_grams:
+            for user_id in self.postings.get(gram, ()):
+                shared[user_id] += 1
+
+        scores = {}
+        for user_id, count in shared.items():
+            score = 2 * count / (len(query_grams) + len(self.grams[user_id]))
+            if score >= min_score:
+                scores[user_id] = score
+        best = sorted(scores, key=scores.get, reverse=True)[:limit]
+        return {user_id: scores[user_id] for user_id in best}
+
+
+# Shared by every request in this process; rebuilt every NGRAM_REFRESH_SECONDS
+# so users created on other replicas show up in fuzzy results too
+_index = NGramIndex()
+_index_lock = asyncio.Lock()
+
+
+class UserSearchService:
+    """
+    Service for username search.
+
+    Prefix matches come from an anchored, case-sensitive regex on the
+    indexed users.username_lower field (always fresh, uses the index).
+    When those don't fill the page, the in-memory trigram index adds
+    fuzzy matches. Results are ranked with the searcher's teammates first.
+    """
+
+    def __init__(self, database):
+        self.db = database
+
+    async def _ngram_index(self) -> NGramIndex:
+        global _index
+        if time.monotonic() - _index.loaded_at < NGRAM_REFRESH_SECONDS:
+            return _index
+        async with _index_lock:
+            if time.monotonic() - _index.loaded_at < NGRAM_REFRESH_SECONDS:
+                return _index
+            started = time.perf_counter()
+            index = NGramIndex()
+            async for user in self.db.users.find(
+                {"deleted_at": None}, {"_id": 0, "id": 1, "username": 1, "username_lower": 1}
+            ):
+                index.add(user["id"], user.get("username_lower") or username_key(user.get("username")))
+            index.loaded_at = time.monotonic()
+            _index = index
+            logger.info(f"🔎 Built username index: {len(index.grams)} users in {(time.perf_counter() - started) * 1000:.0f}ms")
+        return _index
+
+    def index_user(self, user: Dict):
+        """Make a new or renamed user searchable at once in this process"""
+        if _index.loaded_at:
+            _index.add(user["id"], username_key(user.get("username")))
+
+    def unindex_user(self, user_id: str):
+        _index.remove(user_id)
+
+    async def _teammates(self, user_id: str, candidates: Iterable[str]) -> Set[str]:
+        team_ids = await self.db.team_members.distinct("team_id", {"user_id": user_id})
+        if not team_ids:
+            return set()
+        return set(await self.db.team_members.distinct("user_id", {
+            "team_id": {"$in": team_ids},
+            "user_id": {"$in": list(candidates)}
+        }))
+
+    async def search(self, query: str, user_id: Optional[str] = None, limit: int = 20) -> List[Dict]:
+        """
+        Find users by username
+
+        Args:
+            query: Search text (case-insensitive)
+            user_id: The searching user; their teammates rank first and they
+                are left out of the results
+            limit: Maximum results
+
+        Returns:
+            [{"id", "username"}] best match first
+        """
+        key = username_key(query)
+        scores: Dict[str, float] = {}
+
+        prefix_matches = await self.db.users.find(
+            {"username_lower": {"$regex": f"^{re.escape(key)}"}, "deleted_at": None},
+            {"_id": 0, "id": 1, "username_lower": 1}
+        ).sort("username_lower", 1).limit(PREFIX_CANDIDATES).to_list(PREFIX_CANDIDATES)
+        for user in prefix_matches:
+            # Exact match, then shorter names (closer to what was typed)
+            scores[user["id"]] = 3.0 if user["username_lower"] == key else 2.0 + len(key) / len(user["username_lower"])
+
+        if len(scores) < limit:
+            index = await self._ngram_index()
+            for candidate, score in index.search(key, limit * 2).items():
+                scores.setdefault(candidate, score)
+
+        scores.pop(user_id, None)
+        if not scores:
+            return []
+
+        teammates = await self._teammates(user_id, scores) if user_id else set()
+        ranked = sorted(scores, key=lambda uid: (uid in teammates, scores[uid]), reverse=True)[:limit]
+
+        # Fresh names (and no deleted users) for whatever the index suggested
+        users = {
+            user["id"]: user async for user in self.db.users.find(
+                {"id": {"$in": ranked}, "deleted_at": None}, {"_id": 0, "id": 1, "username": 1}
+            )
+        }
+        return [users[uid] for uid in ranked if uid in users]
+
+    async def backfill_keys(self, batch_size: int = 500) -> int:
+        """Set username_lower on users created before it existed"""
+        updated = 0
+        while True:
+            batch = await self.db.users.find(
+                {"username_lower": {"$exists": False}}, {"_id": 1, "username": 1}
+            ).limit(batch_size).to_list(batch_size)
+            if not batch:
+                break
+            await self.db.users.bulk_write([
+                UpdateOne({"_id": user["_id"]}, {"$set": {"username_lower": username_key(user.get("username"))}})
+                for user in batch
+            ], ordered=False)
+            updated += len(batch)
+        if updated:
+            logger.info(f"🔎 Backfilled username_lower on {updated} users")
+        return updated
+
+    async def ensure_indexes(self):
+        await self.backfill_keys()
+        await self.db.users.create_index("username_lower")
+        await self.db.team_members.create_index([("team_id", 1), ("user_id", 1)])
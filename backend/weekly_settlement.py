@@ -0,0 +1,341 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from pymongo import UpdateOne
+import logging
+import uuid
+
+import entity_cache
+from date_codec import to_bson_datetime, utc_now
+from notification_service import NotificationService
+from pot_ledger import PotLedger
+from season_calendar import get_calendar
+
+logger = logging.getLogger(__name__)
+
+SOLE_WINNER_POINTS = 3
+TIED_WINNER_POINTS = 1
+ADMIN_FEE_RATE = 0.10
+MAX_DETAILS_PER_USER = 100
+
+
+class WeeklySettlementEngine:
+    """
+    Settles the weekly pot for every team in one pass.
+
+    Correct-prediction counts for all users come from a single $group over
+    the week window; teams, memberships, active pots and users are each read
+    with one query and joined in memory. All resulting writes (points, pot
+    status, next week's pots, notifications) go out as batched operations.
+    """
+
+    def __init__(self, database):
+        self.db = database
+
+    async def load_correct_counts(self, week_start: datetime) -> Dict[str, Dict]:
+        """
+        Count correct predictions per user since week_start in one aggregation
+
+        Returns:
+            Dict of user_id -> {"correct": int, "details": [prediction summaries]}
+        """
+        pipeline = [
+            {"$match": {"result": "correct", "created_at": {"$gte": to_bson_datetime(week_start)}}},
+            {"$group": {
+                "_id": "$user_id",
+                "correct": {"$sum": 1},
+                "details": {"$push": {
+                    "home_team": "$home_team",
+                    "away_team": "$away_team",
+                    "prediction": "$prediction"
+                }}
+            }}
+        ]
+        counts = {}
+        async for row in self.db.predictions.aggregate(pipeline):
+            counts[row["_id"]] = {
+                "correct": row["correct"],
+                "details": row["details"][:MAX_DETAILS_PER_USER]
+            }
+        return counts
+
+    @staticmethod
+    def settle_team(team: Dict, member_ids: List[str], pot: Dict, counts: Dict[str, Dict]) -> Dict:
+        """
+        Decide the outcome for one team (pure, no I/O)
+
+        Returns:
+            Settlement dict with outcome "rollover", "winner" or "tie"
+        """
+        current_pot = pot.get('total_pot', 0)
+        rollover_amount = pot.get('rollover', 0)
+        user_scores = {
+            uid: counts[uid]["correct"]
+            for uid in member_ids
+            if uid in counts and counts[uid]["correct"] > 0
+        }
+
+        settlement = {
+            "team_id": team.get('id'),
+            "team_name": team.get('name', 'Unknown'),
+            "admin_email": team.get('admin_email'),
+            "member_ids": member_ids,
+            "user_scores": user_scores,
+            "current_pot": current_pot,
+            "rollover_amount": rollover_amount,
+            "paid_entries": pot.get('paid_entries', 0),
+            "winners": [],
+            "max_score": 0,
+        }
+
+        if not user_scores:
+            # Nobody scored - the pot carries over (previous rollover is not re-added)
+            settlement.update({"outcome": "rollover", "new_rollover": current_pot})
+            return settlement
+
+        max_score = max(user_scores.values())
+        winners = [uid for uid, score in user_scores.items() if score == max_score]
+        settlement.update({"max_score": max_score, "winners": winners})
+
+        if len(winners) == 1:
+            total_pot_with_rollover = current_pot + rollover_amount
+            admin_fee = total_pot_with_rollover * ADMIN_FEE_RATE
+            settlement.update({
+                "outcome": "winner",
+                "admin_fee": admin_fee,
+                "winner_amount": total_pot_with_rollover - admin_fee,
+                "new_rollover": 0,
+            })
+        else:
+            settlement.update({"outcome": "tie", "new_rollover": current_pot + rollover_amount})
+        return settlement
+
+    async def build_settlements(self, week_start: Optional[datetime] = None) -> List[Dict]:
+        """
+        Compute settlements for every team with members and an active pot
+
+        Args:
+            week_start: Start of the scoring window (default: 7 days ago)
+        """
+        if week_start is None:
+            week_start = utc_now() - timedelta(days=7)
+
+        teams = await self.db.teams.find({}, {"_id": 0}).to_list(None)
+        if not teams:
+            return []
+        team_ids = [t.get('id') for t in teams]
+
+        members_by_team: Dict[str, List[str]] = {}
+        async for member in self.db.team_members.find(
+            {"team_id": {"$in": team_ids}}, {"_id": 0, "team_id": 1, "user_id": 1}
+        ):
+            members_by_team.setdefault(member["team_id"], []).append(member["user_id"])
+
+        pots_by_team: Dict[str, Dict] = {}
+        async for pot in self.db.weekly_pots.find(
+            {"team_id": {"$in": team_ids}, "status": "active"}, {"_id": 0}
+        ):
+            pots_by_team.setdefault(pot["team_id"], pot)
+
+        counts = await self.load_correct_counts(week_start)
+
+        settlements = []
+        for team in teams:
+            team_id = team.get('id')
+            member_ids = members_by_team.get(team_id, [])
+            if not member_ids:
+                continue
+            pot = pots_by_team.get(team_id)
+            if not pot:
+                logger.info(f"  Team '{team.get('name', 'Unknown')}': No active weekly pot")
+                continue
+            settlement = self.settle_team(team, member_ids, pot, counts)
+            settlement["winner_predictions"] = {uid: counts[uid]["details"] for uid in settlement["winners"]}
+            settlements.append(settlement)
+
+        # Resolve usernames/emails for everyone who scored, in one query
+        scorer_ids = {uid for s in settlements for uid in s["user_scores"]}
+        users = {}
+        if scorer_ids:
+            async for user in self.db.users.find(
+                {"id": {"$in": list(scorer_ids)}}, {"_id": 0, "id": 1, "email": 1, "username": 1}
+            ):
+                users[user["id"]] = {"email": user.get('email'), "username": user.get('username')}
+
+        # Active nominations are only needed for sole-winner emails
+        winning_team_ids = [s["team_id"] for s in settlements if s["outcome"] == "winner"]
+        nominations_by_team: Dict[str, List[Dict]] = {}
+        if winning_team_ids:
+            async for nomination in self.db.team_nominations.find(
+                {"team_id": {"$in": winning_team_ids}, "status": "active"}, {"_id": 0}
+            ).sort("created_at", -1):
+                team_noms = nominations_by_team.setdefault(nomination["team_id"], [])
+                if len(team_noms) < 10:
+                    team_noms.append(nomination)
+
+        for settlement in settlements:
+            settlement["user_details"] = {
+                uid: users.get(uid, {"email": None, "username": uid})
+                for uid in settlement["user_scores"]
+            }
+            settlement["nominations"] = nominations_by_team.get(settlement["team_id"], [])
+
+        return settlements
+
+    @staticmethod
+    def _notification(user_id: str, notification_type: str, title: str, message: str, data: Dict, created_at: str) -> Dict:
+        return {
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "type": notification_type,
+            "title": title,
+            "message": message,
+            "data": data,
+            "read": False,
+            "created_at": created_at
+        }
+
+    def build_notifications(self, settlement: Dict) -> List[Dict]:
+        """In-app notifications for a settled team (same documents create_notification writes)"""
+        if settlement["outcome"] == "rollover":
+            return []
+
+        created_at = datetime.now(timezone.utc).isoformat()
+        details = settlement["user_details"]
+        winners = settlement["winners"]
+        max_score = settlement["max_score"]
+        losers = [uid for uid in settlement["member_ids"] if uid not in winners]
+        notifications = []
+
+        if settlement["outcome"] == "winner":
+            winner_id = winners[0]
+            winner_name = details[winner_id]['username']
+            notifications.append(self._notification(
+                winner_id, 'winner', '🏆 You Won This Week!',
+                f"Congratulations! You won with {max_score} correct predictions and earned £{settlement['winner_amount']:.2f}! 🎉",
+                {
+                    "correct_predictions": max_score,
+                    "payout": settlement['winner_amount'],
+                    "correct_predictions_details": settlement["winner_predictions"][winner_id]
+                },
+                created_at
+            ))
+            for loser_id in losers:
+                loser_score = settlement["user_scores"].get(loser_id, 0)
+                notifications.append(self._notification(
+                    loser_id, 'loser', '😔 Not This Week!',
+                    f"{winner_name} won this week with {max_score} correct predictions. You got {loser_score} correct. Better luck next time! Keep coming back, keep predicting, and keep interacting with your friends. Football is unpredictable — anyone can win! 🎯⚽",
+                    {
+                        "winner_username": winner_name,
+                        "winner_correct_predictions": max_score,
+                        "your_correct_predictions": loser_score
+                    },
+                    created_at
+                ))
+            return notifications
+
+        winner_names = [details[uid]['username'] for uid in winners]
+        rollover = settlement["new_rollover"]
+        for winner_id in winners:
+            notifications.append(self._notification(
+                winner_id, 'tie', '🤝 You Tied This Week!',
+                f"You tied with {len(winners)-1} other player(s) with {max_score} correct predictions! Each of you earned 1 point. The pot of £{rollover:.2f} rolls over to next week. Keep predicting!",
+                {
+                    "correct_predictions": max_score,
+                    "tied_with": [name for name in winner_names if name != details[winner_id]['username']],
+                    "rollover_amount": rollover,
+                    "correct_predictions_details": settlement["winner_predictions"][winner_id]
+                },
+                created_at
+            ))
+        for loser_id in losers:
+            loser_score = settlement["user_scores"].get(loser_id, 0)
+            notifications.append(self._notification(
+                loser_id, 'loser', '😔 Not This Week!',
+                f"This week had a tie! {', '.join(winner_names)} tied with {max_score} correct predictions. You got {loser_score} correct. Better luck next time! Keep coming back, keep predicting, and keep interacting with your friends. Football is unpredictable — anyone can win! 🎯⚽",
+                {
+                    "winner_usernames": winner_names,
+                    "winner_correct_predictions": max_score,
+                    "your_correct_predictions": loser_score
+                },
+                created_at
+            ))
+        return notifications
+
+    async def apply(self, settlements: List[Dict]) -> Dict[str, int]:
+        """
+        Persist all settlements with batched writes
+
+        Returns:
+            Counts of teams per outcome and documents written
+        """
+        now_iso = datetime.now().isoformat()
+        points: Dict[str, Dict[str, int]] = {}
+        pot_updates = []
+        new_pots = []
+        notifications = []
+        summary = {"winner": 0, "tie": 0, "rollover": 0}
+
+        for s in settlements:
+            summary[s["outcome"]] += 1
+            team_filter = {"team_id": s["team_id"], "status": "active"}
+
+            if s["outcome"] == "winner":
+                inc = points.setdefault(s["winners"][0], {"season_points": 0, "weekly_wins": 0})
+                inc["season_points"] += SOLE_WINNER_POINTS
+                inc["weekly_wins"] += 1
+                pot_updates.append(UpdateOne(team_filter, {"$set": {
+                    "status": "paid",
+                    "winner": s["user_details"][s["winners"][0]]['username'],
+                    "winner_amount": s["winner_amount"],
+                    "admin_fee": s["admin_fee"],
+                    "paid_at": now_iso
+                }}))
+            else:
+                for winner_id in s["winners"]:
+                    inc = points.setdefault(winner_id, {"season_points": 0, "weekly_wins": 0})
+                    inc["season_points"] += TIED_WINNER_POINTS
+                pot_updates.append(UpdateOne(team_filter, {"$set": {"status": "rolled_over"}}))
+
+            new_pots.append({
+                "id": str(uuid.uuid4()),
+                "team_id": s["team_id"],
+                "team_name": s["team_name"],
+                "total_pot": 0,  # Will be updated as people join
+                "rollover": s["new_rollover"],
+                "paid_entries": 0,
+                "status": "active",
+                "week_start": now_iso,
+                "created_at": now_iso
+            })
+            notifications.extend(self.build_notifications(s))
+
+        user_updates = [
+            UpdateOne({"id": uid}, {"$inc": {k: v for k, v in inc.items() if v}})
+            for uid, inc in points.items()
+        ]
+
+        # Close the current pots before inserting next week's so the
+        # {"team_id", "status": "active"} filters can't match the new ones
+        if pot_updates:
+            await self.db.weekly_pots.bulk_write(pot_updates, ordered=False)
+        if new_pots:
+            await self.db.weekly_pots.insert_many(new_pots, ordered=False)
+            # Carried-over pots open next week's team balances in the ledger
+            ledger = PotLedger(self.db)
+            week_id = get_calendar().week_id(datetime.now(timezone.utc))
+            for pot in new_pots:
+                if pot["rollover"]:
+                    await ledger.record(week_id, "rollover", pot["rollover"], team_id=pot["team_id"],
+                                        source_id=f"rollover:{pot['id']}")
+        if user_updates:
+            await self.db.users.bulk_write(user_updates, ordered=False)
+            entity_cache.users.clear()
+        if notifications:
+            await NotificationService(self.db).insert_many(notifications)
+
+        summary.update({
+            "users_updated": len(user_updates),
+            "pots_created": len(new_pots),
+            "notifications": len(notifications),
+        })
+        return summary
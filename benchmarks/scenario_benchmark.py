@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+End-to-end scenario benchmarks on a synthetic dataset
+
+Seeds an in-memory Mongo (mongomock-motor) or a real local MongoDB
+(--mongo-url) with synthetic_data.generate(), points server.py at it and
+times:
+  - fixtures:                 GET /api/fixtures
+  - leaderboard:              GET /api/leaderboard
+  - team_by_league:           GET /api/teams/{team_id}/leaderboard/by-league
+  - automated_result_update:  scoring a week of results
+  - calculate_weekly_winners: weekly settlement for every team
+
+Read scenarios go through the ASGI app (no server process, no startup
+jobs). The two jobs reseed the database before every run, outside the
+timing. Outbound I/O is replaced: the football API by SyntheticProvider
+(its rate-limit sleeps are skipped) and emails by a no-op, so only our
+own code and queries are measured. The provider is pinned for every
+scenario, whatever server.py would pick, so numbers stay comparable
+across commits.
+
+--output writes the JSON result (tagged with the git commit); --baseline
+compares medians against an earlier result and exits 1 on a regression.
+
+Usage:
+    python benchmarks/scenario_benchmark.py --users 500 --teams 50 --runs 5 --json
+    python benchmarks/scenario_benchmark.py --output bench.json --baseline main.json --max-regression 0.25
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import contextmanager, redirect_stdout
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import httpx  # noqa: E402
+from mongomock_motor import AsyncMongoMockClient  # noqa: E402
+
+import synthetic_data  # noqa: E402
+
+READ_SCENARIOS = ("fixtures", "leaderboard", "team_by_league")
+JOB_SCENARIOS = ("automated_result_update", "calculate_weekly_winners")
+SCENARIOS = READ_SCENARIOS + JOB_SCENARIOS
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def summarize(timings, first_ms=None):
+    ordered = sorted(timings)
+    stats = {
+        "runs": len(ordered),
+        "median_ms": round(statistics.median(ordered), 2),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))], 2),
+        "min_ms": round(ordered[0], 2),
+        "max_ms": round(ordered[-1], 2),
+    }
+    if first_ms is not None:
+        stats["first_ms"] = round(first_ms, 2)
+    return stats
+
+
+@contextmanager
+def no_rate_limit_sleeps():
+    """automated_result_update sleeps 1.2s between provider calls; yield instead"""
+    original = asyncio.sleep
+
+    async def sleep(delay, result=None):
+        return await original(0, result)
+
+    asyncio.sleep = sleep
+    try:
+        yield
+    finally:
+        asyncio.sleep = original
+
+
+class Harness:
+    """server.py bound to a benchmark database"""
+
+    def __init__(self, args):
+        self.args = args
+        self.dataset = synthetic_data.generate(args.users, args.teams, args.fixtures, args.predictions, args.seed)
+        self.emails = 0
+        self._databases = 0
+        self.provider = None
+
+        os.environ.setdefault("DEPLOYMENT_ROLE", "all")
+        # server.py prints its connection banner; keep stdout for the JSON
+        with redirect_stdout(sys.stderr):
+            import server
+        self.server = server
+        server.send_email = self._send_email
+
+    async def _send_email(self, to_email, subject, html_content):
+        self.emails += 1
+
+    async def fresh_db(self):
+        self._databases += 1
+        name = f"bench_scenarios_{os.getpid()}_{self._databases}"
+        if self.args.mongo_url:
+            from motor.motor_asyncio import AsyncIOMotorClient
+            client = AsyncIOMotorClient(self.args.mongo_url)
+            await client.drop_database(name)
+        else:
+            client = AsyncMongoMockClient()
+        db = client[name]
+        await synthetic_data.seed_database(db, self.dataset)
+        self.bind(db)
+        return db
+
+    def bind(self, db):
+        """Point server.py and every module holding its own db handle at this database"""
+        server = self.server
+        server.db = db
+        server.matchweek_service = server.MatchweekService(db)
+        for module in ("routes.posts", "routes.auth", "routes.analytics", "routes.admin_maintenance", "entity_cache"):
+            if module in sys.modules:
+                sys.modules[module].set_db(db)
+
+        # A fresh provider per database, so its call count covers one run
+        provider = synthetic_data.SyntheticProvider(self.dataset["results"])
+        self.provider = provider
+        server.get_active_football_service = lambda: provider
+        if "routes.admin_maintenance" in sys.modules:
+            sys.modules["routes.admin_maintenance"].get_active_football_service = server.get_active_football_service
+
+    async def drop(self, db):
+        if self.args.mongo_url:
+            await db.client.drop_database(db.name)
+
+    async def time_request(self, client, path, runs):
+        async def call():
+            started = time.perf_counter()
+            response = await client.get(path)
+            elapsed = (time.perf_counter() - started) * 1000
+            if response.status_code != 200:
+                raise RuntimeError(f"GET {path} returned {response.status_code}: {response.text[:200]}")
+            return elapsed, response.json()
+
+        first_ms, body = await call()
+        timings = [(await call())[0] for _ in range(runs)]
+        stats = summarize(timings, first_ms)
+        stats["path"] = path
+        stats["items"] = len(body) if isinstance(body, list) else len(body.get("fixtures", body))
+        return stats
+
+    async def run_reads(self, selected):
+        results = {}
+        db = await self.fresh_db()
+        transport = httpx.ASGITransport(app=self.server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            paths = {
+                "fixtures": "/api/fixtures?league_ids=39,140,78&days_ahead=14",
+                "leaderboard": "/api/leaderboard?limit=50",
+                "team_by_league": "/api/teams/team-0/leaderboard/by-league",
+            }
+            for name in selected:
+                results[name] = await self.time_request(client, paths[name], self.args.runs)
+        await self.drop(db)
+        return results
+
+    async def run_job(self, name):
+        server = self.server
+        timings = []
+        pending_after = None
+        for _ in range(self.args.runs):
+            db = await self.fresh_db()
+            job = getattr(server, name)
+            with no_rate_limit_sleeps():
+                started = time.perf_counter()
+                await job()
+                timings.append((time.perf_counter() - started) * 1000)
+            pending_after = await db.predictions.count_documents({"result": "pending"})
+            await self.drop(db)
+
+        stats = summarize(timings)
+        if name == "automated_result_update":
+            stats["provider_calls_per_run"] = self.provider.calls
+            stats["pending_predictions_after"] = pending_after
+        return stats
+
+    async def run(self, selected):
+        results = {}
+        reads = [name for name in selected if name in READ_SCENARIOS]
+        if reads:
+            results.update(await self.run_reads(reads))
+        for name in selected:
+            if name in JOB_SCENARIOS:
+                results[name] = await self.run_job(name)
+        return results
+
+
+def compare(results, baseline, max_regression):
+    """Scenarios whose median got slower than the baseline by more than max_regression"""
+    regressions = {}
+    for name, stats in results["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before or not before.get("median_ms"):
+            continue
+        change = stats["median_ms"] / before["median_ms"] - 1
+        stats["change_vs_baseline"] = round(change, 3)
+        if change > max_regression:
+            regressions[name] = {"baseline_ms": before["median_ms"], "median_ms": stats["median_ms"],
+                                 "change": round(change, 3)}
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark API and scheduler scenarios")
+    synthetic_data.add_arguments(parser)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"Comma-separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--mongo-url", default=None,
+                        help="Use a real (local, disposable) MongoDB instead of mongomock-motor")
+    parser.add_argument("--json", action="store_true", help="Emit machine-readable JSON")
+    parser.add_argument("--output", help="Also write the JSON result to this file")
+    parser.add_argument("--baseline", help="Earlier --output file to compare medians against")
+    parser.add_argument("--max-regression", type=float, default=0.25,
+                        help="Allowed median slowdown vs the baseline (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    selected = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(selected) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    # The jobs log every fixture and winner; keep the output readable
+    logging.disable(logging.INFO)
+    harness = Harness(args)
+    results = {
+        "benchmark": "scenarios",
+        "commit": git_commit(),
+        "backend": "mongodb" if args.mongo_url else "mongomock",
+        "provider": "synthetic",
+        "dataset": {
+            "users": args.users, "teams": args.teams, "fixtures": args.fixtures,
+            "predictions_per_user": args.predictions, "seed": args.seed,
+            "documents": {name: len(docs) for name, docs in harness.dataset.items()},
+        },
+        "scenarios": asyncio.run(harness.run(selected)),
+        "emails_suppressed": harness.emails,
+    }
+
+    regressions = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.max_regression)
+        results["regressions"] = regressions
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"⏱️  Scenarios at {args.users} users, {args.teams} teams, {args.fixtures} fixtures, "
+              f"{args.predictions} predictions/user ({results['backend']}, commit {results['commit']})")
+        for name, stats in results["scenarios"].items():
+            line = f"  {name:26s} median {stats['median_ms']:9.2f}ms  p95 {stats['p95_ms']:9.2f}ms"
+            if "first_ms" in stats:
+                line += f"  first {stats['first_ms']:9.2f}ms"
+            if "change_vs_baseline" in stats:
+                line += f"  ({stats['change_vs_baseline']:+.0%} vs baseline)"
+            print(line)
+        for name, regression in regressions.items():
+            print(f"  ❌ {name} regressed {regression['change']:+.0%} "
+                  f"({regression['baseline_ms']}ms -> {regression['median_ms']}ms)")
+
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Process start-time benchmark: lazy vs eager integration loading
+
+Measures wall-clock time of a fresh interpreter running `import server`
+as shipped (payment/provider integrations deferred) and with every lazy
+integration forced to load straight after import, which is what startup
+cost before the lazy import registry.
+
+Usage:
+    python benchmarks/startup_benchmark.py --runs 5 --json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from import_profiler import profile_imports  # noqa: E402
+
+# Load every registered integration that is installed; missing ones
+# (e.g. emergentintegrations outside the deploy image) are reported, not fatal
+EAGER_PRELOAD = (
+    "from lazy_imports import registry\n"
+    "missing = []\n"
+    "for name in registry.stats():\n"
+    "    try:\n"
+    "        registry.get(name)\n"
+    "    except ImportError:\n"
+    "        missing.append(name)\n"
+    "import sys; sys.stderr.write('MISSING:' + ','.join(missing) + '\\n')\n"
+)
+
+
+def time_startup(code: str, runs: int):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = str(BACKEND_DIR) + os.pathsep + env.get("PYTHONPATH", "")
+    timings = []
+    missing = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, env=env,
+                              capture_output=True, text=True)
+        timings.append((time.perf_counter() - started) * 1000)
+        if proc.returncode != 0:
+            raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+        for line in proc.stderr.splitlines():
+            if line.startswith("MISSING:"):
+                missing = [name for name in line[len("MISSING:"):].split(",") if name]
+    return timings, missing
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark server start time")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="Emit machine-readable JSON")
+    args = parser.parse_args()
+
+    lazy_ms, _ = time_startup("import server", args.runs)
+    eager_ms, missing = time_startup("import server\n" + EAGER_PRELOAD, args.runs)
+    lazy_modules = len(profile_imports("server"))
+
+    result = {
+        "benchmark": "startup",
+        "runs": args.runs,
+        "lazy_median_ms": round(statistics.median(lazy_ms), 1),
+        "eager_median_ms": round(statistics.median(eager_ms), 1),
+        "saved_ms": round(statistics.median(eager_ms) - statistics.median(lazy_ms), 1),
+        "modules_imported_lazy": lazy_modules,
+        "integrations_not_installed": missing,
+    }
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    print(f"🚀 Startup over {args.runs} runs")
+    print(f"  lazy  (as shipped):        {result['lazy_median_ms']:8.1f}ms median")
+    print(f"  eager (all integrations):  {result['eager_median_ms']:8.1f}ms median")
+    print(f"  saved:                     {result['saved_ms']:8.1f}ms")
+    if missing:
+        print(f"  ⚠️  not installed here, excluded from eager run: {', '.join(missing)}")
+
+
+if __name__ == "__main__":
+    main()
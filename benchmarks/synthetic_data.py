@@ -0,0 +1,215 @@
+"""
+Seeded synthetic dataset for the benchmarks
+
+generate() builds users, teams (members spread round-robin), fixtures
+across a few leagues and matchdays around "now", and predictions per
+user. The same arguments and seed always give the same dataset.
+
+Fixtures that kicked off more than RESULTS_PENDING_DAYS ago are FINISHED
+and their predictions scored. Fixtures since then have been played but are
+still SCHEDULED in the database with pending predictions; SyntheticProvider
+reports them (and the rest of the last week) as FINISHED, which is the work
+automated_result_update picks up. Later fixtures are upcoming.
+"""
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from matchday_index import MatchdayIndex, round_fields  # noqa: E402
+from season_calendar import get_calendar  # noqa: E402
+from team_standings import TeamStandings  # noqa: E402
+
+LEAGUES = [
+    (39, "Premier League"),
+    (140, "La Liga"),
+    (78, "Bundesliga"),
+    (135, "Serie A"),
+    (61, "Ligue 1"),
+]
+FIXTURES_PER_ROUND = 10
+RESULTS_PENDING_DAYS = 3
+OUTCOMES = ("home", "draw", "away")
+
+
+def add_arguments(parser):
+    """Dataset size flags shared by the benchmark scripts"""
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--teams", type=int, default=50)
+    parser.add_argument("--fixtures", type=int, default=400)
+    parser.add_argument("--predictions", type=int, default=40, help="Predictions per user")
+    parser.add_argument("--seed", type=int, default=42)
+
+
+def _outcome(home_score: int, away_score: int) -> str:
+    if home_score > away_score:
+        return "home"
+    if away_score > home_score:
+        return "away"
+    return "draw"
+
+
+def generate(users: int = 500, teams: int = 50, fixtures: int = 400, predictions: int = 40,
+             seed: int = 42, now: Optional[datetime] = None) -> Dict[str, List[Dict]]:
+    """
+    Build the dataset in memory
+
+    Args:
+        users: Number of users
+        teams: Number of teams (0 for none); users join them round-robin
+        fixtures: Number of fixtures, spread over LEAGUES
+        predictions: Predictions per user (capped at the number of fixtures)
+        seed: Random seed
+        now: Reference time (defaults to the current time)
+
+    Returns:
+        {collection name: documents}, plus "results": the provider's view of
+        last week's fixtures
+    """
+    rng = random.Random(seed)
+    now = (now or datetime.now(timezone.utc)).replace(tzinfo=None)
+    calendar = get_calendar()
+    rounds = max(1, -(-fixtures // (len(LEAGUES) * FIXTURES_PER_ROUND)))
+    # Round 1 starts far enough back that the last few rounds are still to come
+    first_round = now - timedelta(weeks=max(1, rounds - 3))
+    results_cutoff = now - timedelta(days=RESULTS_PENDING_DAYS)
+
+    fixture_docs, results = [], []
+    for i in range(fixtures):
+        league_id, league_name = LEAGUES[i % len(LEAGUES)]
+        round_number = i // (len(LEAGUES) * FIXTURES_PER_ROUND) + 1
+        kickoff = (first_round + timedelta(weeks=round_number - 1, hours=rng.randint(0, 96))).replace(
+            minute=0, second=0, microsecond=0
+        )
+        home_score, away_score = rng.randint(0, 4), rng.randint(0, 3)
+        matchday = f"Regular Season - {round_number}"
+        fixture = {
+            "fixture_id": 1_000_000 + i,
+            "league_id": league_id,
+            "league_name": league_name,
+            "home_team": f"{league_name} Club {rng.randint(1, 20)}",
+            "away_team": f"{league_name} Club {rng.randint(1, 20)}",
+            "utc_date": kickoff,
+            "matchday": matchday,
+            **round_fields(matchday),
+            "status": "SCHEDULED",
+            "home_score": None,
+            "away_score": None,
+        }
+        if kickoff < results_cutoff:
+            fixture.update({"status": "FINISHED", "home_score": home_score, "away_score": away_score})
+        if now - timedelta(days=8) <= kickoff < now:
+            results.append({**fixture, "status": "FINISHED", "home_score": home_score, "away_score": away_score,
+                            "penalty_winner": None})
+        fixture_docs.append(fixture)
+
+    user_docs, member_docs = [], []
+    team_docs = [{
+        "id": f"team-{t}",
+        "name": f"Team {t}",
+        "admin_user_id": f"user-{t}",
+        "admin_email": f"user{t}@example.com",
+        "member_count": 0,
+        "created_at": (now - timedelta(days=60)).isoformat(),
+    } for t in range(min(teams, users))]
+    for u in range(users):
+        user_docs.append({
+            "id": f"user-{u}",
+            "username": f"user{u}",
+            "email": f"user{u}@example.com",
+            "season_points": rng.randint(0, 60),
+            "weekly_points": rng.randint(0, 9),
+            "weekly_wins": rng.randint(0, 4),
+            "profile_completed": True,
+            "created_at": (now - timedelta(days=90)).isoformat(),
+        })
+        if team_docs:
+            team = team_docs[u % len(team_docs)]
+            team["member_count"] += 1
+            member_docs.append({
+                "id": f"member-{u}",
+                "team_id": team["id"],
+                "user_id": f"user-{u}",
+                "username": f"user{u}",
+                "role": "admin" if team["admin_user_id"] == f"user-{u}" else "member",
+                "joined_at": (now - timedelta(days=60, minutes=u)).isoformat(),
+            })
+
+    pot_docs = [{
+        "id": f"pot-{team['id']}",
+        "team_id": team["id"],
+        "team_name": team["name"],
+        "total_pot": 5.0 * team["member_count"],
+        "rollover": 0,
+        "paid_entries": team["member_count"],
+        "status": "active",
+        "week_start": calendar.week_for(now).start.isoformat(),
+    } for team in team_docs]
+
+    prediction_docs = []
+    per_user = min(predictions, len(fixture_docs))
+    for user in user_docs:
+        for fixture in rng.sample(fixture_docs, per_user):
+            pick = rng.choice(OUTCOMES)
+            result = "pending"
+            if fixture["status"] == "FINISHED":
+                result = "correct" if pick == _outcome(fixture["home_score"], fixture["away_score"]) else "incorrect"
+            created_at = min(fixture["utc_date"] - timedelta(hours=rng.randint(1, 72)), now)
+            prediction_docs.append({
+                "id": f"pred-{user['id']}-{fixture['fixture_id']}",
+                "user_id": user["id"],
+                "username": user["username"],
+                "fixture_id": fixture["fixture_id"],
+                "league_id": fixture["league_id"],
+                "league": fixture["league_name"],
+                "prediction": pick,
+                "week_id": calendar.week_id(fixture["utc_date"]),
+                "result": result,
+                "home_team": fixture["home_team"],
+                "away_team": fixture["away_team"],
+                "match_date": fixture["utc_date"].isoformat(),
+                "status": fixture["status"],
+                "home_score": fixture["home_score"],
+                "away_score": fixture["away_score"],
+                "created_at": created_at,
+            })
+
+    return {
+        "users": user_docs,
+        "teams": team_docs,
+        "team_members": member_docs,
+        "weekly_pots": pot_docs,
+        "fixtures": fixture_docs,
+        "predictions": prediction_docs,
+        "results": results,
+    }
+
+
+async def seed_database(db, dataset: Dict[str, List[Dict]]):
+    """Insert the dataset and build the derived collections the way startup does"""
+    for name, docs in dataset.items():
+        if name != "results" and docs:
+            await db[name].insert_many([dict(doc) for doc in docs])
+    await MatchdayIndex(db).ensure_indexes()
+    await TeamStandings(db).ensure_indexes()
+
+
+class SyntheticProvider:
+    """Stands in for the football API: serves the dataset's results by date and league"""
+
+    def __init__(self, results: List[Dict]):
+        self.by_day: Dict[tuple, List[Dict]] = {}
+        for fixture in results:
+            key = (fixture["utc_date"].strftime("%Y-%m-%d"), fixture["league_id"])
+            self.by_day.setdefault(key, []).append(fixture)
+        self.calls = 0
+
+    async def get_fixtures_by_date(self, date_str: str, league_id: int, season: int = 2025) -> List[Dict]:
+        self.calls += 1
+        return [dict(f) for f in self.by_day.get((date_str, league_id), [])]
+
+    def transform_to_standard_format(self, fixtures: List[Dict]) -> List[Dict]:
+        return fixtures
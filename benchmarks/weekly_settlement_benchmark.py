@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Weekly settlement benchmark at 1,000 teams
+
+Seeds an in-memory Mongo (mongomock-motor) with teams, members, active pots
+and a week of predictions, then times:
+  - legacy: per-team, per-member count_documents + find_one (old loop, reads only)
+  - engine: WeeklySettlementEngine.build_settlements + apply
+
+Usage:
+    python benchmarks/weekly_settlement_benchmark.py --teams 1000 --members 10 --json
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from mongomock_motor import AsyncMongoMockClient  # noqa: E402
+from weekly_settlement import WeeklySettlementEngine  # noqa: E402
+
+
+async def seed(db, teams: int, members: int, predictions_per_user: int, seed_value: int):
+    rng = random.Random(seed_value)
+    now = datetime.now()
+    users, team_docs, memberships, pots, predictions = [], [], [], [], []
+
+    user_count = teams * members
+    for u in range(user_count):
+        users.append({"id": f"user-{u}", "username": f"user{u}", "email": f"user{u}@example.com",
+                      "season_points": 0, "weekly_wins": 0})
+
+    for t in range(teams):
+        team_docs.append({"id": f"team-{t}", "name": f"Team {t}", "admin_email": f"admin{t}@example.com"})
+        pots.append({"id": f"pot-{t}", "team_id": f"team-{t}", "total_pot": 5.0 * members,
+                     "rollover": 0, "paid_entries": members, "status": "active"})
+        for m in range(members):
+            memberships.append({"team_id": f"team-{t}", "user_id": f"user-{t * members + m}"})
+
+    for u in range(user_count):
+        for p in range(predictions_per_user):
+            predictions.append({
+                "id": f"pred-{u}-{p}",
+                "user_id": f"user-{u}",
+                "result": rng.choice(["correct", "incorrect", "incorrect"]),
+                "home_team": "Home", "away_team": "Away", "prediction": "home",
+                "created_at": now - timedelta(days=rng.randint(0, 6))
+            })
+
+    await db.users.insert_many(users)
+    await db.teams.insert_many(team_docs)
+    await db.team_members.insert_many(memberships)
+    await db.weekly_pots.insert_many(pots)
+    await db.predictions.insert_many(predictions)
+
+
+async def legacy_reads(db):
+    """The read pattern of the old loop: O(teams x members) round trips"""
+    week_start = datetime.now() - timedelta(days=7)
+    round_trips = 1
+    teams = await db.teams.find({}, {"_id": 0}).to_list(1000)
+    for team in teams:
+        members = await db.team_members.find({"team_id": team["id"]}, {"_id": 0}).to_list(100)
+        pot = await db.weekly_pots.find_one({"team_id": team["id"], "status": "active"})
+        round_trips += 2
+        if not pot:
+            continue
+        for member in members:
+            correct = await db.predictions.count_documents({
+                "user_id": member["user_id"], "result": "correct",
+                "created_at": {"$gte": week_start}
+            })
+            round_trips += 1
+            if correct > 0:
+                await db.users.find_one({"id": member["user_id"]}, {"_id": 0})
+                round_trips += 1
+    return round_trips
+
+
+async def run(args):
+    results = {"benchmark": "weekly_settlement", "teams": args.teams, "members_per_team": args.members,
+               "predictions_per_user": args.predictions}
+
+    if not args.skip_legacy:
+        db = AsyncMongoMockClient()["bench_settlement"]
+        await seed(db, args.teams, args.members, args.predictions, args.seed)
+        started = time.perf_counter()
+        results["legacy_round_trips"] = await legacy_reads(db)
+        results["legacy_reads_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    db = AsyncMongoMockClient()["bench_settlement_engine"]
+    await seed(db, args.teams, args.members, args.predictions, args.seed)
+    engine = WeeklySettlementEngine(db)
+    started = time.perf_counter()
+    settlements = await engine.build_settlements()
+    results["engine_build_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    started = time.perf_counter()
+    summary = await engine.apply(settlements)
+    results["engine_apply_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    results["engine_summary"] = summary
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark weekly settlement")
+    parser.add_argument("--teams", type=int, default=1000)
+    parser.add_argument("--members", type=int, default=10)
+    parser.add_argument("--predictions", type=int, default=10, help="Predictions per user this week")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-legacy", action="store_true",
+                        help="Skip the per-member loop (slow on mongomock at 1,000 teams)")
+    parser.add_argument("--json", action="store_true", help="Emit machine-readable JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"🏆 Weekly settlement: {args.teams} teams x {args.members} members")
+    if "legacy_reads_ms" in results:
+        print(f"  legacy reads:  {results['legacy_reads_ms']:9.1f}ms ({results['legacy_round_trips']} round trips)")
+    print(f"  engine build:  {results['engine_build_ms']:9.1f}ms")
+    print(f"  engine apply:  {results['engine_apply_ms']:9.1f}ms")
+    print(f"  outcome:       {results['engine_summary']}")
+
+
+if __name__ == "__main__":
+    main()
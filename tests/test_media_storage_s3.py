@@ -0,0 +1,144 @@
+"""
+S3 upload storage against moto's in-process S3
+Tests:
+1. save() pushes the file to the bucket and deduplicates identical uploads
+2. /api/uploads/<key> redirects to the object, not to a key with the mount prefix
+3. Presigned POST: the browser upload lands in the bucket and size() sees it
+4. cleanup() only removes stale scratch dirs
+5. save() leaves nothing behind in the temp dir
+6. Local storage: cleanup() keeps another worker's in-flight .part file
+"""
+
+import asyncio
+import io
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("moto")
+boto3 = pytest.importorskip("boto3")
+requests = pytest.importorskip("requests")
+
+from moto import mock_aws  # noqa: E402
+from starlette.applications import Starlette  # noqa: E402
+from starlette.routing import Mount  # noqa: E402
+from starlette.testclient import TestClient  # noqa: E402
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from media_storage import LocalStorage, S3Storage, STALE_SCRATCH_SECONDS  # noqa: E402
+from upload_pipeline import STALE_PARTIAL_SECONDS, partial_dir  # noqa: E402
+
+BUCKET = "hadfun-test-uploads"
+
+
+class FakeUpload:
+    """The part of UploadFile that save() uses"""
+
+    def __init__(self, data: bytes, content_type: str = "image/jpeg"):
+        self._buffer = io.BytesIO(data)
+        self.content_type = content_type
+
+    async def read(self, size: int = -1) -> bytes:
+        return self._buffer.read(size)
+
+
+@pytest.fixture
+def storage(tmp_path):
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+    with mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=BUCKET)
+        s3 = S3Storage(bucket=BUCKET, prefix="uploads", client=client)
+        s3.tmp_dir = tmp_path / "scratch"
+        yield s3
+
+
+def uploads_app(storage):
+    return Starlette(routes=[Mount("/api/uploads", app=storage.asgi_app(), name="uploads")])
+
+
+class TestS3Storage:
+    """S3Storage save, serving and direct uploads"""
+
+    def test_save_puts_object_and_deduplicates(self, storage):
+        data = b"\xff\xd8\xff fake jpeg bytes"
+        saved = asyncio.run(storage.save(FakeUpload(data), ".jpg"))
+        assert saved["deduplicated"] is False
+        head = storage.client.head_object(Bucket=BUCKET, Key=f"uploads/{saved['filename']}")
+        assert head["ContentLength"] == len(data)
+        assert head["ContentType"] == "image/jpeg"
+
+        again = asyncio.run(storage.save(FakeUpload(data), ".jpg"))
+        assert again["filename"] == saved["filename"]
+        assert again["deduplicated"] is True
+        assert asyncio.run(storage.list_keys()) == [saved["filename"]]
+
+    def test_mounted_redirect_uses_key_without_mount_prefix(self, storage):
+        storage.public_url = "https://cdn.example.com"
+        client = TestClient(uploads_app(storage))
+        response = client.get("/api/uploads/abc.jpg", follow_redirects=False)
+        assert response.status_code == 302
+        assert response.headers["location"] == "https://cdn.example.com/uploads/abc.jpg"
+        assert response.headers["cache-control"] == "public, max-age=86400"
+
+    def test_presigned_redirect_points_at_object(self, storage):
+        saved = asyncio.run(storage.save(FakeUpload(b"png bytes", "image/png"), ".png"))
+        client = TestClient(uploads_app(storage))
+        response = client.get(f"/api/uploads/{saved['filename']}", follow_redirects=False)
+        assert response.status_code == 302
+        location = response.headers["location"]
+        assert f"/uploads/{saved['filename']}?" in location
+        assert "/api/uploads/" not in location
+        assert requests.get(location).content == b"png bytes"
+
+    def test_presigned_post_upload_lands_in_bucket(self, storage):
+        direct = asyncio.run(storage.create_direct_upload(".mp4", "video/mp4", max_bytes=1024))
+        assert direct["key"].endswith(".mp4")
+        assert direct["fields"]["key"] == f"uploads/{direct['key']}"
+        assert asyncio.run(storage.size(direct["key"])) is None
+
+        response = requests.post(direct["url"], data=direct["fields"],
+                                 files={"file": ("clip.mp4", b"0" * 100, "video/mp4")})
+        assert response.status_code in (200, 204), response.text
+        assert asyncio.run(storage.size(direct["key"])) == 100
+
+    def test_cleanup_keeps_in_flight_scratch_dirs(self, storage):
+        storage.tmp_dir.mkdir(parents=True)
+        fresh = storage.tmp_dir / "in-flight"
+        stale = storage.tmp_dir / "abandoned"
+        fresh.mkdir()
+        stale.mkdir()
+        old = time.time() - STALE_SCRATCH_SECONDS - 60
+        os.utime(stale, (old, old))
+
+        assert storage.cleanup() == 1
+        assert fresh.exists()
+        assert not stale.exists()
+
+    def test_save_leaves_no_temp_entries(self, storage):
+        asyncio.run(storage.save(FakeUpload(b"gif bytes", "image/gif"), ".gif"))
+        assert list(storage.tmp_dir.iterdir()) == []
+
+
+class TestLocalStorageCleanup:
+    """LocalStorage.cleanup with uploads in flight on another worker"""
+
+    def test_cleanup_keeps_fresh_partials(self, tmp_path):
+        local = LocalStorage(tmp_path / "uploads")
+        partials = partial_dir(local.root)
+        partials.mkdir()
+        fresh = partials / "in-flight.part"
+        stale = partials / "abandoned.part"
+        fresh.write_bytes(b"half")
+        stale.write_bytes(b"half")
+        old = time.time() - STALE_PARTIAL_SECONDS - 60
+        os.utime(stale, (old, old))
+
+        assert local.cleanup() == 1
+        assert fresh.exists()
+        assert not stale.exists()
@@ -0,0 +1,70 @@
+"""
+Upload size limit enforced while the body is received
+Tests:
+1. A declared Content-Length over the limit is refused before the handler runs
+2. A chunked body (no Content-Length) is cut off with 413 once it passes the limit
+3. Uploads under the limit and other routes pass through
+"""
+
+import sys
+from pathlib import Path
+
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from upload_pipeline import MULTIPART_OVERHEAD_BYTES, UploadSizeLimitMiddleware  # noqa: E402
+
+LIMIT = 1024 * 1024 + MULTIPART_OVERHEAD_BYTES
+
+
+def make_client():
+    app = FastAPI()
+    handled = []
+
+    @app.post("/api/upload")
+    async def upload(file: UploadFile = File(...)):
+        handled.append(file.filename)
+        return {"size": len(await file.read())}
+
+    @app.post("/api/other")
+    async def other():
+        return {"ok": True}
+
+    app.add_middleware(UploadSizeLimitMiddleware, path="/api/upload", max_bytes=LIMIT)
+    return TestClient(app), handled
+
+
+def chunked(total, chunk=64 * 1024):
+    """A multipart body streamed without a Content-Length"""
+    yield b'--b\r\nContent-Disposition: form-data; name="file"; filename="a.mp4"\r\n\r\n'
+    for _ in range(total // chunk):
+        yield b"0" * chunk
+    yield b"\r\n--b--\r\n"
+
+
+class TestUploadSizeLimit:
+    """UploadSizeLimitMiddleware on /api/upload"""
+
+    def test_declared_length_over_limit(self):
+        client, handled = make_client()
+        response = client.post("/api/upload", files={"file": ("a.mp4", b"0" * (LIMIT + 1), "video/mp4")})
+        assert response.status_code == 413
+        assert handled == []
+
+    def test_chunked_body_cut_off(self):
+        client, handled = make_client()
+        response = client.post("/api/upload", content=chunked(4 * LIMIT),
+                               headers={"content-type": "multipart/form-data; boundary=b"})
+        assert response.status_code == 413
+        assert response.json()["detail"] == "File too large. Maximum size is 1MB"
+        assert handled == []
+
+    def test_small_uploads_pass(self):
+        client, handled = make_client()
+        response = client.post("/api/upload", content=chunked(256 * 1024),
+                               headers={"content-type": "multipart/form-data; boundary=b"})
+        assert response.status_code == 200
+        assert response.json() == {"size": 256 * 1024}
+        assert client.post("/api/other").json() == {"ok": True}